@@ -0,0 +1,251 @@
+import argparse
+import sys
+from array import array
+from typing import Callable, List, Optional, Tuple
+
+from convert_orozcoaniceto import load_dfa
+from match_orozcoaniceto import CompiledDFA
+from nfa2dfa_orozcoaniceto import MINIMIZERS, BitsetNFAToDFAConverter
+from regex2nfa_orozcoaniceto import NFA
+
+# Operations on CompiledDFA tables. Languages are compared over the union of the two
+# alphabets; a symbol missing from one DFA's alphabet sends that DFA to its dead state.
+
+DEAD_NAME = '∅'  # Name of a dead state that has to become a real state
+
+def compile_regex(regex: str, minimization: Optional[str] = None) -> CompiledDFA:
+    """Builds the DFA of a regex through regex2nfa and the bitset converter, minimized only on request."""
+    nfa = NFA("Regex")
+    nfa.build_nfa_from_regex(regex)
+    automaton = nfa.to_automaton()
+    converter = BitsetNFAToDFAConverter(nfa.name)
+    converter.use_automaton(automaton)
+    dfa, start_state, accept_states = converter.nfa_to_dfa()
+    if minimization is not None:
+        dfa, start_state, accept_states, _ = MINIMIZERS[minimization](dfa, start_state, accept_states).minimize()
+    return CompiledDFA.from_dfa(dfa, start_state, accept_states)
+
+def minimize(compiled: CompiledDFA, minimization: str = 'hopcroft') -> CompiledDFA:
+    """Minimizes a compiled DFA with one of the nfa2dfa minimizers."""
+    dfa, start_state, accept_states = compiled.to_dfa()
+    accept_states = {'*' + state for state in accept_states}
+    minimized_dfa, minimized_start_state, minimized_accept_states, _ = MINIMIZERS[minimization](dfa, start_state, accept_states).minimize()
+    return CompiledDFA.from_dfa(minimized_dfa, minimized_start_state, minimized_accept_states)
+
+def _shared_columns(first: CompiledDFA, second: CompiledDFA) -> Tuple[List[str], List[int], List[int]]:
+    # The union alphabet and, for each DFA, the table column of every symbol in it
+    symbols = sorted(set(first.symbols) | set(second.symbols))
+    first_columns = [first.columns.get(symbol, first.width - 1) for symbol in symbols]
+    second_columns = [second.columns.get(symbol, second.width - 1) for symbol in symbols]
+    return symbols, first_columns, second_columns
+
+def _dead_name(compiled: CompiledDFA) -> str:
+    # A name for the dead state that no other state uses, so that names stay unique
+    names = set(compiled.states)
+    name = DEAD_NAME
+    while name in names:
+        name += "'"
+    return name
+
+def _state_name(compiled: CompiledDFA, state: int, dead_name: str) -> str:
+    return dead_name if state == compiled.dead else compiled.states[state]
+
+def product(first: CompiledDFA, second: CompiledDFA, accept: Callable[[bool, bool], bool]) -> CompiledDFA:
+    """Builds the product of two DFAs on the fly, visiting only reachable state pairs.
+
+    A pair accepts when accept(first accepts, second accepts) is true. The pair of dead
+    states stays the dead state unless accept(False, False) is true.
+    """
+    symbols, first_columns, second_columns = _shared_columns(first, second)
+    first_columns.append(first.width - 1)  # Symbols outside both alphabets
+    second_columns.append(second.width - 1)
+    columns = list(zip(first_columns, second_columns))
+    dead_pair = (first.dead, second.dead) if not accept(False, False) else None
+
+    start = (first.start, second.start)
+    pairs = [start]
+    pair_ids = {start: 0}
+    rows = []
+    for first_state, second_state in pairs:  # pairs grows while it is walked
+        first_row, second_row = first_state * first.width, second_state * second.width
+        row = []
+        for first_column, second_column in columns:
+            next_pair = (first.table[first_row + first_column], second.table[second_row + second_column])
+            if next_pair == dead_pair:
+                row.append(None)
+                continue
+            next_id = pair_ids.get(next_pair)
+            if next_id is None:
+                next_id = pair_ids[next_pair] = len(pairs)
+                pairs.append(next_pair)
+            row.append(next_id)
+        rows.append(row)
+
+    dead, width = len(pairs), len(symbols) + 1
+    table = array('i', [dead]) * ((dead + 1) * width)
+    for state, row in enumerate(rows):
+        for column, next_id in enumerate(row):
+            if next_id is not None:
+                table[state * width + column] = next_id
+    first_dead, second_dead = _dead_name(first), _dead_name(second)
+    names = [f"{_state_name(first, first_state, first_dead)}|{_state_name(second, second_state, second_dead)}" for first_state, second_state in pairs]
+    accepting = bytearray(accept(bool(first.accepting[first_state]), bool(second.accepting[second_state])) for first_state, second_state in pairs)
+    return CompiledDFA(names, symbols, table, 0, accepting + bytearray(1))
+
+def intersection(first: CompiledDFA, second: CompiledDFA) -> CompiledDFA:
+    """DFA for the strings accepted by both DFAs."""
+    return product(first, second, lambda first_accepts, second_accepts: first_accepts and second_accepts)
+
+def union(first: CompiledDFA, second: CompiledDFA) -> CompiledDFA:
+    """DFA for the strings accepted by either DFA."""
+    return product(first, second, lambda first_accepts, second_accepts: first_accepts or second_accepts)
+
+def difference(first: CompiledDFA, second: CompiledDFA) -> CompiledDFA:
+    """DFA for the strings accepted by the first DFA but not the second."""
+    return product(first, second, lambda first_accepts, second_accepts: first_accepts and not second_accepts)
+
+def complement(compiled: CompiledDFA, alphabet: str = '') -> CompiledDFA:
+    """DFA for the strings over the DFA's alphabet (plus `alphabet`) that it rejects.
+
+    The dead state becomes a real, accepting sink; symbols outside the alphabet still reject.
+    """
+    symbols = sorted(set(compiled.symbols) | set(alphabet))
+    columns = [compiled.columns.get(symbol, compiled.width - 1) for symbol in symbols]
+    sink = compiled.dead  # Table rows are kept; the old dead row becomes the sink
+    dead, width = sink + 1, len(symbols) + 1
+    table = array('i', [dead]) * ((dead + 1) * width)
+    for state in range(sink + 1):
+        row = state * compiled.width
+        for column, old_column in enumerate(columns):
+            table[state * width + column] = compiled.table[row + old_column]
+    accepting = bytearray(not compiled.accepting[state] for state in range(sink)) + bytearray([1, 0])
+    return CompiledDFA(list(compiled.states) + [_dead_name(compiled)], symbols, table, compiled.start, accepting)
+
+def _trail_string(trail: List[Tuple[int, str]], index: int) -> str:
+    # Follow (parent, symbol) links back to the start pair
+    symbols = []
+    while index > 0:
+        index, symbol = trail[index]
+        symbols.append(symbol)
+    return ''.join(reversed(symbols))
+
+def equivalence_counterexample(first: CompiledDFA, second: CompiledDFA) -> Optional[str]:
+    """Returns None if the DFAs accept the same language, else a string accepted by exactly one of them.
+
+    Hopcroft-Karp: states of both DFAs share one union-find; a reachable pair of states is
+    explored only if the two states are not already known to be merged, so the check stops
+    after at most as many merges as there are states and never minimizes either DFA.
+    """
+    symbols, first_columns, second_columns = _shared_columns(first, second)
+    offset = first.dead + 1
+    parent = list(range(offset + second.dead + 1))
+
+    def find(state: int) -> int:
+        while parent[state] != state:
+            parent[state] = parent[parent[state]]
+            state = parent[state]
+        return state
+
+    parent[first.start] = offset + second.start
+    pairs = [(first.start, second.start)]
+    trail = [(-1, '')]
+    for index, (first_state, second_state) in enumerate(pairs):
+        if bool(first.accepting[first_state]) != bool(second.accepting[second_state]):
+            return _trail_string(trail, index)
+        first_row, second_row = first_state * first.width, second_state * second.width
+        for symbol, first_column, second_column in zip(symbols, first_columns, second_columns):
+            first_next = first.table[first_row + first_column]
+            second_next = second.table[second_row + second_column]
+            first_root, second_root = find(first_next), find(offset + second_next)
+            if first_root != second_root:
+                parent[first_root] = second_root
+                pairs.append((first_next, second_next))
+                trail.append((index, symbol))
+    return None
+
+def inclusion_counterexample(first: CompiledDFA, second: CompiledDFA) -> Optional[str]:
+    """Returns None if every string accepted by the first DFA is accepted by the second,
+    else a shortest string accepted by the first and rejected by the second.
+
+    Reachable pairs are explored breadth first and the search stops at the first
+    counterexample; pairs in which the first DFA is dead are never expanded.
+    """
+    symbols, first_columns, second_columns = _shared_columns(first, second)
+    start = (first.start, second.start)
+    pairs = [start]
+    seen = {start}
+    trail = [(-1, '')]
+    for index, (first_state, second_state) in enumerate(pairs):
+        if first.accepting[first_state] and not second.accepting[second_state]:
+            return _trail_string(trail, index)
+        first_row, second_row = first_state * first.width, second_state * second.width
+        for symbol, first_column, second_column in zip(symbols, first_columns, second_columns):
+            next_pair = (first.table[first_row + first_column], second.table[second_row + second_column])
+            if next_pair[0] != first.dead and next_pair not in seen:
+                seen.add(next_pair)
+                pairs.append(next_pair)
+                trail.append((index, symbol))
+    return None
+
+def equivalent(first: CompiledDFA, second: CompiledDFA) -> bool:
+    return equivalence_counterexample(first, second) is None
+
+def included(first: CompiledDFA, second: CompiledDFA) -> bool:
+    return inclusion_counterexample(first, second) is None
+
+OPERATIONS = {'intersection': intersection, 'union': union, 'difference': difference}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare automata and combine them with product constructions.")
+    parser.add_argument('--regex', action='store_true', help="operands are regexes instead of CSV or binary DFA files")
+    commands = parser.add_subparsers(dest='command', required=True)
+    for command in ('equivalent', 'includes'):
+        sub = commands.add_parser(command, help="check L(A) = L(B)" if command == 'equivalent' else "check L(A) is a subset of L(B)")
+        sub.add_argument('first')
+        sub.add_argument('second')
+    for command in OPERATIONS:
+        sub = commands.add_parser(command, help=f"write the {command} of two automata")
+        sub.add_argument('first')
+        sub.add_argument('second')
+    sub = commands.add_parser('complement', help="write the complement of an automaton")
+    sub.add_argument('first')
+    sub.add_argument('--alphabet', default='', help="extra symbols of the universe the complement is taken over")
+    for command in (*OPERATIONS, 'complement'):
+        commands.choices[command].add_argument('-o', '--output', required=True, help="CSV file, or .dfa for the binary format")
+        commands.choices[command].add_argument('--minimize', action='store_true', help="minimize the result before writing it")
+    args = parser.parse_args(argv)
+
+    def operand(value: str) -> CompiledDFA:
+        return compile_regex(value) if args.regex else load_dfa(value)
+
+    try:
+        first = operand(args.first)
+        second = operand(args.second) if hasattr(args, 'second') else None
+    except (OSError, ValueError) as error:
+        sys.exit(f"Error: {error}")
+
+    if args.command in ('equivalent', 'includes'):
+        if args.command == 'equivalent':
+            counterexample = equivalence_counterexample(first, second)
+            verdict = "equivalent" if counterexample is None else "not equivalent"
+        else:
+            counterexample = inclusion_counterexample(first, second)
+            verdict = "L(A) is included in L(B)" if counterexample is None else "L(A) is not included in L(B)"
+        print(verdict)
+        if counterexample is not None:
+            accepted_by = 'A' if first.matches(counterexample) else 'B'
+            print(f"counterexample: {counterexample!r} (accepted by {accepted_by} only)")
+            sys.exit(1)
+        return
+
+    result = complement(first, args.alphabet) if args.command == 'complement' else OPERATIONS[args.command](first, second)
+    if args.minimize:
+        result = minimize(result)
+    if args.output.endswith('.dfa'):
+        result.save(args.output)
+    else:
+        result.to_csv(args.output, f"{args.command.capitalize()} DFA")
+    print(f"{args.command}: {len(result.states)} states written to {args.output}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
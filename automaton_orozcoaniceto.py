@@ -0,0 +1,245 @@
+from array import array
+from collections import defaultdict
+from collections.abc import Iterator
+from itertools import accumulate, chain, filterfalse, islice, repeat
+
+EPSILON = '~'  # Canonical epsilon symbol; '∼' and empty symbol cells are read as epsilon too
+EPSILON_SYMBOLS = {'', '~', '∼'}
+CSV_CHUNK_ROWS = 65536  # Transition rows parsed, or formatted and written, per chunk
+_CSV_SPECIAL = (',', '"', '\r', '\n')
+
+class AutomatonFormatError(ValueError):
+    """Raised when an automaton CSV file is malformed; lists every bad row with its line number."""
+
+    def __init__(self, filename: str, errors: list[tuple[int, str]]):
+        self.filename = filename
+        self.errors = errors
+        super().__init__('\n'.join(f"{filename}:{line_number}: {message}" for line_number, message in errors))
+
+class Automaton:
+    """A compact automaton with integer-interned states and symbols.
+
+    Transitions are stored CSR-style: for symbol slot k (slot 0 is epsilon, slot k + 1 is
+    symbols[k]) the targets of state s are targets[offsets[k * n + s]:offsets[k * n + s + 1]].
+    """
+
+    __slots__ = ('name', 'state_names', 'symbols', 'start', 'accepting', 'offsets', 'targets')
+
+    def __init__(self, name: str, state_names: list[str], symbols: list[str], start: int, accepting: bytearray, offsets: array, targets: array):
+        self.name = name
+        self.state_names = state_names
+        self.symbols = symbols
+        self.start = start
+        self.accepting = accepting  # accepting[state] is 1 for accept states
+        self.offsets = offsets
+        self.targets = targets
+
+    @classmethod
+    def from_edges(cls, name: str, state_names: list[str], symbols: list[str], start: int, accepting: bytearray, sources, slots, destinations):
+        """Builds the CSR arrays from parallel source/slot/destination sequences.
+
+        Edges are placed with a stable counting sort on their (slot, state) key, so targets keep
+        their input order within a key and no comparison sort is needed.
+        """
+        num_states = len(state_names)
+        keys = list(map(int.__add__, map(num_states.__mul__, slots), sources))
+        counts = [0] * ((len(symbols) + 1) * num_states)
+        for key in keys:
+            counts[key] += 1
+        offsets = array('i', accumulate(counts, initial=0))
+        cursor = offsets.tolist()  # Next free position of every key
+        targets = array('i', [0]) * len(keys)
+        for key, destination in zip(keys, destinations):
+            position = cursor[key]
+            targets[position] = destination
+            cursor[key] = position + 1
+        return cls(name, state_names, symbols, start, accepting, offsets, targets)
+
+    @classmethod
+    def from_transitions(cls, name: str, transitions, start_state: str, accept_states, epsilon: str = EPSILON):
+        """Builds an automaton from (state, symbol, next_state) triples such as NFA.transitions."""
+        state_ids: dict[str, int] = {start_state: 0}
+        symbol_slots: dict[str, int] = {}
+        sources, slots, destinations = array('i'), array('i'), array('i')
+        for state, symbol, next_state in transitions:
+            for endpoint in (state, next_state):
+                if endpoint not in state_ids:
+                    state_ids[endpoint] = len(state_ids)
+            if symbol == epsilon or symbol in EPSILON_SYMBOLS:
+                slot = 0
+            else:
+                slot = symbol_slots.setdefault(symbol, len(symbol_slots) + 1)
+            sources.append(state_ids[state])
+            slots.append(slot)
+            destinations.append(state_ids[next_state])
+        for state in accept_states:
+            state_ids.setdefault(state, len(state_ids))
+        accepting = bytearray(len(state_ids))
+        for state in accept_states:
+            accepting[state_ids[state]] = 1
+        return cls.from_edges(name, list(state_ids), list(symbol_slots), 0, accepting, sources, slots, destinations)
+
+    @property
+    def num_states(self) -> int:
+        return len(self.state_names)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.targets)
+
+    def successors(self, state: int, slot: int) -> array:
+        """Targets of one state on one symbol slot (0 is epsilon)."""
+        key = slot * len(self.state_names) + state
+        return self.targets[self.offsets[key]:self.offsets[key + 1]]
+
+    def edges(self) -> Iterator[tuple[int, int, int]]:
+        """Yields every transition as (state, slot, next_state) ids."""
+        num_states, offsets, targets = len(self.state_names), self.offsets, self.targets
+        for key in range(len(offsets) - 1):
+            slot, state = divmod(key, num_states)
+            for position in range(offsets[key], offsets[key + 1]):
+                yield state, slot, targets[position]
+
+    def symbol_name(self, slot: int) -> str:
+        return EPSILON if slot == 0 else self.symbols[slot - 1]
+
+    def marked_name(self, state: int) -> str:
+        """State name with the '*' accept-state marker used in the CSV files."""
+        name = self.state_names[state]
+        return '*' + name if self.accepting[state] else name
+
+    def transition_map(self) -> dict[tuple[str, str], list[str]]:
+        """Transitions keyed by (state, symbol) with unmarked names, as used by NFAToDFAConverter."""
+        transitions = defaultdict(list)
+        for state, slot, next_state in self.edges():
+            transitions[(self.state_names[state], self.symbol_name(slot))].append(self.state_names[next_state])
+        return transitions
+
+    def accept_state_names(self) -> set:
+        return {name for name, accepting in zip(self.state_names, self.accepting) if accepting}
+
+def load_automaton(filename: str) -> Automaton:
+    """Reads an automaton CSV file in one buffered pass.
+
+    The layout is: name, states, alphabet, start state, accept states, then one
+    'state,symbol,next_state' row per transition. A state is accepting wherever it
+    carries a '*' marker; empty, '~' and '∼' symbols are epsilon.
+    """
+    with open(filename, encoding='utf-8', newline='', buffering=1 << 20) as file:
+        lines = file.read().splitlines()
+    errors: list[tuple[int, str]] = []
+    if len(lines) < 5:
+        raise AutomatonFormatError(filename, [(len(lines) + 1, "expected name, states, alphabet, start and accept rows before the transitions")])
+
+    state_ids: dict[str, int] = {}
+    state_names: list[str] = []
+    accept_names = set()
+
+    def intern(name: str) -> int:
+        if name[:1] == '*':
+            name = name.lstrip('*')
+            accept_names.add(name)
+        state = state_ids.get(name)
+        if state is None:
+            state = state_ids[name] = len(state_names)
+            state_names.append(name)
+        return state
+
+    header = [_fields(lines[idx]) for idx in range(5)]
+    name = header[0][0] if header[0] else ''
+    lookup: dict[str, int] = {}  # Cell text, '*' marker included, -> state id
+    start_cells = [cell for cell in header[3] if cell]
+    if not start_cells:
+        errors.append((4, "missing start state"))
+        start = 0
+    else:
+        start = lookup[start_cells[0]] = intern(start_cells[0])
+    for cell in header[1] + header[4]:
+        if cell:
+            lookup[cell] = intern(cell)
+
+    symbol_slots: dict[str, int] = {}
+    for cell in header[2]:
+        if cell and cell not in EPSILON_SYMBOLS:
+            symbol_slots.setdefault(cell, len(symbol_slots) + 1)
+    slot_lookup = dict.fromkeys(EPSILON_SYMBOLS, 0)
+    slot_lookup.update(symbol_slots)
+
+    # Rows are split and interned a chunk at a time into int arrays, so no list of every cell is ever held
+    sources, slots, destinations = array('i'), array('i'), array('i')
+    for begin in range(5, len(lines), CSV_CHUNK_ROWS):
+        columns = _split_rows(lines[begin:begin + CSV_CHUNK_ROWS], begin + 1, errors)
+        try:
+            chunk = [array('i', map(lookup.__getitem__, columns[0])), array('i', map(slot_lookup.__getitem__, columns[1])),
+                     array('i', map(lookup.__getitem__, columns[2]))]
+        except KeyError:
+            # States missing from the header and symbols missing from the alphabet are numbered in order of appearance
+            for cell in filterfalse(lookup.__contains__, dict.fromkeys(chain(columns[0], columns[2]))):
+                lookup[cell] = intern(cell)
+            for symbol in filterfalse(slot_lookup.__contains__, dict.fromkeys(columns[1])):
+                slot_lookup[symbol] = symbol_slots[symbol] = len(symbol_slots) + 1
+            chunk = [array('i', map(lookup.__getitem__, columns[0])), array('i', map(slot_lookup.__getitem__, columns[1])),
+                     array('i', map(lookup.__getitem__, columns[2]))]
+        sources += chunk[0]
+        slots += chunk[1]
+        destinations += chunk[2]
+    if errors:
+        raise AutomatonFormatError(filename, errors)
+
+    accepting = bytearray(len(state_names))
+    for accept_name in accept_names:
+        accepting[state_ids[accept_name]] = 1
+    return Automaton.from_edges(name, state_names, list(symbol_slots), start, accepting, sources, slots, destinations)
+
+def _fields(line: str) -> list[str]:
+    # Only quoted rows need the csv module, so it is imported when one turns up
+    if '"' not in line:
+        return line.split(',')
+    import csv
+    return next(csv.reader([line]))
+
+def _split_rows(rows: list[str], first_line: int, errors: list[tuple[int, str]]) -> list[list[str]]:
+    """Splits transition rows into source, symbol and target columns, recording malformed rows in errors."""
+    # Rows are split in bulk when every row has the same number of fields and no quotes
+    comma_counts = set(map(str.count, rows, repeat(',')))
+    width = comma_counts.pop() + 1 if len(comma_counts) == 1 else 0
+    if width >= 3:
+        joined = ','.join(rows)
+        if '"' not in joined:
+            cells = joined.split(',')
+            columns = [cells[0::width], cells[1::width], cells[2::width]]
+            if '' not in columns[0] and '' not in columns[2]:
+                return columns
+
+    # Slow path: inspect every row to skip blank rows and report malformed ones
+    transitions = []
+    for line_number, (line, row) in enumerate(zip(rows, map(_fields, rows)), first_line):
+        if len(row) >= 3 and row[0] and row[2]:
+            transitions.append(row[:3])
+        elif any(row):
+            if len(row) < 3:
+                errors.append((line_number, f"expected 'state,symbol,next_state', got {line!r}"))
+            else:
+                errors.append((line_number, f"transition is missing its {'source' if not row[0] else 'target'} state"))
+    return [list(column) for column in zip(*transitions)] if transitions else [[], [], []]
+
+def write_transitions_csv(file, rows, marked: dict[str, str], symbols, chunk_rows: int = CSV_CHUNK_ROWS):
+    """Streams 'state,symbol,next_state,' rows to a file opened with newline=''.
+
+    rows yields (state, symbol, next_state) triples, marked maps every state to its name in
+    the file (with the '*' accept marker) and symbols lists every symbol used. Rows are
+    formatted in chunks, so memory stays flat however many transitions there are; the
+    output is byte-for-byte what csv.writer would write.
+    """
+    if any(char in name for name in chain(marked.values(), symbols) for char in _CSV_SPECIAL):
+        # Names that need quoting go through the csv module
+        import csv
+        csv.writer(file).writerows([marked[state], symbol, marked[next_state], ''] for state, symbol, next_state in rows)
+        return
+    format_row = '%s,%s,%s,\r\n'.__mod__
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_rows))
+        if not chunk:
+            return
+        file.write(''.join(map(format_row, [(marked[state], symbol, marked[next_state]) for state, symbol, next_state in chunk])))
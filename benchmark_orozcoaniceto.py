@@ -0,0 +1,415 @@
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import algebra_orozcoaniceto as algebra
+from automaton_orozcoaniceto import load_automaton
+from match_orozcoaniceto import CompiledDFA, LazyDFAMatcher
+from regex2nfa_orozcoaniceto import NFA
+from scan_orozcoaniceto import Scanner, scan_file
+from trace_nfa_orozcoaniceto import NFATracer
+from incremental_orozcoaniceto import IncrementalDFA
+from language_orozcoaniceto import count_accepted, first_accepted, shortest_accepted
+from nfa2dfa_orozcoaniceto import BitsetNFAToDFAConverter, convert_and_minimize, DFAMinimizer, HopcroftDFAMinimizer, NFAToDFAConverter, ParallelNFAToDFAConverter
+from tests.helpers import SAMPLE_NFAS, fill_converter, generate_nfa, generate_regex, minimize_with, random_edit, rebuild
+
+def write_nfa_csv(filename, transitions, start_state, accept_states, name='Random'):
+    # Write generated transitions in the CSV layout shared by all three tools
+    marked = lambda state: '*' + state if state in accept_states else state
+    states = sorted({start_state} | {state for state, _, _ in transitions} | {next_state for _, _, next_state in transitions})
+    alphabet = sorted({symbol for _, symbol, _ in transitions if symbol != '~'})
+    with open(filename, 'w', buffering=1 << 20) as file:
+        file.write(f"{name},,,\n{','.join(map(marked, states))}\n{','.join(alphabet)},,\n{marked(start_state)},,,\n")
+        file.write(f"{','.join(sorted(map(marked, accept_states)))},,,\n")
+        file.writelines(f"{marked(state)},{symbol},{marked(next_state)},\n" for state, symbol, next_state in transitions)
+
+def measure(function, repeats=3):
+    # Best wall-clock time over `repeats` runs, then one extra run under tracemalloc for peak memory
+    best, result = float('inf'), None
+    for _ in range(repeats):
+        result, elapsed = time_call(function)
+        best = min(best, elapsed)
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, best, peak
+
+def time_call(function):
+    # Run a function once and return its result and elapsed wall-clock seconds
+    started = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - started
+
+def bench_subset_construction(sizes=(10, 20, 40, 80), seed=0):
+    # Compare classic and bitset subset construction on random NFAs of growing size
+    print(f"{'states':>8} {'dfa states':>11} {'classic (s)':>12} {'bitset (s)':>11} {'speedup':>8}")
+    for size in sizes:
+        classic = fill_converter(NFAToDFAConverter('random.csv'), *generate_nfa(size, seed=seed))
+        bitset = fill_converter(BitsetNFAToDFAConverter('random.csv'), *generate_nfa(size, seed=seed))
+        (dfa, start, accept), classic_time = time_call(classic.nfa_to_dfa)
+        (fast_dfa, fast_start, fast_accept), bitset_time = time_call(bitset.nfa_to_dfa)
+        if (dict(dfa), start, accept) != (dict(fast_dfa), fast_start, fast_accept):
+            raise AssertionError(f"bitset engine disagrees with classic engine on {size} states")
+        speedup = classic_time / bitset_time if bitset_time else float('inf')
+        print(f"{size:>8} {len({state for state, _ in dfa}):>11} {classic_time:>12.4f} {bitset_time:>11.4f} {speedup:>7.1f}x")
+
+def bench_minimization(sizes=(10, 20, 40), seed=0):
+    # Compare the original and Hopcroft minimizers on DFAs built from random NFAs
+    print(f"{'dfa states':>11} {'minimal':>8} {'original (s)':>13} {'hopcroft (s)':>13} {'speedup':>8}")
+    for size in sizes:
+        dfa, start, accept = fill_converter(BitsetNFAToDFAConverter('random.csv'), *generate_nfa(size, seed=seed)).nfa_to_dfa()
+        expected, original_time = time_call(lambda: minimize_with(DFAMinimizer, dfa, start, accept))
+        actual, hopcroft_time = time_call(lambda: minimize_with(HopcroftDFAMinimizer, dfa, start, accept))
+        if (dict(expected[0]),) + expected[1:] != (dict(actual[0]),) + actual[1:]:
+            raise AssertionError(f"Hopcroft minimizer disagrees with the original minimizer on {size} states")
+        speedup = original_time / hopcroft_time if hopcroft_time else float('inf')
+        print(f"{len({state for state, _ in dfa}):>11} {len(actual[3]):>8} {original_time:>13.4f} {hopcroft_time:>13.4f} {speedup:>7.1f}x")
+
+def bench_matching(num_states=40, num_strings=100000, length=32, seed=0):
+    # Measure matching throughput of a compiled DFA table on random strings
+    rng = random.Random(seed)
+    dfa, start, accept = fill_converter(BitsetNFAToDFAConverter('random.csv'), *generate_nfa(num_states, seed=seed)).nfa_to_dfa()
+    compiled = CompiledDFA.from_dfa(*HopcroftDFAMinimizer(dfa, start, accept).minimize()[:3])
+    strings = [''.join(rng.choice('01') for _ in range(length)) for _ in range(num_strings)]
+    accepted, elapsed = time_call(lambda: sum(compiled.match_many(strings)))
+    print(f"matched {num_strings} strings of length {length} against {len(compiled.states)} states "
+          f"in {elapsed:.3f}s ({num_strings / elapsed:,.0f} strings/s, {accepted} accepted)")
+
+    lazy = LazyDFAMatcher(fill_converter(BitsetNFAToDFAConverter('random.csv'), *generate_nfa(num_states, seed=seed)))
+    _, lazy_elapsed = time_call(lambda: sum(lazy.match_many(strings)))
+    print(f"lazy DFA matched the same strings in {lazy_elapsed:.3f}s ({num_strings / lazy_elapsed:,.0f} strings/s, "
+          f"{len(lazy.subsets)} of {len({state for state, _ in dfa} | {start})} subset states built)")
+
+def bench_regex_parsers(sizes=(100, 1000, 10000)):
+    # Compare the recursive and the single-pass regex parsers on long and deeply nested regexes
+    shapes = {
+        'alternation': lambda size: 'U'.join('ab'[idx % 2] for idx in range(size)),
+        'starred groups': lambda size: '(aUb)*c' * (size // 7 + 1),
+        'nested groups': lambda size: '(' * (size // 4) + 'a' + ')*' * (size // 4),
+    }
+    print(f"{'shape':>15} {'length':>7} {'legacy (s)':>11} {'legacy states':>14} {'single-pass (s)':>16} {'states':>7}")
+    for shape, make_regex in shapes.items():
+        for size in sizes:
+            regex = make_regex(size)
+            legacy, fast = NFA(), NFA()
+            try:
+                _, legacy_time = time_call(lambda: legacy.build_nfa_from_regex(regex, legacy=True))
+                legacy_result = f"{legacy_time:>11.4f} {len(legacy.states):>14}"
+            except RecursionError:
+                legacy_result = f"{'recursion':>11} {'limit':>14}"
+            _, fast_time = time_call(lambda: fast.build_nfa_from_regex(regex))
+            print(f"{shape:>15} {len(regex):>7} {legacy_result} {fast_time:>16.4f} {len(fast.states):>7}")
+
+def read_transition_dict(filename):
+    # The original loader: csv.reader rows collected into a dict keyed by (state, symbol), as a baseline
+    transitions = {}
+    with open(filename, newline='') as file:
+        for line_number, row in enumerate(csv.reader(file)):
+            if line_number > 4:
+                transitions.setdefault((row[0].lstrip('*'), row[1] or '~'), []).append(row[2].lstrip('*'))
+    return transitions
+
+def bench_loading(num_states=10 ** 5, nondeterminism=5, seed=0, repeats=3):
+    # Time the shared CSV loader against the csv-and-dict baseline on a large generated file,
+    # and the dict expansion that CSR readers (bitset engine, tracer) no longer pay for
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'random.csv')
+        write_nfa_csv(filename, *generate_nfa(num_states, nondeterminism=nondeterminism, seed=seed))
+        timings = {'csv + dict baseline': [], 'load_automaton': [], 'transition_map': []}
+        for _ in range(repeats):
+            timings['csv + dict baseline'].append(time_call(lambda: read_transition_dict(filename))[1])
+            automaton, elapsed = time_call(lambda: load_automaton(filename))
+            timings['load_automaton'].append(elapsed)
+            timings['transition_map'].append(time_call(automaton.transition_map)[1])
+    print(f"{automaton.num_edges} edges over {automaton.num_states} states, best of {repeats}:")
+    for label, elapsed in timings.items():
+        print(f"  {label:<20} {min(elapsed):.3f}s")
+
+def bench_parallel(num_states=100, workers=(1, 2, 4, 8, 16), seed=0):
+    # Measure parallel subset construction at several worker counts against the serial bitset engine
+    serial = fill_converter(BitsetNFAToDFAConverter('random.csv'), *generate_nfa(num_states, seed=seed))
+    expected, serial_time = time_call(serial.nfa_to_dfa)
+    print(f"serial bitset engine: {len({state for state, _ in expected[0]} | {expected[1]})} DFA states in {serial_time:.3f}s "
+          f"({os.cpu_count()} CPUs available)")
+    print(f"{'workers':>8} {'time (s)':>9} {'speedup':>8}")
+    for count in workers:
+        parallel = fill_converter(ParallelNFAToDFAConverter('random.csv', workers=count), *generate_nfa(num_states, seed=seed))
+        (dfa, start, accept), elapsed = time_call(parallel.nfa_to_dfa)
+        if (dict(dfa), start, accept) != (dict(expected[0]), expected[1], expected[2]):
+            raise AssertionError(f"parallel engine with {count} workers disagrees with the serial engine")
+        print(f"{count:>8} {elapsed:>9.3f} {serial_time / elapsed:>7.2f}x")
+
+def bench_incremental(sizes=(20, 40, 60), edits=60, seed=0):
+    # Time single edits against a full rebuild, grouped by how many DFA states each edit had to revisit
+    print(f"{'states':>7} {'dfa states':>11} {'rebuild (s)':>12} {'edits':>6} {'revisited':>10} {'edit (s)':>9} {'us/state':>9} {'speedup':>8}")
+    for size in sizes:
+        rng = random.Random(seed)
+        incremental = IncrementalDFA(fill_converter(BitsetNFAToDFAConverter('random.csv'), *generate_nfa(size, seed=seed)))
+        timings = []
+        for _ in range(edits):
+            method, arguments = random_edit(incremental, rng)
+            _, elapsed = time_call(lambda: method(*arguments))
+            work = incremental.last_update
+            _, rebuild_time = time_call(lambda: rebuild(incremental))
+            revisited = work.get('stepped', 0) + work.get('created', 0) + work.get('reminimized', 0)
+            timings.append((revisited, elapsed, rebuild_time, len(incremental.subsets)))
+        timings.sort()
+        quarter = max(1, len(timings) // 4)
+        for group in (timings[idx:idx + quarter] for idx in range(0, len(timings), quarter)):
+            revisited, elapsed, rebuild_time, dfa_states = (sum(column) / len(group) for column in zip(*group))
+            print(f"{size:>7} {dfa_states:>11.0f} {rebuild_time:>12.4f} {len(group):>6} {revisited:>10.0f} {elapsed:>9.4f} "
+                  f"{elapsed / max(revisited, 1) * 1e6:>9.1f} {rebuild_time / elapsed if elapsed else float('inf'):>7.1f}x")
+
+def bench_export(num_states=90, seed=1):
+    # Compare writing a large DFA as CSV with saving and memory-mapping the binary format
+    converter = fill_converter(BitsetNFAToDFAConverter('random.csv'), *generate_nfa(num_states, seed=seed))
+    dfa, start, accept = converter.nfa_to_dfa()
+    with tempfile.TemporaryDirectory() as directory:
+        converter.filename = 'random.csv'
+        cwd = os.getcwd()
+        os.chdir(directory)
+        try:
+            _, csv_time = time_call(lambda: converter.write_dfa_to_file(dfa, start, accept, 'Original'))
+        finally:
+            os.chdir(cwd)
+        csv_size = os.path.getsize(os.path.join(directory, 'Original_random.csv'))
+        compiled = CompiledDFA.from_dfa(dfa, start, accept)
+        filename = os.path.join(directory, 'random.dfa')
+        _, save_time = time_call(lambda: compiled.save(filename))
+        loaded, load_time = time_call(lambda: CompiledDFA.load(filename))
+        binary_size = os.path.getsize(filename)
+        del loaded
+    print(f"{len(dfa)} edges: CSV {csv_size / 2 ** 20:.1f} MiB in {csv_time:.3f}s, "
+          f"binary {binary_size / 2 ** 20:.1f} MiB saved in {save_time:.3f}s and mapped in {load_time:.4f}s")
+
+def bench_equivalence(sizes=(25, 50, 100), seed=0):
+    # Compare the union-find equivalence check with minimizing both DFAs, on equivalent regexes so nothing stops early
+    print(f"{'regex atoms':>12} {'dfa states':>11} {'union-find (s)':>15} {'minimize both (s)':>18}")
+    for size in sizes:
+        regex = generate_regex(size, seed=seed)
+        first, second = algebra.compile_regex(regex), algebra.compile_regex(f"({regex})U({regex})")
+        _, check_time = time_call(lambda: algebra.equivalence_counterexample(first, second))
+        _, minimize_time = time_call(lambda: (algebra.minimize(first), algebra.minimize(second)))
+        print(f"{size:>12} {len(first.states):>11} {check_time:>15.4f} {minimize_time:>18.4f}")
+
+def bench_scan(size=8 * 2 ** 20, workers=(1, 2, 4), seed=0):
+    # Time scanning a generated log file, with and without the prefilter and in parallel chunks
+    rng = random.Random(seed)
+    words = ['INFO', 'WARN', 'ERROR', 'retry', 'ok', 'id=42', 'timeout']
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'scan.log')
+        with open(filename, 'w') as file:
+            written = 0
+            while written < size:
+                line = ' '.join(rng.choice(words) for _ in range(6)) + '\n'
+                written += file.write(line)
+        print(f"{'pattern':>28} {'workers':>8} {'matches':>8} {'time (s)':>9} {'MB/s':>7}")
+        for regex in ('ERROR (retryUtimeout)', '(IUWUEUrUoUtUi)*ok'):
+            scanner = Scanner.from_regex(regex)
+            for count in workers:
+                found, elapsed = time_call(lambda: sum(1 for _ in scan_file(scanner, filename, count)))
+                print(f"{regex:>28} {count:>8} {found:>8} {elapsed:>9.3f} {size / elapsed / 1e6:>7.1f}")
+
+def bench_scan_worst_case(sizes=(4000, 16000, 64000, 256000)):
+    # Patterns whose longest match from every start reads to the end of the data; the time per byte should stay flat
+    print(f"{'pattern':>12} {'bytes':>8} {'matches':>8} {'time (s)':>9} {'us/byte':>8}")
+    for regex, unit in (('aUa*b', b'a'), ('aU(ab)*c', b'ab')):
+        scanner = Scanner.from_regex(regex)
+        for size in sizes:
+            data = unit * (size // len(unit))
+            found, elapsed = time_call(lambda: sum(1 for _ in scanner.matches(data)))
+            print(f"{regex:>12} {len(data):>8} {found:>8} {elapsed:>9.3f} {elapsed / len(data) * 1e6:>8.2f}")
+
+def bench_language(sizes=(50, 100, 200), lengths=(10 ** 3, 10 ** 4), seed=0):
+    # Time the language queries on DFAs from random regexes, including counts for huge lengths
+    print(f"{'regex atoms':>12} {'dfa states':>11} {'shortest (s)':>13} {'first 1000 (s)':>15} "
+          + ' '.join(f"{'count ' + str(length) + ' (s)':>17}" for length in lengths) + f" {'count 10^18 mod p (s)':>22}")
+    for size in sizes:
+        compiled = algebra.compile_regex(generate_regex(size, seed=seed), 'hopcroft')
+        _, shortest_time = time_call(lambda: shortest_accepted(compiled))
+        _, first_time = time_call(lambda: first_accepted(compiled, 1000))
+        count_times = [time_call(lambda: count_accepted(compiled, length))[1] for length in lengths]
+        _, modular_time = time_call(lambda: count_accepted(compiled, 10 ** 18, 1000000007))
+        print(f"{size:>12} {len(compiled.states):>11} {shortest_time:>13.4f} {first_time:>15.4f} "
+              + ' '.join(f"{elapsed:>17.4f}" for elapsed in count_times) + f" {modular_time:>22.4f}")
+
+STARTUP_IMPORTS = ('regex2nfa_orozcoaniceto', 'nfa2dfa_orozcoaniceto', 'trace_nfa_orozcoaniceto', 'orozcoaniceto')
+
+def bench_startup(repeats=15, filenames=SAMPLE_NFAS):
+    # Compare interpreter start-up and import cost with per-file work: one process per file
+    # through the interactive tool, one multi-file CLI call, and in-process calls
+    repo = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, PYTHONPATH=repo)
+
+    def median_run(command, stdin=None, cwd=None):
+        runs = [time_call(lambda: subprocess.run(command, input=stdin, cwd=cwd, env=env, check=True, text=True,
+                                                 stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))[1] for _ in range(repeats)]
+        return statistics.median(runs)
+
+    bare = median_run([sys.executable, '-c', 'pass'])
+    print(f"{'import':>28} {'median (ms)':>12} {'over bare python (ms)':>22}")
+    print(f"{'(nothing)':>28} {bare * 1000:>12.1f} {0:>22.1f}")
+    for module in STARTUP_IMPORTS:
+        elapsed = median_run([sys.executable, '-c', f"import importlib; importlib.import_module({module!r})"])
+        print(f"{module:>28} {elapsed * 1000:>12.1f} {(elapsed - bare) * 1000:>22.1f}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        names = [os.path.basename(filename) for filename in filenames]
+        for filename in filenames:
+            shutil.copy(filename, directory)
+        per_process = sum(median_run([sys.executable, os.path.join(repo, 'nfa2dfa_orozcoaniceto.py')], name + '\n', directory)
+                          for name in names)
+        one_process = median_run([sys.executable, '-m', 'orozcoaniceto', 'nfa2dfa', *names], cwd=directory)
+        with contextlib.redirect_stdout(io.StringIO()):
+            in_process = statistics.median(
+                time_call(lambda: [convert_and_minimize(os.path.join(directory, name)) for name in names])[1]
+                for _ in range(repeats))
+    print(f"{'nfa2dfa on ' + str(len(names)) + ' sample files':>28} {'total (ms)':>12} {'per file (ms)':>14}")
+    for label, elapsed in (('one process per file', per_process), ('one multi-file process', one_process), ('in process', in_process)):
+        print(f"{label:>28} {elapsed * 1000:>12.1f} {elapsed * 1000 / len(names):>14.1f}")
+
+SUITE_VERSION = 3  # 2: one NFA generator for every benchmark, trace_string timed through NFATracer.trace_string;
+                   # 3: the classic subset construction and the original (Moore) minimizer are timed too
+
+def run_suite(regex_sizes=(100, 1000, 10000), nfa_sizes=(8, 16, 32, 64), trace_length=1000, repeats=3, seed=0,
+              alphabet_size=2, epsilon_density=0.1, nondeterminism=1.5):
+    # Time every tool across size sweeps and return machine-readable results
+    results = []
+
+    def record(benchmark, size, seconds, peak_bytes, **details):
+        results.append({'benchmark': benchmark, 'size': size, 'seconds': seconds, 'peak_bytes': peak_bytes, **details})
+        print(f"{benchmark:>20} {size:>7} {seconds:>10.4f}s {peak_bytes / 1024:>10.0f} KiB  {details}", file=sys.stderr)
+
+    for size in regex_sizes:
+        regex = generate_regex(size, alphabet_size, seed=seed)
+        def build():
+            nfa = NFA()
+            nfa.build_nfa_from_regex(regex)
+            return nfa
+        built, seconds, peak = measure(build, repeats)
+        record('build_nfa_from_regex', size, seconds, peak, regex_length=len(regex), nfa_states=len(built.states))
+
+    alphabet = ''.join(chr(ord('a') + idx) for idx in range(alphabet_size))
+    with tempfile.TemporaryDirectory() as directory:
+        for size in nfa_sizes:
+            nfa = generate_nfa(size, alphabet, nondeterminism, epsilon_density, seed=seed)
+            (dfa, start, accept), seconds, peak = measure(lambda: fill_converter(BitsetNFAToDFAConverter('random.csv'), *nfa).nfa_to_dfa(), repeats)
+            record('nfa_to_dfa', size, seconds, peak, dfa_states=len({state for state, _ in dfa} | {start}))
+            _, seconds, peak = measure(lambda: fill_converter(NFAToDFAConverter('random.csv'), *nfa).nfa_to_dfa(), repeats)
+            record('nfa_to_dfa_classic', size, seconds, peak, dfa_states=len({state for state, _ in dfa} | {start}))
+
+            minimized, seconds, peak = measure(lambda: minimize_with(HopcroftDFAMinimizer, dfa, start, accept), repeats)
+            record('minimize', size, seconds, peak, minimized_states=len(minimized[3]))
+            _, seconds, peak = measure(lambda: minimize_with(DFAMinimizer, dfa, start, accept), repeats)
+            record('minimize_moore', size, seconds, peak, minimized_states=len(minimized[3]))
+
+            filename = os.path.join(directory, f"random{size}.csv")
+            write_nfa_csv(filename, *nfa)
+            tracer = NFATracer(filename)
+            tracer.output_file_path = os.path.join(directory, f"random{size}Output")
+            tracer.read_file()
+            rng = random.Random(seed)
+            string = ''.join(rng.choice(alphabet) for _ in range(trace_length))
+            _, seconds, peak = measure(lambda: tracer.trace_string(string), repeats)
+            record('trace_string', size, seconds, peak, string_length=trace_length)
+
+    return {
+        'suite_version': SUITE_VERSION,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'parameters': {'seed': seed, 'alphabet_size': alphabet_size, 'epsilon_density': epsilon_density,
+                       'nondeterminism': nondeterminism, 'trace_length': trace_length, 'repeats': repeats},
+        'results': results,
+    }
+
+def compare_results(baseline, current, threshold=0.25, memory_threshold=0.25):
+    # Return the benchmarks whose time or peak memory grew beyond the baseline by more than the
+    # thresholds, as (benchmark, size, metric, before, after) with metric 'seconds' or 'peak_bytes'
+    limits = (('seconds', threshold), ('peak_bytes', memory_threshold))
+    baseline_entries = {(entry['benchmark'], entry['size']): entry for entry in baseline['results']}
+    regressions = []
+    for entry in current['results']:
+        before = baseline_entries.get((entry['benchmark'], entry['size']))
+        if before is None:
+            continue
+        for metric, limit in limits:
+            if before.get(metric) and entry[metric] > before[metric] * (1 + limit):
+                regressions.append((entry['benchmark'], entry['size'], metric, before[metric], entry[metric]))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks for regex2nfa, nfa2dfa and trace-nfa.")
+    commands = parser.add_subparsers(dest='command')
+    suite = commands.add_parser('suite', help="run the size sweeps and write JSON results")
+    suite.add_argument('-o', '--output', help="JSON results file (default: stdout)")
+    suite.add_argument('--seed', type=int, default=0)
+    suite.add_argument('--repeats', type=int, default=3)
+    suite.add_argument('--nfa-sizes', type=int, nargs='+', default=[8, 16, 32, 64])
+    suite.add_argument('--regex-sizes', type=int, nargs='+', default=[100, 1000, 10000])
+    compare = commands.add_parser('compare', help="compare two JSON result files and fail on regressions")
+    compare.add_argument('baseline')
+    compare.add_argument('current')
+    compare.add_argument('--threshold', type=float, default=0.25, help="allowed slowdown, as a fraction")
+    compare.add_argument('--memory-threshold', type=float, default=0.25, help="allowed growth of peak memory, as a fraction")
+    tables = commands.add_parser('tables', help="print the engine comparison tables")
+    tables.add_argument('sizes', type=int, nargs='*')
+    args = parser.parse_args(argv)
+
+    if args.command == 'suite':
+        report = run_suite(tuple(args.regex_sizes), tuple(args.nfa_sizes), repeats=args.repeats, seed=args.seed)
+        text = json.dumps(report, indent=2)
+        if args.output:
+            with open(args.output, 'w') as file:
+                file.write(text + '\n')
+        else:
+            print(text)
+    elif args.command == 'compare':
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        with open(args.current) as file:
+            current = json.load(file)
+        if baseline.get('suite_version') != current.get('suite_version'):
+            print(f"warning: comparing suite version {baseline.get('suite_version')} with {current.get('suite_version')}; "
+                  f"workloads may differ", file=sys.stderr)
+        regressions = compare_results(baseline, current, args.threshold, args.memory_threshold)
+        for benchmark, size, metric, before, after in regressions:
+            if metric == 'seconds':
+                print(f"REGRESSION {benchmark} size {size}: {before:.4f}s -> {after:.4f}s")
+            else:
+                print(f"REGRESSION {benchmark} size {size}: peak {before / 1024:.0f} KiB -> {after / 1024:.0f} KiB")
+        if regressions:
+            sys.exit(1)
+        print("No regressions")
+    else:
+        sizes = tuple(getattr(args, 'sizes', None) or ())
+        bench_subset_construction(sizes or (10, 20, 40, 80))
+        bench_minimization(sizes or (10, 20, 40))
+        bench_matching()
+        bench_regex_parsers()
+        bench_loading()
+        bench_parallel()
+        bench_incremental()
+        bench_export()
+        bench_equivalence()
+        bench_scan()
+        bench_scan_worst_case()
+        bench_language()
+        bench_startup()
+
+if __name__ == "__main__":
+    main()
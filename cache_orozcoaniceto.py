@@ -0,0 +1,117 @@
+import hashlib
+import os
+from typing import Optional
+
+from match_orozcoaniceto import FORMAT_VERSION, CompiledDFA
+
+DEFAULT_CACHE_DIR = '.nfa_cache'
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+class CompiledDFACache:
+    """An on-disk LRU cache of compiled automata keyed by a hash of the canonicalized NFA."""
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes  # Least recently used entries are evicted above this size
+        self.suffix = f".v{FORMAT_VERSION}.dfa"
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        os.makedirs(directory, exist_ok=True)
+        self._drop_other_versions()
+
+    def key(self, converter) -> str:
+        """Hashes the states, alphabet, transitions, start state and accept states of a read NFA."""
+        transitions = sorted(converter.transition_triples())
+        states = sorted({state for state, _, _ in transitions} | {next_state for _, _, next_state in transitions} | {converter.start_state})
+        alphabet = sorted({symbol for _, symbol, _ in transitions})
+        canonical = repr((states, alphabet, transitions, converter.start_state, sorted(converter.accept_states)))
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def path(self, key: str, stage: str) -> str:
+        """Returns the file that stores one stage ('original' or 'minimized') of an automaton."""
+        return os.path.join(self.directory, f"{key}.{stage}{self.suffix}")
+
+    def get(self, key: str, stage: str) -> Optional[CompiledDFA]:
+        """Loads a cached automaton, or returns None and counts a miss."""
+        path = self.path(key, stage)
+        try:
+            compiled = CompiledDFA.load(path)
+        except (OSError, ValueError):
+            if os.path.exists(path):
+                # Unreadable or stale entries are dropped and rebuilt
+                self.invalidations += 1
+                self._remove(path)
+            self.misses += 1
+            return None
+        os.utime(path)  # The modification time doubles as the LRU timestamp
+        self.hits += 1
+        return compiled
+
+    def put(self, key: str, stage: str, compiled: CompiledDFA):
+        """Stores an automaton and evicts least recently used entries above max_bytes."""
+        path = self.path(key, stage)
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        compiled.save(temporary_path)
+        os.replace(temporary_path, path)  # Readers never see a partially written entry
+        self.evict()
+
+    def evict(self):
+        """Removes the least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(self.suffix):
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            self.evictions += 1
+            total -= size
+
+    def stats(self) -> dict:
+        """Returns the hit, miss, eviction and invalidation counters."""
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'invalidations': self.invalidations}
+
+    def _drop_other_versions(self):
+        # Entries written by another format version can never be loaded again
+        for name in os.listdir(self.directory):
+            if name.endswith('.dfa') and not name.endswith(self.suffix):
+                self._remove(os.path.join(self.directory, name))
+                self.invalidations += 1
+
+    def _remove(self, path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def cached_nfa_to_dfa(converter, cache: CompiledDFACache, key: Optional[str] = None):
+    """Returns converter.nfa_to_dfa() for an NFA already read, reusing a cached result when available."""
+    if key is None:
+        key = cache.key(converter)
+    original = cache.get(key, 'original')
+    if original is not None:
+        dfa, dfa_start_state, accept_names = original.to_dfa()
+        return dfa, dfa_start_state, {'*' + state for state in accept_names}
+
+    dfa, dfa_start_state, dfa_accept_states = converter.nfa_to_dfa()
+    cache.put(key, 'original', CompiledDFA.from_dfa(dfa, dfa_start_state, dfa_accept_states))
+    return dfa, dfa_start_state, dfa_accept_states
+
+def cached_minimize(key: str, minimizer, cache: CompiledDFACache):
+    """Returns the first three items of minimizer.minimize(), reusing the result cached under key when available."""
+    minimized = cache.get(key, 'minimized')
+    if minimized is not None:
+        return minimized.to_dfa()
+
+    minimized_dfa, minimized_start_state, minimized_accept_states, _ = minimizer.minimize()
+    cache.put(key, 'minimized', CompiledDFA.from_dfa(minimized_dfa, minimized_start_state, minimized_accept_states))
+    return minimized_dfa, minimized_start_state, minimized_accept_states
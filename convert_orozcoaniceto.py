@@ -0,0 +1,57 @@
+import argparse
+import sys
+
+from automaton_orozcoaniceto import load_automaton
+from match_orozcoaniceto import FORMAT_MAGIC, CompiledDFA
+from nfa2dfa_orozcoaniceto import BitsetNFAToDFAConverter
+
+def is_binary(filename: str) -> bool:
+    """Returns True for files in the compiled DFA binary format."""
+    with open(filename, 'rb') as file:
+        return file.read(len(FORMAT_MAGIC)) == FORMAT_MAGIC
+
+def load_dfa(filename: str, quiet: bool = False) -> CompiledDFA:
+    """Loads a binary DFA, or compiles an automaton CSV without minimizing it; NFAs are determinized first."""
+    if is_binary(filename):
+        return CompiledDFA.load(filename)
+    automaton = load_automaton(filename)
+    try:
+        return CompiledDFA.from_automaton(automaton)
+    except ValueError:
+        converter = BitsetNFAToDFAConverter(filename)
+        converter.use_automaton(automaton)
+        if not quiet:
+            print(f"{filename} is not deterministic; using its subset construction", file=sys.stderr)
+        return CompiledDFA.from_dfa(*converter.nfa_to_dfa())
+
+def csv_to_binary(csv_filename: str, binary_filename: str) -> CompiledDFA:
+    """Compiles an automaton CSV to the binary format; NFAs are determinized first."""
+    compiled = load_dfa(csv_filename)
+    compiled.save(binary_filename)
+    return compiled
+
+def binary_to_csv(binary_filename: str, csv_filename: str, title: str = 'Minimized DFA') -> CompiledDFA:
+    """Streams a binary DFA back to the CSV layout."""
+    compiled = CompiledDFA.load(binary_filename)
+    compiled.to_csv(csv_filename, title)
+    return compiled
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert automata between the CSV layout and the binary DFA format.")
+    parser.add_argument('input', help="CSV automaton or binary DFA; the direction follows the input format")
+    parser.add_argument('output', help="file to write")
+    parser.add_argument('--title', default='Minimized DFA', help="name row written when converting to CSV")
+    args = parser.parse_args(argv)
+
+    try:
+        if is_binary(args.input):
+            compiled = binary_to_csv(args.input, args.output, args.title)
+        else:
+            compiled = csv_to_binary(args.input, args.output)
+    except (OSError, ValueError) as error:
+        # AutomatonFormatError is a ValueError and lists every bad row
+        sys.exit(f"Error: {error}")
+    print(f"{args.input} -> {args.output}: {len(compiled.states)} states, {len(compiled.symbols)} symbols", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
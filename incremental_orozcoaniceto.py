@@ -0,0 +1,546 @@
+from collections import Counter, defaultdict, deque
+from typing import Dict, List, Optional, Set, Tuple
+
+from automaton_orozcoaniceto import EPSILON, EPSILON_SYMBOLS
+from nfa2dfa_orozcoaniceto import refine_partition
+
+class IncrementalDFA:
+    """The determinized and minimized form of an NFA, kept up to date as the NFA is edited.
+
+    NFA states are bits in int bitsets, as in BitsetNFAToDFAConverter. An edit finds the NFA
+    states whose epsilon closure or symbol moves changed. Only the DFA subsets that contain one
+    of them are stepped again. Minimization then re-refines only the DFA states that can reach a
+    changed state. When those states form no cycle, each is matched, successors first, against an
+    index of the blocks by acceptance and successor blocks, so the rest of the DFA is never visited;
+    otherwise every other block takes part in the refinement as a single, already-minimal node.
+    """
+
+    def __init__(self, converter):
+        """Builds the DFA of an NFA already read by an NFAToDFAConverter (read_nfa_from_file)."""
+        self.state_names: List[str] = []
+        self.state_ids: Dict[str, int] = {}
+        self.symbols: List[str] = []
+        self.symbol_ids: Dict[str, int] = {}
+        self.epsilon: List[int] = []  # epsilon[state] is the bitset of direct epsilon successors
+        self.epsilon_predecessors: List[int] = []
+        self.delta: List[List[int]] = []  # delta[symbol][state] is the bitset of direct successors
+        self.predecessors: List[List[int]] = []  # predecessors[symbol][state] inverts delta
+        self.closures: List[int] = []
+        self.moves: List[List[int]] = []  # moves[symbol][state] is the epsilon-closed bitset reached on symbol
+        self.accept_mask = 0
+
+        # DFA states are subsets with stable integer ids; ids of unreachable subsets are dropped
+        self.subsets: Dict[int, int] = {}
+        self.subset_ids: Dict[int, int] = {}
+        self.names: Dict[int, str] = {}
+        self.successors: Dict[int, Dict[int, int]] = {}  # DFA id -> symbol id -> DFA id
+        self.dfa_predecessors: Dict[int, Counter] = {}  # DFA id -> Counter of source DFA ids
+        self.containing: Dict[int, Set[int]] = defaultdict(set)  # NFA state -> DFA ids whose subset contains it
+        self.next_id = 0
+
+        # Minimized DFA: blocks of DFA ids
+        self.blocks: Dict[int, Set[int]] = {}
+        self.block_of: Dict[int, int] = {}
+        self.signatures: Dict[tuple, int] = {}  # (accepting, (symbol, successor block) pairs) -> block id
+        self.signature_of: Dict[int, tuple] = {}
+        self.next_block = 0
+
+        self.start = self._state(converter.start_state)
+        for state in converter.accept_states:
+            self.accept_mask |= 1 << self._state(state)
+        for (state, symbol), next_states in converter.nfa_transitions.items():
+            for next_state in next_states:
+                self._link(self._state(state), symbol, self._state(next_state))
+        self.closures = [self._closure(state) for state in range(len(self.state_names))]
+        for sym_id in range(len(self.symbols)):
+            self.moves[sym_id] = [self._move(sym_id, state) for state in range(len(self.state_names))]
+
+        self.start_id = None
+        self.last_update = {}  # Work done by the last edit: subsets stepped, created and removed, states re-refined
+        self._update({}, start_changed=True, accept_changed=0)
+
+    # Editing
+
+    def add_transition(self, state: str, symbol: str, next_state: str):
+        """Adds the NFA transition state --symbol--> next_state and updates the DFA."""
+        self._edit(state, symbol, next_state, add=True)
+
+    def remove_transition(self, state: str, symbol: str, next_state: str):
+        """Removes the NFA transition state --symbol--> next_state and updates the DFA."""
+        self._edit(state, symbol, next_state, add=False)
+
+    def set_accepting(self, state: str, accepting: bool = True):
+        """Adds a state to, or removes it from, the NFA accept states and updates the DFA."""
+        bit = 1 << self._state(state)
+        if bool(self.accept_mask & bit) == accepting:
+            return
+        self.accept_mask ^= bit
+        self._update({}, start_changed=False, accept_changed=bit)
+
+    def _edit(self, state: str, symbol: str, next_state: str, add: bool):
+        source, target = self._state(state), self._state(next_state)
+        if self._is_epsilon(symbol):
+            if bool(self.epsilon[source] >> target & 1) == add:
+                return
+            # Only states that reach source through epsilon edges can change their closure
+            affected = self._epsilon_ancestors(source)
+            if add:
+                self._link(source, symbol, target)
+            else:
+                self._unlink(source, symbol, target)
+            changed = 0
+            for other in _bits(affected):
+                closure = self._closure(other)
+                if closure != self.closures[other]:
+                    self.closures[other] = closure
+                    changed |= 1 << other
+            # A changed closure changes the moves of every state with a symbol edge into it
+            dirty = {}
+            for sym_id in range(len(self.symbols)):
+                sources = 0
+                for other in _bits(changed):
+                    sources |= self.predecessors[sym_id][other]
+                mask = self._refresh_moves(sym_id, sources)
+                if mask:
+                    dirty[sym_id] = mask
+            self._update(dirty, start_changed=bool(changed >> self.start & 1), accept_changed=0)
+        else:
+            sym_id = self.symbol_ids.get(symbol)
+            if (sym_id is not None and bool(self.delta[sym_id][source] >> target & 1)) == add:
+                return
+            if add:
+                self._link(source, symbol, target)
+            else:
+                self._unlink(source, symbol, target)
+            sym_id = self.symbol_ids[symbol]
+            mask = self._refresh_moves(sym_id, 1 << source)
+            self._update({sym_id: mask} if mask else {}, start_changed=False, accept_changed=0)
+
+    # NFA bookkeeping
+
+    def _is_epsilon(self, symbol: str) -> bool:
+        return symbol == EPSILON or symbol in EPSILON_SYMBOLS
+
+    def _state(self, name: str) -> int:
+        state = self.state_ids.get(name)
+        if state is None:
+            state = self.state_ids[name] = len(self.state_names)
+            self.state_names.append(name)
+            self.epsilon.append(0)
+            self.epsilon_predecessors.append(0)
+            self.closures.append(1 << state)
+            for table in (*self.delta, *self.predecessors, *self.moves):
+                table.append(0)
+        return state
+
+    def _symbol(self, symbol: str) -> int:
+        sym_id = self.symbol_ids.get(symbol)
+        if sym_id is None:
+            sym_id = self.symbol_ids[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+            for tables in (self.delta, self.predecessors, self.moves):
+                tables.append([0] * len(self.state_names))
+        return sym_id
+
+    def _link(self, source: int, symbol: str, target: int):
+        if self._is_epsilon(symbol):
+            self.epsilon[source] |= 1 << target
+            self.epsilon_predecessors[target] |= 1 << source
+        else:
+            sym_id = self._symbol(symbol)
+            self.delta[sym_id][source] |= 1 << target
+            self.predecessors[sym_id][target] |= 1 << source
+
+    def _unlink(self, source: int, symbol: str, target: int):
+        if self._is_epsilon(symbol):
+            self.epsilon[source] &= ~(1 << target)
+            self.epsilon_predecessors[target] &= ~(1 << source)
+        else:
+            sym_id = self.symbol_ids[symbol]
+            self.delta[sym_id][source] &= ~(1 << target)
+            self.predecessors[sym_id][target] &= ~(1 << source)
+
+    def _closure(self, state: int) -> int:
+        closure = frontier = 1 << state
+        while frontier:
+            low = frontier & -frontier
+            frontier ^= low
+            new_states = self.epsilon[low.bit_length() - 1] & ~closure
+            closure |= new_states
+            frontier |= new_states
+        return closure
+
+    def _epsilon_ancestors(self, state: int) -> int:
+        ancestors = frontier = 1 << state
+        while frontier:
+            low = frontier & -frontier
+            frontier ^= low
+            new_states = self.epsilon_predecessors[low.bit_length() - 1] & ~ancestors
+            ancestors |= new_states
+            frontier |= new_states
+        return ancestors
+
+    def _move(self, sym_id: int, state: int) -> int:
+        move = 0
+        for target in _bits(self.delta[sym_id][state]):
+            move |= self.closures[target]
+        return move
+
+    def _refresh_moves(self, sym_id: int, states: int) -> int:
+        # Recomputes moves[sym_id] for a bitset of states; returns the states whose moves changed
+        changed = 0
+        moves = self.moves[sym_id]
+        for state in _bits(states):
+            move = self._move(sym_id, state)
+            if move != moves[state]:
+                moves[state] = move
+                changed |= 1 << state
+        return changed
+
+    def _step(self, subset: int, sym_id: int) -> int:
+        moves = self.moves[sym_id]
+        next_subset = 0
+        for state in _bits(subset):
+            next_subset |= moves[state]
+        return next_subset
+
+    # Subset construction
+
+    def _update(self, dirty: Dict[int, int], start_changed: bool, accept_changed: int):
+        # dirty[symbol] is the bitset of NFA states whose moves on symbol changed
+        changed: Set[int] = set()  # DFA ids whose successors or acceptance changed
+        created: List[int] = []
+        orphans: Set[int] = set()  # DFA ids that lost a predecessor
+
+        def intern(subset: int) -> int:
+            subset_id = self.subset_ids.get(subset)
+            if subset_id is None:
+                subset_id = self.subset_ids[subset] = self.next_id
+                self.next_id += 1
+                self.subsets[subset_id] = subset
+                self.names[subset_id] = '+'.join(sorted(self.state_names[state] for state in _bits(subset)))
+                self.successors[subset_id] = {}
+                self.dfa_predecessors[subset_id] = Counter()
+                for state in _bits(subset):
+                    self.containing[state].add(subset_id)
+                created.append(subset_id)
+            return subset_id
+
+        def set_successor(subset_id: int, sym_id: int, next_subset: int):
+            successors = self.successors[subset_id]
+            old_id = successors.get(sym_id)
+            new_id = intern(next_subset) if next_subset else None
+            if old_id == new_id:
+                return
+            if old_id is not None:
+                self.dfa_predecessors[old_id][subset_id] -= 1
+                if not self.dfa_predecessors[old_id][subset_id]:
+                    del self.dfa_predecessors[old_id][subset_id]
+                orphans.add(old_id)
+            if new_id is None:
+                del successors[sym_id]
+            else:
+                successors[sym_id] = new_id
+                self.dfa_predecessors[new_id][subset_id] += 1
+            changed.add(subset_id)
+
+        # Step the existing subsets that contain a state with changed moves, on the changed symbols only
+        touched: Set[int] = set()
+        for mask in dirty.values():
+            for state in _bits(mask):
+                touched |= self.containing.get(state, set())
+        for subset_id in sorted(touched):
+            subset = self.subsets[subset_id]
+            for sym_id, mask in dirty.items():
+                if subset & mask:
+                    set_successor(subset_id, sym_id, self._step(subset, sym_id))
+
+        if start_changed:
+            old_start = self.start_id
+            self.start_id = intern(self.closures[self.start])
+            if old_start is not None and old_start != self.start_id:
+                orphans.add(old_start)
+
+        # Fully expand the subsets seen for the first time
+        explored = 0
+        while explored < len(created):
+            subset_id = created[explored]
+            explored += 1
+            subset = self.subsets[subset_id]
+            for sym_id in range(len(self.symbols)):
+                set_successor(subset_id, sym_id, self._step(subset, sym_id))
+        created_ids = set(created)
+        changed -= created_ids
+
+        removed = self._collect_unreachable(orphans)
+        for state in _bits(accept_changed):
+            changed |= self.containing.get(state, set())
+        changed -= removed
+        created_ids -= removed
+        region = self._reminimize(changed | created_ids, removed)
+        self.last_update = {'stepped': len(touched), 'created': len(created_ids), 'removed': len(removed), 'reminimized': region}
+
+    def _collect_unreachable(self, orphans: Set[int]) -> Set[int]:
+        # Drops the DFA states that are no longer reachable from the start state. Only orphans can
+        # have become unreachable, so each is searched backwards for a state known to be reachable;
+        # if none turns up, the orphan and every ancestor it has left are unreachable, and their
+        # successors become orphans in turn. Once the searches add up to a quarter of the DFA, one
+        # forward walk from the start state settles the rest.
+        removed: Set[int] = set()
+        alive = {self.start_id}  # States known to be reachable
+        budget = len(self.subsets) // 4
+        stack = list(orphans)
+        while stack:
+            subset_id = stack.pop()
+            if subset_id in removed or subset_id in alive:
+                continue
+            if budget < 0:
+                return removed | self._drop_unreachable()
+            visited = self._search_reachable(subset_id, alive)
+            budget -= len(visited)
+            if subset_id in alive:
+                continue
+            removed |= visited
+            for dead_id in visited:
+                stack.extend(self._remove_subset(dead_id))
+        return removed
+
+    def _search_reachable(self, subset_id: int, alive: Set[int]) -> Set[int]:
+        # Breadth-first search backwards from subset_id for a state in alive; on success the path
+        # found joins alive. Returns every state visited, all of them ancestors of subset_id.
+        parent: Dict[int, Optional[int]] = {subset_id: None}
+        queue = deque(parent)
+        while queue:
+            current = queue.popleft()
+            for source in self.dfa_predecessors[current]:
+                if source in alive:
+                    while current is not None:
+                        alive.add(current)
+                        current = parent[current]
+                    return set(parent)
+                if source not in parent:
+                    parent[source] = current
+                    queue.append(source)
+        return set(parent)
+
+    def _drop_unreachable(self) -> Set[int]:
+        # Drops every DFA state a forward walk from the start state does not reach
+        reachable = {self.start_id}
+        stack = [self.start_id]
+        while stack:
+            for next_id in self.successors[stack.pop()].values():
+                if next_id not in reachable:
+                    reachable.add(next_id)
+                    stack.append(next_id)
+        removed = set(self.subsets) - reachable
+        for subset_id in removed:
+            self._remove_subset(subset_id)
+        return removed
+
+    def _remove_subset(self, subset_id: int) -> List[int]:
+        # Forgets one DFA state; returns the successors that lost it as a predecessor
+        subset = self.subsets.pop(subset_id)
+        del self.subset_ids[subset]
+        del self.names[subset_id]
+        del self.dfa_predecessors[subset_id]
+        for state in _bits(subset):
+            self.containing[state].discard(subset_id)
+        successors = list(self.successors.pop(subset_id).values())
+        for next_id in successors:
+            predecessors = self.dfa_predecessors.get(next_id)
+            if predecessors is not None:
+                predecessors[subset_id] -= 1
+                if not predecessors[subset_id]:
+                    del predecessors[subset_id]
+        return successors
+
+    # Minimization
+
+    def _reminimize(self, changed: Set[int], removed: Set[int]) -> int:
+        # Updates the blocks after an edit; returns the number of DFA states that were re-refined
+        for subset_id in removed:
+            self._leave_block(subset_id)
+
+        # Only states that can reach a changed state may change their right language
+        region = set(changed)
+        stack = list(changed)
+        while stack:
+            for source in self.dfa_predecessors[stack.pop()]:
+                if source not in region:
+                    region.add(source)
+                    stack.append(source)
+        if not region:
+            return 0
+
+        order = self._successors_first(region)
+        for subset_id in region:
+            self._leave_block(subset_id)
+        if order is not None:
+            self._join_by_signature(order)
+        else:
+            self._refine_region(region)
+        return len(region)
+
+    def _successors_first(self, region: Set[int]) -> Optional[List[int]]:
+        # Orders the region so that every state comes after its successors in the region, or
+        # returns None if the region has a cycle
+        order: List[int] = []
+        done: Set[int] = set()
+        for root in region:
+            if root in done:
+                continue
+            path = {root}
+            stack = [(root, iter(self.successors[root].values()))]
+            while stack:
+                subset_id, successors = stack[-1]
+                for next_id in successors:
+                    if next_id in path:
+                        return None
+                    if next_id in region and next_id not in done:
+                        path.add(next_id)
+                        stack.append((next_id, iter(self.successors[next_id].values())))
+                        break
+                else:
+                    stack.pop()
+                    path.discard(subset_id)
+                    done.add(subset_id)
+                    order.append(subset_id)
+        return order
+
+    def _signature(self, subset_id: int) -> tuple:
+        # Acceptance and the block reached on each symbol with a transition, which new symbols leave
+        # unchanged; two states of a minimized DFA are equivalent exactly when their signatures match
+        return (bool(self.subsets[subset_id] & self.accept_mask),
+                tuple(sorted((sym_id, self.block_of[next_id]) for sym_id, next_id in self.successors[subset_id].items())))
+
+    def _join_by_signature(self, order: List[int]):
+        # Places acyclic region states, successors first, in the block with their signature. This
+        # only looks at the blocks the region steps into, however large the DFA is.
+        for subset_id in order:
+            signature = self._signature(subset_id)
+            block_id = self.signatures.get(signature)
+            if block_id is None:
+                block_id = self._new_block(signature)
+            self.blocks[block_id].add(subset_id)
+            self.block_of[subset_id] = block_id
+
+    def _refine_region(self, region: Set[int]):
+        # Re-refines a region with cycles on the quotient graph: one node per region state, one
+        # per untouched block and a dead node
+        nodes = list(region)
+        node_of = {subset_id: node for node, subset_id in enumerate(nodes)}
+        atoms = []  # (block id, representative DFA id) of each untouched block
+        for block_id, block in self.blocks.items():
+            atoms.append((block_id, next(iter(block))))
+        dead = len(nodes) + len(atoms)
+        atom_of_block = {block_id: len(nodes) + atom for atom, (block_id, _) in enumerate(atoms)}
+
+        def node_of_target(subset_id: Optional[int]) -> int:
+            if subset_id is None:
+                return dead
+            node = node_of.get(subset_id)
+            return node if node is not None else atom_of_block[self.block_of[subset_id]]
+
+        inverse = [[[] for _ in range(dead + 1)] for _ in self.symbols]
+        members = nodes + [subset_id for _, subset_id in atoms]
+        for node, subset_id in enumerate(members):
+            successors = self.successors[subset_id]
+            for sym_id in range(len(self.symbols)):
+                inverse[sym_id][node_of_target(successors.get(sym_id))].append(node)
+        for sym_id in range(len(self.symbols)):
+            inverse[sym_id][dead].append(dead)
+
+        accepting, rejecting = set(), set()
+        for node, subset_id in enumerate(members):
+            (accepting if self.subsets[subset_id] & self.accept_mask else rejecting).add(node)
+        blocks = refine_partition(inverse, [block for block in (accepting, rejecting) if block] + [{dead}])
+
+        # Region states join the untouched block they are equivalent to, if any
+        created = []
+        for block in blocks:
+            region_nodes = [node for node in block if node < len(nodes)]
+            if not region_nodes:
+                continue
+            atom_nodes = [node for node in block if len(nodes) <= node < dead]
+            if atom_nodes:
+                block_id = atoms[atom_nodes[0] - len(nodes)][0]
+            else:
+                block_id = self.next_block
+                self.next_block += 1
+                self.blocks[block_id] = set()
+                created.append(block_id)
+            for node in region_nodes:
+                self.blocks[block_id].add(nodes[node])
+                self.block_of[nodes[node]] = block_id
+        for block_id in created:
+            signature = self._signature(next(iter(self.blocks[block_id])))
+            self.signatures[signature] = block_id
+            self.signature_of[block_id] = signature
+
+    def _new_block(self, signature: tuple) -> int:
+        block_id = self.next_block
+        self.next_block += 1
+        self.blocks[block_id] = set()
+        self.signatures[signature] = block_id
+        self.signature_of[block_id] = signature
+        return block_id
+
+    def _leave_block(self, subset_id: int):
+        # Takes a DFA state out of its block, dropping the block once it is empty
+        block_id = self.block_of.pop(subset_id, None)
+        if block_id is None:
+            return
+        block = self.blocks[block_id]
+        block.discard(subset_id)
+        if not block:
+            del self.blocks[block_id]
+            del self.signatures[self.signature_of.pop(block_id)]
+
+    # Export
+
+    def to_dfa(self):
+        """Returns the DFA as NFAToDFAConverter.nfa_to_dfa() would: transitions, start and '*'-marked accept states."""
+        dfa = defaultdict(list)
+        for subset_id, successors in self.successors.items():
+            for sym_id, next_id in successors.items():
+                dfa[(self.names[subset_id], self.symbols[sym_id])] = [self.names[next_id]]
+        accept_states = {'*' + self.names[subset_id] for subset_id, subset in self.subsets.items() if subset & self.accept_mask}
+        return dfa, self.names[self.start_id], accept_states
+
+    def to_minimized(self):
+        """Returns the minimized DFA as DFAMinimizer.minimize() would, with min() names as representatives."""
+        representative = {}
+        representative_states = {}
+        for block in self.blocks.values():
+            names = {self.names[subset_id] for subset_id in block}
+            name = min(names)
+            representative_states[name] = names
+            for subset_id in block:
+                representative[subset_id] = name
+        minimized_dfa = defaultdict(list)
+        for subset_id, successors in self.successors.items():
+            for sym_id, next_id in successors.items():
+                minimized_dfa[(representative[subset_id], self.symbols[sym_id])] = [representative[next_id]]
+        accept_states = {representative[subset_id] for subset_id, subset in self.subsets.items() if subset & self.accept_mask}
+        return minimized_dfa, representative[self.start_id], accept_states, representative_states
+
+    def transition_map(self) -> Dict[Tuple[str, str], List[str]]:
+        """The current NFA transitions keyed by (state, symbol), as in NFAToDFAConverter.nfa_transitions."""
+        transitions = defaultdict(list)
+        for state, name in enumerate(self.state_names):
+            for target in _bits(self.epsilon[state]):
+                transitions[(name, EPSILON)].append(self.state_names[target])
+            for sym_id, symbol in enumerate(self.symbols):
+                for target in _bits(self.delta[sym_id][state]):
+                    transitions[(name, symbol)].append(self.state_names[target])
+        return transitions
+
+    def accept_state_names(self) -> set:
+        return {self.state_names[state] for state in _bits(self.accept_mask)}
+
+def _bits(mask: int):
+    # Yields the positions of the set bits of mask
+    while mask:
+        low = mask & -mask
+        mask ^= low
+        yield low.bit_length() - 1
@@ -0,0 +1,114 @@
+import os
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+
+STATS_ENV = 'NFA_STATS'  # Report destination: a JSON file path, or '-' for stderr
+PROFILE_ENV = 'NFA_PROFILE'  # cProfile/pstats dump path
+
+_NO_PHASE = nullcontext()
+
+class Stats:
+    """Counters, phase timings and samples collected by the converters and minimizers.
+
+    Everything is a no-op until `enabled` is set. Per-call counters in hot paths check
+    the flag inline before touching the class, so disabled runs pay almost nothing.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.reset()
+
+    def reset(self):
+        self.counters = defaultdict(int)
+        self.phases = defaultdict(lambda: [0.0, 0])  # name -> [seconds, calls]
+        self.samples = defaultdict(list)
+
+    def count(self, name: str, amount: int = 1):
+        if self.enabled:
+            self.counters[name] += amount
+
+    def observe(self, name: str, value: float):
+        """Records one sample, such as the number of blocks after a refinement round."""
+        if self.enabled:
+            self.samples[name].append(value)
+
+    def phase(self, name: str):
+        """Context manager that adds the wall-clock time of its body to a named phase."""
+        return self._timed(name) if self.enabled else _NO_PHASE
+
+    def clock(self) -> float:
+        """Start time for lap(); 0.0 while disabled."""
+        return time.perf_counter() if self.enabled else 0.0
+
+    def lap(self, name: str, started: float) -> float:
+        """Adds the time since `started` to a phase and returns the current time for the next lap."""
+        if not self.enabled:
+            return 0.0
+        now = time.perf_counter()
+        phase = self.phases[name]
+        phase[0] += now - started
+        phase[1] += 1
+        return now
+
+    @contextmanager
+    def _timed(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            phase = self.phases[name]
+            phase[0] += time.perf_counter() - started
+            phase[1] += 1
+
+    def report(self) -> dict:
+        """Returns the collected statistics as a JSON-serializable dictionary."""
+        return {
+            'counters': dict(sorted(self.counters.items())),
+            'phases': {name: {'seconds': seconds, 'calls': calls} for name, (seconds, calls) in sorted(self.phases.items())},
+            'samples': {name: {'count': len(values), 'min': min(values), 'max': max(values), 'mean': sum(values) / len(values), 'values': values[:100]}
+                        for name, values in sorted(self.samples.items())},
+        }
+
+    def write(self, destination: str):
+        """Writes the report as JSON to a file, or to stderr when destination is '-'."""
+        import json
+        text = json.dumps(self.report(), indent=2)
+        if destination == '-':
+            print(text, file=sys.stderr)
+        else:
+            with open(destination, 'w') as file:
+                file.write(text + '\n')
+
+STATS = Stats(bool(os.environ.get(STATS_ENV)))
+
+@contextmanager
+def instrumented(stats_path: str | None = None, profile_path: str | None = None):
+    """Collects statistics and an optional profile for the enclosed run.
+
+    Arguments left as None fall back to the NFA_STATS and NFA_PROFILE environment
+    variables; with neither set, the body runs uninstrumented.
+    """
+    stats_path = stats_path or os.environ.get(STATS_ENV)
+    profile_path = profile_path or os.environ.get(PROFILE_ENV)
+    was_enabled = STATS.enabled
+    if stats_path:
+        STATS.reset()
+        STATS.enabled = True
+    profiler = None
+    if profile_path:
+        import cProfile  # Only loaded when a profile is requested
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        with STATS.phase('total'):
+            yield STATS
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(profile_path)
+            print(f"Profile saved to {profile_path} (view with python -m pstats)", file=sys.stderr)
+        if stats_path:
+            STATS.write(stats_path)
+            STATS.enabled = was_enabled
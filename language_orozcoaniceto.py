@@ -0,0 +1,230 @@
+import argparse
+import sys
+from operator import mul
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from algebra_orozcoaniceto import compile_regex, minimize
+from convert_orozcoaniceto import load_dfa
+from match_orozcoaniceto import CompiledDFA
+from nfa2dfa_orozcoaniceto import MINIMIZERS
+
+# Questions about the language of a DFA that never list paths: the shortest accepted
+# string, the number of accepted strings of a given length, and the accepted strings in
+# shortlex order (shorter strings first, strings of equal length in alphabetical order).
+# Strings are over the DFA's own alphabet; states that cannot reach an accept state are
+# left out of every search.
+
+def _moves(compiled: CompiledDFA) -> List[List[Tuple[str, int]]]:
+    # Per state, the (symbol, next state) pairs that do not lead to the dead state, in symbol order
+    table, width, dead = compiled.table, compiled.width, compiled.dead
+    return [[(symbol, table[state * width + column]) for column, symbol in enumerate(compiled.symbols)
+             if table[state * width + column] != dead] for state in range(dead)]
+
+def _live_states(moves: List[List[Tuple[str, int]]], accepting) -> int:
+    # Bitmask of the states from which an accept state can be reached
+    predecessors = [[] for _ in moves]
+    for state, edges in enumerate(moves):
+        for _, next_state in edges:
+            predecessors[next_state].append(state)
+    stack = [state for state in range(len(moves)) if accepting[state]]
+    live = sum(1 << state for state in stack)
+    while stack:
+        for state in predecessors[stack.pop()]:
+            if not live >> state & 1:
+                live |= 1 << state
+                stack.append(state)
+    return live
+
+def shortest_accepted(compiled: CompiledDFA) -> Optional[str]:
+    """Returns the shortlex-first accepted string, or None if the DFA accepts nothing.
+
+    Breadth-first search that tries symbols in alphabetical order, so the first accept state
+    reached is reached by the alphabetically smallest of the shortest strings.
+    """
+    moves = _moves(compiled)
+    parents: Dict[int, Tuple[int, str]] = {compiled.start: (-1, '')}
+    queue = [compiled.start] if compiled.start != compiled.dead else []
+    for state in queue:  # queue grows while it is walked
+        if compiled.accepting[state]:
+            symbols = []
+            while state != compiled.start:
+                state, symbol = parents[state]
+                symbols.append(symbol)
+            return ''.join(reversed(symbols))
+        for symbol, next_state in moves[state]:
+            if next_state not in parents:
+                parents[next_state] = (state, symbol)
+                queue.append(next_state)
+    return None
+
+def count_accepted(compiled: CompiledDFA, length: int, modulus: Optional[int] = None) -> int:
+    """Returns how many strings of exactly `length` symbols the DFA accepts, optionally modulo `modulus`.
+
+    Counts are exact Python integers. Short lengths use one dynamic-programming pass per
+    symbol; long ones raise the transition-count matrix to the power `length` by repeated
+    squaring, which takes O(states^3 log length) arithmetic operations. Without a modulus the
+    result has up to length * log2(alphabet size) bits, so very large lengths need one.
+    """
+    if length < 0:
+        raise ValueError("length must not be negative")
+    moves = _moves(compiled)
+    if compiled.start == compiled.dead:
+        return 0
+    live = _live_states(moves, compiled.accepting)
+    if not live >> compiled.start & 1:
+        return 0
+
+    # Number the live states reachable from the start, and count parallel edges between them
+    states = [compiled.start]
+    index = {compiled.start: 0}
+    for state in states:  # states grows while it is walked
+        for _, next_state in moves[state]:
+            if live >> next_state & 1 and next_state not in index:
+                index[next_state] = len(states)
+                states.append(next_state)
+    size = len(states)
+    edges: List[Dict[int, int]] = [{} for _ in range(size)]  # edges[i][j] is the number of symbols from i to j
+    for position, state in enumerate(states):
+        for _, next_state in moves[state]:
+            if next_state in index:
+                target = index[next_state]
+                edges[position][target] = edges[position].get(target, 0) + 1
+    finals = [position for position, state in enumerate(states) if compiled.accepting[state]]
+
+    num_edges = sum(len(row) for row in edges)
+    if length * num_edges <= size ** 3 * length.bit_length():
+        counts = [1] + [0] * (size - 1)
+        for _ in range(length):
+            next_counts = [0] * size
+            for position, count in enumerate(counts):
+                if count:
+                    for target, multiplicity in edges[position].items():
+                        next_counts[target] += count * multiplicity
+            counts = [count % modulus for count in next_counts] if modulus else next_counts
+    else:
+        counts = _vector_matrix_power([1] + [0] * (size - 1), edges, length, modulus)
+    total = sum(counts[position] for position in finals)
+    return total % modulus if modulus else total
+
+def _vector_matrix_power(vector: List[int], edges: List[Dict[int, int]], exponent: int, modulus: Optional[int]) -> List[int]:
+    # vector * M^exponent by repeated squaring, where M[i][j] = edges[i].get(j, 0)
+    size = len(vector)
+    matrix = [[row.get(column, 0) for column in range(size)] for row in edges]
+    while exponent:
+        if exponent & 1:
+            vector = [sum(map(mul, vector, column)) for column in zip(*matrix)]
+            if modulus:
+                vector = [value % modulus for value in vector]
+        exponent >>= 1
+        if exponent:
+            columns = list(zip(*matrix))
+            matrix = [[sum(map(mul, row, column)) for column in columns] for row in matrix]
+            if modulus:
+                matrix = [[value % modulus for value in row] for row in matrix]
+    return vector
+
+def accepted_strings(compiled: CompiledDFA) -> Iterator[str]:
+    """Yields every accepted string in shortlex order; the iterator ends only if the language is finite.
+
+    Strings are produced one length at a time by depth-first search in alphabetical order.
+    The search only enters states that reach an accept state in exactly the number of symbols
+    still to be read, so it never backtracks out of a dead end and each string costs
+    O(length * alphabet size).
+    """
+    moves = _moves(compiled)
+    if compiled.start == compiled.dead:
+        return
+    accepting = sum(1 << state for state in range(compiled.dead) if compiled.accepting[state])
+    live = _live_states(moves, compiled.accepting)
+    predecessors = [0] * compiled.dead
+    for state, edges in enumerate(moves):
+        for _, next_state in edges:
+            predecessors[next_state] |= 1 << state
+
+    def step_back(mask: int) -> int:
+        result = 0
+        while mask:
+            low = mask & -mask
+            result |= predecessors[low.bit_length() - 1]
+            mask ^= low
+        return result
+
+    finishing = [accepting]  # finishing[r]: states with a path of exactly r symbols to an accept state
+    reachable = (1 << compiled.start) & live  # Live states reachable in exactly `length` symbols
+    length = 0
+    while reachable:
+        while len(finishing) <= length:
+            finishing.append(step_back(finishing[-1]))
+        if finishing[length] >> compiled.start & 1:
+            yield from _strings_of_length(moves, compiled.start, length, finishing)
+        next_reachable = 0
+        for state in range(compiled.dead):
+            if reachable >> state & 1:
+                for _, next_state in moves[state]:
+                    next_reachable |= 1 << next_state
+        reachable = next_reachable & live
+        length += 1
+
+def _strings_of_length(moves, start: int, length: int, finishing: List[int]) -> Iterator[str]:
+    # Depth-first search in alphabetical order with an explicit stack, so long strings do not recurse
+    if length == 0:
+        yield ''
+        return
+    symbols: List[str] = []
+    iterators = [iter(moves[start])]
+    while iterators:
+        remaining = length - len(iterators)  # Symbols still to read after the next one
+        for symbol, next_state in iterators[-1]:
+            if finishing[remaining] >> next_state & 1:
+                symbols.append(symbol)
+                if remaining == 0:
+                    yield ''.join(symbols)
+                    symbols.pop()
+                    continue
+                iterators.append(iter(moves[next_state]))
+                break
+        else:
+            iterators.pop()
+            if symbols:
+                symbols.pop()
+
+def first_accepted(compiled: CompiledDFA, count: int) -> List[str]:
+    """Returns the first `count` accepted strings in shortlex order (fewer if the language is smaller)."""
+    return list(islice(accepted_strings(compiled), count))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Shortest accepted string, counts by length and shortlex enumeration of an automaton's language.")
+    parser.add_argument('automaton', help="NFA or DFA CSV file, binary .dfa file, or a regex with --regex")
+    parser.add_argument('--regex', action='store_true', help="the automaton argument is a regex")
+    parser.add_argument('--minimization', choices=sorted(MINIMIZERS), default='hopcroft', help="minimizer applied before answering")
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('shortest', help="print the shortlex-first accepted string")
+    count = commands.add_parser('count', help="print the number of accepted strings of each given length")
+    count.add_argument('lengths', type=int, nargs='+')
+    count.add_argument('--modulus', type=int, help="report counts modulo this number, for lengths too large for exact counts")
+    first = commands.add_parser('first', help="print the first K accepted strings in shortlex order, one per line")
+    first.add_argument('k', type=int)
+    args = parser.parse_args(argv)
+
+    try:
+        compiled = compile_regex(args.automaton) if args.regex else load_dfa(args.automaton, quiet=True)
+    except (OSError, ValueError) as error:
+        sys.exit(f"Error: {error}")
+    compiled = minimize(compiled, args.minimization)
+
+    if args.command == 'shortest':
+        shortest = shortest_accepted(compiled)
+        if shortest is None:
+            print("the language is empty")
+            sys.exit(1)
+        print(repr(shortest))
+    elif args.command == 'count':
+        for length in args.lengths:
+            print(f"{length}\t{count_accepted(compiled, length, args.modulus)}")
+    else:
+        for string in islice(accepted_strings(compiled), args.k):
+            print(string)
+
+if __name__ == "__main__":
+    main()
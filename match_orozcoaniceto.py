@@ -0,0 +1,427 @@
+import mmap
+import struct
+import sys
+from array import array
+from collections import defaultdict
+from itertools import islice
+from typing import Iterable, Iterator, List, Tuple
+
+from automaton_orozcoaniceto import Automaton, write_transitions_csv
+from instrument_orozcoaniceto import STATS, instrumented
+from nfa2dfa_orozcoaniceto import CONVERTERS, MINIMIZERS, BitsetNFAToDFAConverter
+
+FORMAT_MAGIC = b'CDFA'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sIIIII')  # magic, version, states, symbols, start, name bytes
+
+class CompiledDFA:
+    """A DFA compiled into a dense row-major transition table with an explicit dead state."""
+
+    def __init__(self, states: List[str], symbols: List[str], table: array, start: int, accepting: bytearray):
+        self.states = states  # State names; the dead state is the extra last row
+        self.symbols = symbols  # Alphabet; the extra last column is for unknown symbols
+        self.table = table  # table[state * width + column] is the next state
+        self.start = start
+        self.accepting = accepting  # accepting[state] is 1 for accept states
+        self.width = len(symbols) + 1
+        self.dead = len(states)
+        self.columns = {symbol: column for column, symbol in enumerate(symbols)}
+        self._column_lookups = {}  # NumPy code point -> column tables, by table size
+
+    @classmethod
+    def from_dfa(cls, dfa, start_state, accept_states):
+        """Compiles DFA transitions keyed by (state, symbol) into a dense table."""
+        accept_names = {state.lstrip('*') for state in accept_states}
+        states = sorted({state for state, _ in dfa} | {next_state for next_states in dfa.values() for next_state in next_states} | {start_state})
+        state_ids = {state: idx for idx, state in enumerate(states)}
+        symbols = sorted({symbol for _, symbol in dfa})
+        symbol_ids = {symbol: idx for idx, symbol in enumerate(symbols)}
+        width, dead = len(symbols) + 1, len(states)
+
+        table = array('i', [dead]) * ((dead + 1) * width)
+        for (state, symbol), next_states in dfa.items():
+            if next_states:
+                table[state_ids[state] * width + symbol_ids[symbol]] = state_ids[next_states[0]]
+        accepting = bytearray(state in accept_names for state in states) + bytearray(1)
+        return cls(states, symbols, table, state_ids[start_state], accepting)
+
+    def to_dfa(self):
+        """Expands the table back into DFA transitions keyed by (state, symbol)."""
+        dfa = defaultdict(list)
+        for state_id, state in enumerate(self.states):
+            row = state_id * self.width
+            for column, symbol in enumerate(self.symbols):
+                next_id = self.table[row + column]
+                if next_id != self.dead:
+                    dfa[(state, symbol)] = [self.states[next_id]]
+        accept_states = {state for state_id, state in enumerate(self.states) if self.accepting[state_id]}
+        return dfa, self.states[self.start], accept_states
+
+    def to_bytes(self) -> bytes:
+        """Serializes the DFA as a header, a name block, an int32 table and accept flags."""
+        return b''.join(self._chunks())
+
+    def _chunks(self) -> Iterator:
+        # The binary form in pieces; the table is yielded as a buffer rather than copied
+        names = '\n'.join(self.states + self.symbols).encode('utf-8')
+        padding = -(HEADER.size + len(names)) % 4  # Keep the table 4-byte aligned for memory mapping
+        yield HEADER.pack(FORMAT_MAGIC, FORMAT_VERSION, len(self.states), len(self.symbols), self.start, len(names))
+        yield names + bytes(padding)
+        if sys.byteorder != 'little':
+            table = array('i', self.table)
+            table.byteswap()
+            yield table
+        else:
+            yield self.table
+        yield bytes(self.accepting)
+
+    @classmethod
+    def from_buffer(cls, buffer):
+        """Loads a DFA written by to_bytes; the table is a zero-copy view of the buffer where possible."""
+        view = memoryview(buffer)
+        if len(view) < HEADER.size:
+            raise ValueError("Truncated compiled DFA")
+        magic, version, num_states, num_symbols, start, name_size = HEADER.unpack_from(view)
+        if magic != FORMAT_MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported compiled DFA format {magic!r} version {version}")
+        offset = HEADER.size
+        table_offset = offset + name_size + (-(HEADER.size + name_size) % 4)
+        table_size = (num_states + 1) * (num_symbols + 1) * 4
+        # Every size is checked against the header before anything is decoded or cast
+        if len(view) != table_offset + table_size + num_states + 1:
+            raise ValueError("Truncated compiled DFA")
+        if start > num_states:
+            raise ValueError(f"Compiled DFA start state {start} is out of range")
+        names = bytes(view[offset:offset + name_size]).decode('utf-8').split('\n') if name_size else []
+        offset = table_offset
+        if sys.byteorder == 'little':
+            table = view[offset:offset + table_size].cast('i')
+        else:
+            table = array('i', view[offset:offset + table_size])
+            table.byteswap()
+        accepting = view[offset + table_size:]
+        if len(names) != num_states + num_symbols:
+            raise ValueError("Corrupt compiled DFA name block")
+        return cls(names[:num_states], names[num_states:], table, start, accepting)
+
+    def save(self, filename: str):
+        """Writes the binary form of the DFA to a file."""
+        with open(filename, 'wb') as file:
+            for chunk in self._chunks():
+                file.write(chunk)
+
+    @classmethod
+    def load(cls, filename: str):
+        """Memory-maps a file written by save and loads the DFA from it."""
+        with open(filename, 'rb') as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        compiled = cls.from_buffer(mapped)
+        compiled.mapped = mapped  # Keep the mapping alive as long as the table views it
+        return compiled
+
+    @classmethod
+    def from_automaton(cls, automaton: Automaton):
+        """Compiles a deterministic Automaton (such as a DFA CSV read by load_automaton) without an intermediate dict."""
+        num_states, width = automaton.num_states, len(automaton.symbols) + 1
+        if any(automaton.offsets[:num_states + 1]):
+            raise ValueError(f"{automaton.name or 'automaton'} has epsilon transitions and is not a DFA")
+        table = array('i', [num_states]) * ((num_states + 1) * width)
+        for state, slot, next_state in automaton.edges():
+            position = state * width + slot - 1
+            if table[position] != num_states and table[position] != next_state:
+                raise ValueError(f"{automaton.name or 'automaton'} is not a DFA: state {automaton.state_names[state]!r} "
+                                 f"has several transitions on {automaton.symbol_name(slot)!r}")
+            table[position] = next_state
+        return cls(list(automaton.state_names), list(automaton.symbols), table, automaton.start, bytearray(automaton.accepting) + bytearray(1))
+
+    def transitions(self) -> Iterator[Tuple[str, str, str]]:
+        """Yields every (state, symbol, next_state) of the table, skipping the dead state."""
+        table, width, dead, states, symbols = self.table, self.width, self.dead, self.states, self.symbols
+        for state_id, state in enumerate(states):
+            row = state_id * width
+            for column, symbol in enumerate(symbols):
+                next_id = table[row + column]
+                if next_id != dead:
+                    yield state, symbol, states[next_id]
+
+    def to_csv(self, filename: str, title: str = 'Minimized DFA'):
+        """Streams the DFA to a CSV file in the layout written by DFAMinimizer.write_minimized_dfa_to_file."""
+        marked = {state: '*' + state if self.accepting[state_id] else state for state_id, state in enumerate(self.states)}
+        marked_states = [marked[state] for state in self.states]
+        accept_states = sorted(state for state in marked_states if state[:1] == '*')
+        import csv
+        with open(filename, 'w', newline='', buffering=1 << 20) as file:
+            writer = csv.writer(file)
+            writer.writerow([f'{title},,,'])
+            writer.writerow(marked_states + [''] * (4 - len(marked_states)))
+            writer.writerow(self.symbols + [''] * (3 - len(self.symbols)))
+            writer.writerow([marked[self.states[self.start]]] + [''] * 3)
+            writer.writerow(accept_states + [''] * (4 - len(accept_states)))
+            write_transitions_csv(file, self.transitions(), marked, self.symbols)
+
+    def final_state(self, string: str) -> int:
+        """Returns the state reached after reading the string, or the dead state."""
+        table, width, dead, unknown = self.table, self.width, self.dead, self.width - 1
+        columns = self.columns
+        state = self.start
+        for char in string:
+            state = table[state * width + columns.get(char, unknown)]
+            if state == dead:
+                return dead
+        return state
+
+    def matches(self, string: str) -> bool:
+        """Returns True if the DFA accepts the string."""
+        return bool(self.accepting[self.final_state(string)])
+
+    def match_many(self, strings: Iterable[str]) -> Iterator[bool]:
+        """Lazily matches a stream of strings."""
+        return map(self.matches, strings)
+
+    def match_batch_numpy(self, strings: List[str]) -> List[bool]:
+        """Matches a batch of equal-length strings at once with NumPy."""
+        import numpy as np  # Optional dependency, only needed for vectorized batches
+
+        if not strings:
+            return []
+        length = len(strings[0])
+        if any(len(string) != length for string in strings):
+            raise ValueError("match_batch_numpy requires strings of equal length")
+
+        # One code unit per character: Latin-1 bytes when every character fits, UTF-32 otherwise.
+        # A lookup table indexed by code point then turns all of them into columns in one step.
+        joined = ''.join(strings)
+        try:
+            codes = np.frombuffer(joined.encode('latin-1'), dtype=np.uint8)
+        except UnicodeEncodeError:
+            codes = np.frombuffer(joined.encode('utf-32-le'), dtype=np.uint32)
+        columns = self._column_lookup(np, 256 if codes.dtype == np.uint8 else 0x110000)[codes].reshape(len(strings), length)
+
+        table = np.frombuffer(self.table, dtype=np.int32).reshape(self.dead + 1, self.width)
+        states = np.full(len(strings), self.start, dtype=np.intp)
+        for position in range(length):
+            states = table[states, columns[:, position]]
+        return np.frombuffer(self.accepting, dtype=np.uint8)[states].astype(bool).tolist()
+
+    def _column_lookup(self, np, size: int):
+        # Column of every code point below size (the unknown column for characters outside the alphabet), built once per size
+        lookup = self._column_lookups.get(size)
+        if lookup is None:
+            lookup = np.full(size, self.width - 1, dtype=np.intp)
+            for symbol, column in self.columns.items():
+                if len(symbol) == 1 and ord(symbol) < size:
+                    lookup[ord(symbol)] = column
+            self._column_lookups[size] = lookup
+        return lookup
+
+class LazyDFAMatcher:
+    """Matches strings by building DFA states on demand from an NFA read by a BitsetNFAToDFAConverter.
+
+    Each (subset, symbol) transition is computed the first time a string needs it and memoized.
+    When more than max_states subsets are cached the whole cache is flushed; a string that causes
+    more than max_flushes flushes finishes with plain state-set simulation instead.
+    """
+
+    DEAD = -1
+
+    def __init__(self, converter: BitsetNFAToDFAConverter, max_states: int = 10000, max_flushes: int = 3):
+        converter.index_nfa()
+        self.converter = converter
+        self.max_states = max_states
+        self.max_flushes = max_flushes
+        self.accept_mask = 0
+        for state in converter.accept_states:
+            if state in converter.state_ids:
+                self.accept_mask |= 1 << converter.state_ids[state]
+        self.start_subset = converter.closures[converter.state_ids[converter.start_state]]
+        self.flushes = 0  # Number of times the state cache was cleared
+        self.fallbacks = 0  # Number of strings finished by set simulation
+        self._reset()
+
+    def _reset(self):
+        # Drop every cached subset state and start again from the start subset
+        self.subset_ids = {}
+        self.subsets = []
+        self.transitions = []  # transitions[state] maps a symbol to a state id or DEAD
+        self.accepting = []
+        self.start = self._add(self.start_subset)
+
+    def _add(self, subset):
+        state = self.subset_ids[subset] = len(self.subsets)
+        self.subsets.append(subset)
+        self.transitions.append({})
+        self.accepting.append(bool(subset & self.accept_mask))
+        return state
+
+    def matches(self, string: str) -> bool:
+        """Returns True if the NFA accepts the string."""
+        symbol_ids, step = self.converter.symbol_ids, self.converter.step
+        state, flushes = self.start, 0
+        for position, char in enumerate(string):
+            next_state = self.transitions[state].get(char)
+            if next_state is None:
+                sym_id = symbol_ids.get(char)
+                subset = step(self.subsets[state], sym_id) if sym_id is not None else 0
+                if not subset:
+                    self.transitions[state][char] = self.DEAD
+                    return False
+                next_state = self.subset_ids.get(subset)
+                if next_state is None:
+                    if len(self.subsets) >= self.max_states:
+                        self._reset()
+                        self.flushes += 1
+                        flushes += 1
+                        if flushes > self.max_flushes:
+                            # The cache is thrashing; finish this string without memoizing
+                            self.fallbacks += 1
+                            return self._simulate(subset, string[position + 1:])
+                        # The current state was flushed too, so its transition is not recorded
+                        state = self.subset_ids.get(subset)
+                        if state is None:
+                            state = self._add(subset)
+                        continue
+                    next_state = self._add(subset)
+                self.transitions[state][char] = next_state
+            elif next_state == self.DEAD:
+                return False
+            state = next_state
+        return self.accepting[state]
+
+    def _simulate(self, subset, string: str) -> bool:
+        # Plain bitset state-set simulation, used when the cache thrashes
+        symbol_ids, step = self.converter.symbol_ids, self.converter.step
+        for char in string:
+            sym_id = symbol_ids.get(char)
+            if sym_id is None:
+                return False
+            subset = step(subset, sym_id)
+            if not subset:
+                return False
+        return bool(subset & self.accept_mask)
+
+    def match_many(self, strings: Iterable[str]) -> Iterator[bool]:
+        """Lazily matches a stream of strings."""
+        return map(self.matches, strings)
+
+    def stats(self) -> dict:
+        """Returns the number of cached states, cache flushes and simulation fallbacks."""
+        return {'states': len(self.subsets), 'flushes': self.flushes, 'fallbacks': self.fallbacks}
+
+def compile_nfa(filename: str, engine: str = 'bitset', minimization: str = 'hopcroft', cache=None) -> CompiledDFA:
+    """Reads an NFA CSV, determinizes and minimizes it, and compiles the result."""
+    converter = CONVERTERS[engine](filename)
+    converter.read_nfa_from_file()
+    if cache is not None:
+        key = cache.key(converter)
+        compiled = cache.get(key, 'minimized')
+        if compiled is None:
+            compiled = compile_converter(converter, minimization)
+            cache.put(key, 'minimized', compiled)
+        return compiled
+    return compile_converter(converter, minimization)
+
+def compile_converter(converter, minimization: str = 'hopcroft') -> CompiledDFA:
+    """Determinizes and minimizes an NFA already read by a converter, and compiles the result."""
+    dfa, dfa_start_state, dfa_accept_states = converter.nfa_to_dfa()
+    minimizer = MINIMIZERS[minimization](dfa, dfa_start_state, dfa_accept_states)
+    minimized_dfa, minimized_start_state, minimized_accept_states, _ = minimizer.minimize()
+    return CompiledDFA.from_dfa(minimized_dfa, minimized_start_state, minimized_accept_states)
+
+def read_strings(file) -> Iterator[str]:
+    """Yields one test string per input line, without the line terminator."""
+    for line in file:
+        yield line.rstrip('\r\n')
+
+def batched(strings: Iterable[str], batch_size: int) -> Iterator[List[str]]:
+    """Groups a stream of strings into lists of at most batch_size strings."""
+    iterator = iter(strings)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+def match_batches(compiled: CompiledDFA, batches: Iterable[List[str]], use_numpy: bool = False) -> Iterator[Tuple[List[str], List[bool]]]:
+    """Matches each batch and yields it with its results, vectorizing groups of equal-length strings when use_numpy is set."""
+    for batch in batches:
+        if not use_numpy:
+            yield batch, list(compiled.match_many(batch))
+            continue
+        by_length = {}
+        for position, string in enumerate(batch):
+            by_length.setdefault(len(string), []).append(position)
+        results = [False] * len(batch)
+        for positions in by_length.values():
+            for position, result in zip(positions, compiled.match_batch_numpy([batch[position] for position in positions])):
+                results[position] = result
+        yield batch, results
+
+def write_results(matched: Iterable[Tuple[List[str], List[bool]]], output_file) -> Tuple[int, int]:
+    """Writes one 'accept'/'reject' line per string of each matched batch; returns (accepted, total)."""
+    accepted = total = 0
+    for batch, results in matched:
+        output_file.write(''.join(f"{'accept' if result else 'reject'}\t{string}\n" for string, result in zip(batch, results)))
+        accepted += sum(results)
+        total += len(batch)
+    return accepted, total
+
+def run(compiled, input_file, output_file, batch_size: int = 65536, use_numpy: bool = False):
+    """Streams strings from input_file through a CompiledDFA or LazyDFAMatcher and writes one 'accept'/'reject' line per string."""
+    batches = batched(read_strings(input_file), batch_size)
+    return write_results(match_batches(compiled, batches, use_numpy), output_file)
+
+def main(argv=None):
+    import argparse  # Only the command line needs it; library users skip the import
+    parser = argparse.ArgumentParser(description="Classify strings against an NFA compiled to a minimized DFA table.")
+    parser.add_argument('nfa', help="NFA CSV file")
+    parser.add_argument('-i', '--input', help="file with one string per line (default: stdin)")
+    parser.add_argument('-o', '--output', help="file for accept/reject results (default: stdout)")
+    parser.add_argument('--batch-size', type=int, default=65536, help="strings matched and written per batch")
+    parser.add_argument('--numpy', action='store_true', help="vectorize equal-length strings with NumPy")
+    parser.add_argument('--cache-dir', help="reuse compiled automata stored in this directory")
+    parser.add_argument('--lazy', action='store_true', help="build DFA states on demand instead of compiling the full DFA")
+    parser.add_argument('--max-states', type=int, default=10000, help="DFA states cached by --lazy before the cache is flushed")
+    parser.add_argument('--stats', metavar='FILE', help="write counters and phase timings as JSON ('-' for stderr; env NFA_STATS)")
+    parser.add_argument('--profile', metavar='FILE', help="write a cProfile/pstats dump of the run (env NFA_PROFILE)")
+    args = parser.parse_args(argv)
+    if args.lazy and args.numpy:
+        parser.error("--lazy cannot be combined with --numpy")
+    with instrumented(args.stats, args.profile):
+        classify(args)
+
+def classify(args):
+    """Compiles the NFA named by the parsed arguments and classifies the input strings."""
+
+    cache = None
+    if args.cache_dir:
+        from cache_orozcoaniceto import CompiledDFACache
+        cache = CompiledDFACache(args.cache_dir)
+    with STATS.phase('compile'):
+        if args.lazy:
+            converter = BitsetNFAToDFAConverter(args.nfa)
+            converter.read_nfa_from_file()
+            compiled = LazyDFAMatcher(converter, args.max_states)
+        else:
+            compiled = compile_nfa(args.nfa, cache=cache)
+    input_file = open(args.input, buffering=1 << 20) if args.input else sys.stdin
+    output_file = open(args.output, 'w', buffering=1 << 20) if args.output else sys.stdout
+    try:
+        with STATS.phase('match'):
+            accepted, total = run(compiled, input_file, output_file, args.batch_size, args.numpy)
+    finally:
+        if args.input:
+            input_file.close()
+        if args.output:
+            output_file.close()
+    print(f"{accepted} of {total} strings accepted", file=sys.stderr)
+    STATS.count('strings_matched', total)
+    STATS.count('strings_accepted', accepted)
+    if args.lazy:
+        for name, value in compiled.stats().items():
+            STATS.count(f'lazy_{name}', value)
+    if cache is not None:
+        for name, value in cache.stats().items():
+            STATS.count(f'cache_{name}', value)
+
+if __name__ == "__main__":
+    main()
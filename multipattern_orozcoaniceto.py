@@ -0,0 +1,66 @@
+import argparse
+import sys
+from typing import List, Tuple
+
+from match_orozcoaniceto import CompiledDFA, batched, read_strings
+from nfa2dfa_orozcoaniceto import MINIMIZERS, BitsetNFAToDFAConverter
+from regex2nfa_orozcoaniceto import NFA
+
+class MultiPatternMatcher:
+    """Matches a string against many regexes at once through one combined, minimized DFA.
+
+    Every accept state of the combined NFA is tagged with its pattern id. The tags are carried
+    into the DFA as the set of pattern ids of each subset, and the minimizer never merges DFA
+    states with different sets, so one pass over a string reports every matching pattern.
+    """
+
+    def __init__(self, regexes: List[str], minimization: str = 'hopcroft'):
+        self.patterns = list(regexes)
+        nfa = NFA("Patterns")
+        ends = nfa.build_nfa_from_regexes(self.patterns)
+
+        # Determinize the combined NFA once through the shared automaton representation
+        automaton = nfa.to_automaton()
+        converter = BitsetNFAToDFAConverter(nfa.name)
+        converter.use_automaton(automaton)
+        dfa, dfa_start_state, dfa_accept_states = converter.nfa_to_dfa()
+
+        # Label every DFA state with the ids of the patterns whose accept state it contains
+        pattern_masks = [1 << converter.state_ids[end] for end in ends]
+        labels = {name: tuple(pattern_id for pattern_id, mask in enumerate(pattern_masks) if subset & mask)
+                  for name, subset in converter.dfa_subsets.items()}
+
+        minimizer = MINIMIZERS[minimization](dfa, dfa_start_state, dfa_accept_states, state_labels=labels)
+        minimized_dfa, minimized_start_state, minimized_accept_states, _ = minimizer.minimize()
+        self.compiled = CompiledDFA.from_dfa(minimized_dfa, minimized_start_state, minimized_accept_states)
+        self.state_patterns = [labels[state] for state in self.compiled.states] + [()]  # The dead state matches nothing
+
+    def match(self, string: str) -> Tuple[int, ...]:
+        """Returns the ids of every pattern that matches the whole string."""
+        return self.state_patterns[self.compiled.final_state(string)]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report which of many regexes match each input string.")
+    parser.add_argument('patterns', help="file with one regex per line; pattern ids are 0-based line numbers")
+    parser.add_argument('-i', '--input', help="file with one string per line (default: stdin)")
+    parser.add_argument('-o', '--output', help="file for results (default: stdout)")
+    parser.add_argument('--batch-size', type=int, default=65536, help="strings matched and written per batch")
+    args = parser.parse_args(argv)
+
+    with open(args.patterns) as file:
+        matcher = MultiPatternMatcher(list(read_strings(file)))
+    print(f"{len(matcher.patterns)} patterns compiled into {len(matcher.compiled.states)} DFA states", file=sys.stderr)
+
+    input_file = open(args.input, buffering=1 << 20) if args.input else sys.stdin
+    output_file = open(args.output, 'w', buffering=1 << 20) if args.output else sys.stdout
+    try:
+        for batch in batched(read_strings(input_file), args.batch_size):
+            output_file.write(''.join(f"{','.join(map(str, matcher.match(string))) or '-'}\t{string}\n" for string in batch))
+    finally:
+        if args.input:
+            input_file.close()
+        if args.output:
+            output_file.close()
+
+if __name__ == "__main__":
+    main()
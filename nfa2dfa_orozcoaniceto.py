@@ -1,16 +1,59 @@
-import csv
+import os
 from collections import defaultdict, deque
 
+from automaton_orozcoaniceto import load_automaton, write_transitions_csv
+from instrument_orozcoaniceto import STATS, instrumented
+
+def output_path(prefix, filename):
+    # Name an output file after its input, prefixing the file name but keeping its directory
+    directory, name = os.path.split(filename)
+    return os.path.join(directory, f"{prefix}_{name}")
+
 # Class for converting NFA to DFA
 class NFAToDFAConverter:
     def __init__(self, filename: str):
         self.filename = filename
-        self.nfa_transitions = defaultdict(list)  # Dictionary to store NFA transitions
+        self.automaton = None  # Compact NFA read from the file, if any
+        self._nfa_transitions = defaultdict(list)  # Dictionary to store NFA transitions
         self.start_state = None  # The start state of the NFA
         self.accept_states = set()  # Set of accept states in the NFA
+        self.cache_key = None  # Hash of the NFA once it has been looked up in a CompiledDFACache
+
+    @property
+    def nfa_transitions(self):
+        # Transitions keyed by (state, symbol); a loaded automaton is only expanded into them on first use
+        if self._nfa_transitions is None:
+            self._nfa_transitions = self.automaton.transition_map()
+        return self._nfa_transitions
+
+    @nfa_transitions.setter
+    def nfa_transitions(self, transitions):
+        # Replacing the transitions makes the automaton stale
+        self._nfa_transitions = transitions
+        self.automaton = None
+
+    def use_automaton(self, automaton):
+        # Take the NFA from a compact Automaton; the dictionary form is built only if asked for
+        self.automaton = automaton
+        self._nfa_transitions = None
+        self.start_state = automaton.state_names[automaton.start]
+        self.accept_states = automaton.accept_state_names()
+
+    def transition_triples(self):
+        # Yield every NFA transition as (state, symbol, next_state), from the automaton when there is one
+        if self.automaton is not None:
+            names = self.automaton.state_names
+            for state, slot, next_state in self.automaton.edges():
+                yield names[state], self.automaton.symbol_name(slot), names[next_state]
+            return
+        for (state, symbol), next_states in self.nfa_transitions.items():
+            for next_state in next_states:
+                yield state, symbol, next_state
 
     def epsilon_closure(self, states):
         # Compute epsilon closure of a set of NFA states
+        if STATS.enabled:
+            STATS.counters['epsilon_closure_calls'] += 1
         stack = list(states)
         closure = set(states)
 
@@ -56,60 +99,287 @@ class NFAToDFAConverter:
             if any(state in self.accept_states for state in dfa_state.split('+')):
                 dfa_accept_states.add('*' + dfa_state)
 
+        STATS.count('subset_states', len(dfa_states))
+        STATS.count('dfa_transitions', len(dfa))
         return dfa, dfa_start_state, dfa_accept_states
 
     def read_nfa_from_file(self):
-        # Read NFA transitions from a CSV file
-        with open(self.filename) as file:
-            reader = csv.reader(file, delimiter=',')
-            for line_number, line in enumerate(reader):
-                if line_number == 3:
-                    self.start_state = line[0].strip('*')
-                elif line_number > 4:
-                    state, symbol, next_state = line[0].strip('*'), line[1] or '~', line[2].strip('*')
-                    self.nfa_transitions[(state, symbol)].append(next_state)
-
-                    if '*' in line[0] or '*' in line[2]:
-                        self.accept_states.add(next_state)
-                        if '*' in line[0]:
-                            self.accept_states.add(state)
+        # Read NFA transitions from a CSV file through the shared automaton loader
+        self.use_automaton(load_automaton(self.filename))
 
     def write_dfa_to_file(self, dfa, start_state, accept_states, filename_suffix='Minimized'):
-        # Write DFA to a CSV file
-        output_filename = f"{filename_suffix}_{self.filename}"
-        with open(output_filename, 'w', newline='') as file:
+        # Write DFA to a CSV file, streaming the transitions in chunks
+        output_filename = output_path(filename_suffix, self.filename)
+        states = sorted({state for state, _ in dfa} | {next_state for _, next_states in dfa.items() for next_state in next_states})
+        alphabet = sorted({symbol for _, symbol in dfa})
+        # Mark accept states once per state instead of once per edge
+        marked = {state: '*' + state if '*' + state in accept_states else state for state in states}
+        import csv  # Loaded on first write, which keeps the import of this module fast
+        with open(output_filename, 'w', newline='', buffering=1 << 20) as file:
             writer = csv.writer(file)
 
             writer.writerow([f'{filename_suffix} DFA,,,'])
-            states = sorted({state for state, _ in dfa} | {next_state for _, next_states in dfa.items() for next_state in next_states})
             writer.writerow(states + [''] * (4 - len(states)))
-            alphabet = sorted({symbol for _, symbol in dfa})
             writer.writerow(alphabet + [''] * (3 - len(alphabet)))
             writer.writerow([start_state] + [''] * 3)
             writer.writerow(sorted(accept_states) + [''] * (4 - len(accept_states)))
 
-            for (state, symbol), next_states in dfa.items():
-                for next_state in next_states:
-                    marked_state = '*' + state if '*' + state in accept_states else state
-                    marked_next_state = '*' + next_state if '*' + next_state in accept_states else next_state
-                    writer.writerow([marked_state, symbol, marked_next_state, ''])
+            write_transitions_csv(file, dfa_rows(dfa), marked, alphabet)
 
         print(f"{filename_suffix} DFA saved to {output_filename}")
 
-    def convert_and_export(self):
-        # Read NFA, convert to DFA, and write DFA to a file
-        self.read_nfa_from_file()
-        dfa, dfa_start_state, dfa_accept_states = self.nfa_to_dfa()
-        self.write_dfa_to_file(dfa, dfa_start_state, dfa_accept_states, 'Original')
+    def convert_and_export(self, cache=None, optimize=False):
+        # Read NFA, optionally shrink it, convert to DFA (or load it from a CompiledDFACache), and write DFA to a file
+        with STATS.phase('convert.read'):
+            self.read_nfa_from_file()
+        if optimize:
+            from optimize_orozcoaniceto import format_report, optimize_converter
+            with STATS.phase('convert.optimize'):
+                print(format_report(optimize_converter(self)))
+        with STATS.phase('convert.subsets'):
+            if cache is None:
+                dfa, dfa_start_state, dfa_accept_states = self.nfa_to_dfa()
+            else:
+                from cache_orozcoaniceto import cached_nfa_to_dfa
+                self.cache_key = cache.key(self)  # Hashed once and reused for the minimized entry
+                dfa, dfa_start_state, dfa_accept_states = cached_nfa_to_dfa(self, cache, self.cache_key)
+        with STATS.phase('convert.write'):
+            self.write_dfa_to_file(dfa, dfa_start_state, dfa_accept_states, 'Original')
 
         return dfa, dfa_start_state, dfa_accept_states
 
+def close_epsilon(epsilon):
+    # Epsilon closure of every single state as a bitset, given each state's epsilon successors as a bitset
+    closures = []
+    for idx in range(len(epsilon)):
+        closure, frontier = 1 << idx, 1 << idx
+        while frontier:
+            low = frontier & -frontier
+            frontier ^= low
+            new_states = epsilon[low.bit_length() - 1] & ~closure
+            closure |= new_states
+            frontier |= new_states
+        closures.append(closure)
+    return closures
+
+# Class for converting NFA to DFA with integer-indexed states and bitset subsets
+class BitsetNFAToDFAConverter(NFAToDFAConverter):
+    def index_nfa(self):
+        # Number NFA states and symbols as integers; a loaded automaton already has them
+        if self.automaton is not None:
+            self.index_automaton()
+        else:
+            self.index_transitions()
+        STATS.count('epsilon_closure_calls', len(self.closures))
+
+    def index_transitions(self):
+        # Index the (state, symbol) dictionary, numbering states in name order
+        names = {self.start_state} | set(self.accept_states)
+        for (state, _), next_states in self.nfa_transitions.items():
+            names.add(state)
+            names.update(next_states)
+        names.discard(None)
+        self.state_names = sorted(names)
+        self.state_ids = {state: idx for idx, state in enumerate(self.state_names)}
+        self.symbols = sorted({symbol for _, symbol in self.nfa_transitions if symbol != '~'})
+        self.symbol_ids = {symbol: idx for idx, symbol in enumerate(self.symbols)}
+
+        # Precompute the epsilon closure of every single state once, as a bitset
+        epsilon = [0] * len(self.state_names)
+        for (state, symbol), next_states in self.nfa_transitions.items():
+            if symbol == '~':
+                for next_state in next_states:
+                    epsilon[self.state_ids[state]] |= 1 << self.state_ids[next_state]
+        self.closures = close_epsilon(epsilon)
+
+        # moves[symbol][state] is the epsilon-closed bitset reached from state on symbol
+        self.moves = [[0] * len(self.state_names) for _ in self.symbols]
+        self.has_moves = [0] * len(self.symbols)
+        for (state, symbol), next_states in self.nfa_transitions.items():
+            if symbol == '~':
+                continue
+            sym_id, state_id = self.symbol_ids[symbol], self.state_ids[state]
+            for next_state in next_states:
+                self.moves[sym_id][state_id] |= self.closures[self.state_ids[next_state]]
+            self.has_moves[sym_id] |= 1 << state_id
+
+    def index_automaton(self):
+        # Index the CSR arrays of the automaton directly; its state ids become the bit positions
+        automaton = self.automaton
+        num_states, offsets, targets = automaton.num_states, automaton.offsets, automaton.targets
+        self.state_names = automaton.state_names
+        self.state_ids = {state: idx for idx, state in enumerate(self.state_names)}
+        # Symbols are numbered in name order, like index_transitions, but only those with edges count
+        slots = sorted((slot for slot in range(1, len(automaton.symbols) + 1)
+                        if offsets[slot * num_states] != offsets[(slot + 1) * num_states]), key=automaton.symbol_name)
+        self.symbols = [automaton.symbol_name(slot) for slot in slots]
+        self.symbol_ids = {symbol: idx for idx, symbol in enumerate(self.symbols)}
+
+        epsilon = []
+        for state in range(num_states):
+            mask = 0
+            for next_state in targets[offsets[state]:offsets[state + 1]]:
+                mask |= 1 << next_state
+            epsilon.append(mask)
+        self.closures = closures = close_epsilon(epsilon)
+
+        self.moves, self.has_moves = [], []
+        for slot in slots:
+            moves, has_moves, base = [0] * num_states, 0, slot * num_states
+            for state in range(num_states):
+                start, end = offsets[base + state], offsets[base + state + 1]
+                if start == end:
+                    continue
+                mask = 0
+                for next_state in targets[start:end]:
+                    mask |= closures[next_state]
+                moves[state] = mask
+                has_moves |= 1 << state
+            self.moves.append(moves)
+            self.has_moves.append(has_moves)
+
+    def step(self, subset, sym_id):
+        # Bitset of NFA states reached from an epsilon-closed subset on one symbol
+        moves = self.moves[sym_id]
+        pending = subset & self.has_moves[sym_id]
+        next_subset = 0
+        while pending:
+            low = pending & -pending
+            pending ^= low
+            next_subset |= moves[low.bit_length() - 1]
+        return next_subset
+
+    def build_subsets(self):
+        # Subset construction over bitsets; returns subsets and integer transitions
+        self.index_nfa()
+        start_subset = self.closures[self.state_ids[self.start_state]]
+        subset_ids = {start_subset: 0}
+        subsets = [start_subset]
+        transitions = {}  # (subset id, symbol id) -> subset id
+        unmarked_states = [0]
+
+        while unmarked_states:
+            current = unmarked_states.pop()
+            subset = subsets[current]
+            for sym_id in range(len(self.symbols)):
+                next_subset = self.step(subset, sym_id)
+                if not next_subset:
+                    continue
+                next_id = subset_ids.get(next_subset)
+                if next_id is None:
+                    next_id = subset_ids[next_subset] = len(subsets)
+                    subsets.append(next_subset)
+                    unmarked_states.append(next_id)
+                transitions[(current, sym_id)] = next_id
+
+        return subsets, transitions
+
+    def subset_name(self, subset):
+        # Export a bitset subset with the '+'-joined naming used by NFAToDFAConverter
+        names = []
+        while subset:
+            low = subset & -subset
+            subset ^= low
+            names.append(self.state_names[low.bit_length() - 1])
+        return '+'.join(sorted(names))
+
+    def nfa_to_dfa(self):
+        # Convert NFA to DFA, producing '+' names only at export time
+        subsets, transitions = self.build_subsets()
+        STATS.count('subset_states', len(subsets))
+        STATS.count('dfa_transitions', len(transitions))
+        names = [self.subset_name(subset) for subset in subsets]
+
+        dfa = defaultdict(list)
+        for (current, sym_id), next_id in transitions.items():
+            dfa[(names[current], self.symbols[sym_id])] = [names[next_id]]
+
+        accept_mask = 0
+        for state in self.accept_states:
+            if state in self.state_ids:
+                accept_mask |= 1 << self.state_ids[state]
+        dfa_accept_states = {'*' + names[idx] for idx, subset in enumerate(subsets) if subset & accept_mask}
+        self.dfa_subsets = dict(zip(names, subsets))  # NFA state bitset behind each DFA state name
+
+        return dfa, names[0], dfa_accept_states
+
+# Per-process copies of the move tables, set once by _init_subset_worker
+_worker_moves = None
+_worker_has_moves = None
+
+def _init_subset_worker(moves, has_moves):
+    global _worker_moves, _worker_has_moves
+    _worker_moves, _worker_has_moves = moves, has_moves
+
+def _expand_subsets(subsets):
+    # Successor bitsets of a batch of subsets for every symbol, computed in a worker process
+    expanded = []
+    for subset in subsets:
+        successors = []
+        for moves, has_moves in zip(_worker_moves, _worker_has_moves):
+            pending, next_subset = subset & has_moves, 0
+            while pending:
+                low = pending & -pending
+                pending ^= low
+                next_subset |= moves[low.bit_length() - 1]
+            successors.append(next_subset)
+        expanded.append(successors)
+    return expanded
+
+# Class for converting NFA to DFA with frontier subsets expanded across worker processes
+class ParallelNFAToDFAConverter(BitsetNFAToDFAConverter):
+    def __init__(self, filename: str, workers=None, batch_size=256):
+        super().__init__(filename)
+        self.workers = workers  # Number of worker processes (default: one per CPU)
+        self.batch_size = batch_size  # Subsets shipped to a worker per task
+
+    def build_subsets(self):
+        # Breadth-first subset construction: each level's frontier is expanded in parallel and
+        # new subsets are deduplicated centrally, in frontier and symbol order
+        from concurrent.futures import ProcessPoolExecutor
+
+        self.index_nfa()
+        start_subset = self.closures[self.state_ids[self.start_state]]
+        subset_ids = {start_subset: 0}
+        subsets = [start_subset]
+        transitions = {}  # (subset id, symbol id) -> subset id
+        frontier = [0]
+
+        with ProcessPoolExecutor(self.workers, initializer=_init_subset_worker, initargs=(self.moves, self.has_moves)) as pool:
+            while frontier:
+                batches = [frontier[idx:idx + self.batch_size] for idx in range(0, len(frontier), self.batch_size)]
+                results = pool.map(_expand_subsets, [[subsets[current] for current in batch] for batch in batches])
+                next_frontier = []
+                for batch, expanded in zip(batches, results):
+                    for current, successors in zip(batch, expanded):
+                        for sym_id, next_subset in enumerate(successors):
+                            if not next_subset:
+                                continue
+                            next_id = subset_ids.get(next_subset)
+                            if next_id is None:
+                                next_id = subset_ids[next_subset] = len(subsets)
+                                subsets.append(next_subset)
+                                next_frontier.append(next_id)
+                            transitions[(current, sym_id)] = next_id
+                frontier = next_frontier
+
+        return subsets, transitions
+
+def dfa_rows(dfa):
+    # Yield (state, symbol, next_state) for every transition of a DFA keyed by (state, symbol)
+    for (state, symbol), next_states in dfa.items():
+        for next_state in next_states:
+            yield state, symbol, next_state
+
+CONVERTERS = {'classic': NFAToDFAConverter, 'bitset': BitsetNFAToDFAConverter, 'parallel': ParallelNFAToDFAConverter}
+
 # Class for minimizing a DFA
 class DFAMinimizer:
-    def __init__(self, dfa, start_state, accept_states):
+    def __init__(self, dfa, start_state, accept_states, state_labels=None):
         self.dfa = dfa  # DFA transitions
         self.start_state = start_state  # Start state of the DFA
         self.accept_states = accept_states  # Set of accept states in the DFA
+        self.state_labels = state_labels  # Optional labels; states with different labels are never merged
 
     def get_reachable_states(self):
         # Returns the set of states that are reachable from the start state
@@ -130,23 +400,32 @@ class DFAMinimizer:
     def minimize(self):
         # Minimize the DFA
         # Step 1: Remove unreachable states
+        started = STATS.clock()
         reachable_states = self.get_reachable_states()
         self.dfa = {k: v for k, v in self.dfa.items() if k[0] in reachable_states}
+        started = STATS.lap('minimize.reachability', started)
 
         # Step 2: Partition states into equivalence classes
         accept_states = {state for state in reachable_states if '*' + state in self.accept_states}
         non_accept_states = reachable_states - accept_states
-        partitions = [accept_states, non_accept_states]
+        # Empty blocks are dropped: refinement stops once the block count stops growing, and an empty block has no representative
+        partitions = [block for block in (accept_states, non_accept_states) if block]
+        if self.state_labels is not None:
+            partitions = self.split_by_label(partitions)
 
         while True:
             new_partitions = []
             for p in partitions:
                 subsets = self.partition(p, partitions)
                 new_partitions.extend(subsets)
+            if STATS.enabled:
+                STATS.count('refinement_rounds')
+                STATS.observe('partition_blocks', len(new_partitions))
 
             if len(new_partitions) == len(partitions):
                 break
             partitions = new_partitions
+        started = STATS.lap('minimize.refinement', started)
 
         # Step 3: Construct minimized DFA using representative state names
         minimized_dfa = defaultdict(list)
@@ -163,9 +442,20 @@ class DFAMinimizer:
         # Determine new start and accept states
         new_start_state = state_mapping[self.start_state]
         new_accept_states = {state_mapping[state.replace('*', '')] for state in self.accept_states if state.replace('*', '') in state_mapping}
+        STATS.lap('minimize.construction', started)
 
         return minimized_dfa, new_start_state, new_accept_states, representative_states
 
+    def split_by_label(self, partitions):
+        # Splits each partition so that every block holds states with a single label
+        subsets = []
+        for p in partitions:
+            by_label = defaultdict(set)
+            for state in p:
+                by_label[self.state_labels.get(state)].add(state)
+            subsets.extend(by_label.values())
+        return subsets
+
     def partition(self, states, partitions):
         # Refines the partition of states based on their transitions
         if not states:
@@ -183,6 +473,8 @@ class DFAMinimizer:
 
     def find_partition(self, state, partitions):
         # Finds the partition index for a given state
+        if STATS.enabled:
+            STATS.counters['find_partition_calls'] += 1
         for idx, partition in enumerate(partitions):
             if state in partition:
                 return idx
@@ -190,15 +482,17 @@ class DFAMinimizer:
 
     def write_minimized_dfa_to_file(self, minimized_dfa, minimized_start_state, minimized_accept_states, filename):
         # Write minimized DFA to a CSV file
-        output_filename = f"Minimized_{filename}"
-        with open(output_filename, 'w', newline='') as file:
+        output_filename = output_path('Minimized', filename)
+        # Extract states and mark accept states with an asterisk, once per state
+        states = sorted({state for state, _ in minimized_dfa.keys()} | {state for _, states in minimized_dfa.items() for state in states})
+        marked = {state: '*' + state if state in minimized_accept_states else state for state in states}
+        import csv  # Loaded on first write, which keeps the import of this module fast
+        with open(output_filename, 'w', newline='', buffering=1 << 20) as file:
             writer = csv.writer(file)
 
             writer.writerow(['Minimized DFA,,,'])
             
-            # Extract states and mark accept states with an asterisk
-            states = sorted({state for state, _ in minimized_dfa.keys()} | {state for _, states in minimized_dfa.items() for state in states})
-            marked_states = ['*' + state if state in minimized_accept_states else state for state in states]
+            marked_states = [marked[state] for state in states]
             writer.writerow(marked_states + [''] * (4 - len(marked_states)))
 
             alphabet = sorted({symbol for _, symbol in minimized_dfa})
@@ -212,24 +506,160 @@ class DFAMinimizer:
             marked_accept_states = sorted('*' + state for state in minimized_accept_states)
             writer.writerow(marked_accept_states + [''] * (4 - len(marked_accept_states)))
 
-            for (state, symbol), next_states in minimized_dfa.items():
-                for next_state in next_states:
-                    marked_state = '*' + state if state in minimized_accept_states else state
-                    marked_next_state = '*' + next_state if next_state in minimized_accept_states else next_state
-                    writer.writerow([marked_state, symbol, marked_next_state, ''])
+            write_transitions_csv(file, dfa_rows(minimized_dfa), marked, alphabet)
 
         print(f"Minimized DFA saved to {output_filename}")
 
-def main():
+# Class for minimizing a DFA with Hopcroft's worklist partition refinement
+class HopcroftDFAMinimizer(DFAMinimizer):
+    def get_reachable_states(self):
+        # Breadth-first search over a per-state adjacency list built once
+        successors = defaultdict(list)
+        for (state, _), next_states in self.dfa.items():
+            successors[state].extend(next_states)
+        reachable_states = {self.start_state}
+        queue = deque([self.start_state])
+
+        while queue:
+            for next_state in successors.get(queue.popleft(), []):
+                if next_state not in reachable_states:
+                    reachable_states.add(next_state)
+                    queue.append(next_state)
+
+        return reachable_states
+
+    def minimize(self):
+        # Minimize the DFA
+        # Step 1: Remove unreachable states and number the rest
+        started = STATS.clock()
+        reachable_states = self.get_reachable_states()
+        self.dfa = {k: v for k, v in self.dfa.items() if k[0] in reachable_states}
+        started = STATS.lap('minimize.reachability', started)
+        states = sorted(reachable_states)
+        state_ids = {state: idx for idx, state in enumerate(states)}
+        symbols = sorted({symbol for _, symbol in self.dfa})
+        dead = len(states)  # Missing transitions go to an implicit dead state
+
+        # Step 2: Precompute inverse transitions per symbol, including the dead state
+        inverse = [[[] for _ in range(dead + 1)] for _ in symbols]
+        for sym_id, symbol in enumerate(symbols):
+            for state_id, state in enumerate(states):
+                next_states = self.dfa.get((state, symbol))
+                inverse[sym_id][state_ids[next_states[0]] if next_states else dead].append(state_id)
+            inverse[sym_id][dead].append(dead)
+        started = STATS.lap('minimize.inverse', started)
+
+        # Step 3: Refine the initial accept / non-accept (per label) / dead partition with a worklist
+        initial_blocks = defaultdict(set)
+        for state_id, state in enumerate(states):
+            label = self.state_labels.get(state) if self.state_labels is not None else None
+            initial_blocks[('*' + state in self.accept_states, label)].add(state_id)
+        blocks = refine_partition(inverse, list(initial_blocks.values()) + [{dead}])
+        started = STATS.lap('minimize.refinement', started)
+
+        # Step 4: Construct minimized DFA using representative state names
+        partitions = [{states[state_id] for state_id in block} for block in blocks if dead not in block]
+        representative_states = {min(p): p for p in partitions}
+        state_mapping = {state: min(partition) for partition in partitions for state in partition}
+
+        minimized_dfa = defaultdict(list)
+        for (state, symbol), next_states in self.dfa.items():
+            from_state = state_mapping[state]
+            for next_state in next_states:
+                to_state = state_mapping[next_state]
+                if to_state not in minimized_dfa[(from_state, symbol)]:
+                    minimized_dfa[(from_state, symbol)].append(to_state)
+
+        # Determine new start and accept states
+        new_start_state = state_mapping[self.start_state]
+        new_accept_states = {state_mapping[state.replace('*', '')] for state in self.accept_states if state.replace('*', '') in state_mapping}
+        STATS.lap('minimize.construction', started)
+
+        return minimized_dfa, new_start_state, new_accept_states, representative_states
+
+def refine_partition(inverse, blocks):
+    # Hopcroft's worklist refinement: splits the blocks (sets of state ids) until every state in a
+    # block reaches the same blocks; inverse[symbol][state] lists the predecessors of state on symbol
+    blocks = [set(block) for block in blocks]
+    initial_count = len(blocks)
+    block_of = [0] * sum(map(len, blocks))  # States are numbered 0..n-1 across the blocks
+    for block_id, block in enumerate(blocks):
+        for state_id in block:
+            block_of[state_id] = block_id
+    worklist = list(range(len(blocks)))
+    in_worklist = [True] * len(blocks)
+
+    while worklist:
+        splitter_id = worklist.pop()
+        in_worklist[splitter_id] = False
+        splitter = list(blocks[splitter_id])
+        if STATS.enabled:
+            STATS.counters['refinement_rounds'] += 1  # One round per splitter taken off the worklist
+        for sym_id in range(len(inverse)):
+            # Group the predecessors of the splitter by the block they live in
+            touched = defaultdict(list)
+            for target in splitter:
+                for source in inverse[sym_id][target]:
+                    touched[block_of[source]].append(source)
+
+            for block_id, sources in touched.items():
+                if len(sources) == len(blocks[block_id]):
+                    continue
+                new_block = set(sources)
+                blocks[block_id] -= new_block
+                new_id = len(blocks)
+                blocks.append(new_block)
+                in_worklist.append(False)
+                for state_id in new_block:
+                    block_of[state_id] = new_id
+
+                # Only the smaller half needs to be a splitter unless the block is still pending
+                if in_worklist[block_id] or len(new_block) <= len(blocks[block_id]):
+                    worklist.append(new_id)
+                    in_worklist[new_id] = True
+                else:
+                    worklist.append(block_id)
+                    in_worklist[block_id] = True
+    if STATS.enabled:
+        STATS.count('block_splits', len(blocks) - initial_count)
+        STATS.observe('partition_blocks', len(blocks))
+    return blocks
+
+MINIMIZERS = {'moore': DFAMinimizer, 'hopcroft': HopcroftDFAMinimizer}
+
+def main(engine='bitset', minimization='hopcroft', cache_dir=None, optimize=False, stats=None, profile=None):
     filename = input("Enter the filename of the NFA: ")
-    converter = NFAToDFAConverter(filename)
-    dfa, dfa_start_state, dfa_accept_states = converter.convert_and_export()
-    try:
-        minimizer = DFAMinimizer(dfa, dfa_start_state, dfa_accept_states)
-        minimized_dfa, minimized_dfa_start_state, minimized_dfa_accept_states, _ = minimizer.minimize()
+    # Statistics and profiles are collected when requested here or through NFA_STATS / NFA_PROFILE
+    with instrumented(stats, profile):
+        try:
+            convert_and_minimize(filename, engine, minimization, cache_dir, optimize)
+        except (OSError, ValueError) as error:
+            # Missing or unreadable files and malformed CSV rows; anything else is a bug and propagates
+            print(f"Error: {error}")
+            exit(1)
+
+def convert_and_minimize(filename, engine='bitset', minimization='hopcroft', cache_dir=None, optimize=False):
+    # Convert an NFA file to a DFA, minimize it and write both to CSV files
+    converter = CONVERTERS[engine](filename)
+    cache = None
+    if cache_dir is not None:
+        from cache_orozcoaniceto import CompiledDFACache
+        cache = CompiledDFACache(cache_dir)
+    dfa, dfa_start_state, dfa_accept_states = converter.convert_and_export(cache, optimize)
+    minimizer = MINIMIZERS[minimization](dfa, dfa_start_state, dfa_accept_states)
+    if cache is None:
+        with STATS.phase('minimize'):
+            minimized_dfa, minimized_dfa_start_state, minimized_dfa_accept_states, _ = minimizer.minimize()
+    else:
+        from cache_orozcoaniceto import cached_minimize
+        with STATS.phase('minimize'):
+            minimized_dfa, minimized_dfa_start_state, minimized_dfa_accept_states = cached_minimize(converter.cache_key, minimizer, cache)
+    with STATS.phase('minimize.write'):
         minimizer.write_minimized_dfa_to_file(minimized_dfa, minimized_dfa_start_state, minimized_dfa_accept_states, filename)
-    except:
-        print("Error: The NFA is already minimized.")
+    if cache is not None:
+        print(f"Cache: {cache.stats()}")
+        for name, value in cache.stats().items():
+            STATS.count(f'cache_{name}', value)
 
 if __name__ == "__main__":
     main()
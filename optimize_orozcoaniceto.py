@@ -0,0 +1,126 @@
+from collections import defaultdict
+
+from automaton_orozcoaniceto import Automaton
+
+# Optimization passes that shrink an NFA before subset construction. Every pass takes and
+# returns (transitions, start_state, accept_states) where transitions is a list of
+# (state, symbol, next_state) triples, and preserves the language of the NFA.
+
+def count_states(transitions, start_state):
+    # Number of states that appear in the transitions or as the start state
+    return len({start_state} | {state for state, _, _ in transitions} | {next_state for _, _, next_state in transitions})
+
+def eliminate_epsilon(transitions, start_state, accept_states, epsilon='~'):
+    # Fold epsilon closures into symbol transitions and accept states, then drop every epsilon edge
+    epsilon_edges = defaultdict(list)
+    symbol_edges = defaultdict(list)
+    for state, symbol, next_state in transitions:
+        if symbol == epsilon:
+            epsilon_edges[state].append(next_state)
+        else:
+            symbol_edges[state].append((symbol, next_state))
+
+    states = {start_state} | {state for state, _, _ in transitions} | {next_state for _, _, next_state in transitions}
+    new_transitions = set()
+    new_accept_states = set()
+    for state in states:
+        # Explore epsilon transitions
+        stack, closure = [state], {state}
+        while stack:
+            for next_state in epsilon_edges.get(stack.pop(), []):
+                if next_state not in closure:
+                    closure.add(next_state)
+                    stack.append(next_state)
+        if closure & accept_states:
+            new_accept_states.add(state)
+        for closure_state in closure:
+            for symbol, next_state in symbol_edges.get(closure_state, []):
+                new_transitions.add((state, symbol, next_state))
+
+    return sorted(new_transitions), start_state, new_accept_states
+
+def trim(transitions, start_state, accept_states):
+    # Drop states that are unreachable from the start state or cannot reach an accept state
+    successors, predecessors = defaultdict(list), defaultdict(list)
+    for state, _, next_state in transitions:
+        successors[state].append(next_state)
+        predecessors[next_state].append(state)
+
+    def search(roots, edges):
+        seen, stack = set(roots), list(roots)
+        while stack:
+            for other in edges.get(stack.pop(), []):
+                if other not in seen:
+                    seen.add(other)
+                    stack.append(other)
+        return seen
+
+    reachable = search([start_state], successors)
+    useful = search(reachable & accept_states, predecessors) & reachable
+    useful.add(start_state)  # The start state stays even if the language is empty
+    new_transitions = [(state, symbol, next_state) for state, symbol, next_state in transitions if state in useful and next_state in useful]
+    return new_transitions, start_state, accept_states & useful
+
+def merge_bisimilar(transitions, start_state, accept_states):
+    # Merge states with the same acceptance whose successors fall into the same blocks for every symbol
+    successors = defaultdict(list)
+    for state, symbol, next_state in transitions:
+        successors[state].append((symbol, next_state))
+    states = sorted({start_state} | {state for state, _, _ in transitions} | {next_state for _, _, next_state in transitions})
+
+    block = {state: state in accept_states for state in states}
+    num_blocks = len(set(block.values()))
+    while True:
+        signatures = {state: (block[state], frozenset((symbol, block[next_state]) for symbol, next_state in successors.get(state, [])))
+                      for state in states}
+        signature_ids = {}
+        block = {state: signature_ids.setdefault(signature, len(signature_ids)) for state, signature in signatures.items()}
+        if len(signature_ids) == num_blocks:
+            break
+        num_blocks = len(signature_ids)
+
+    # Name each merged state after the smallest state in its block
+    representatives = {}
+    for state in states:
+        representatives.setdefault(block[state], state)
+    rename = {state: representatives[block[state]] for state in states}
+    new_transitions = sorted({(rename[state], symbol, rename[next_state]) for state, symbol, next_state in transitions})
+    return new_transitions, rename[start_state], {rename[state] for state in accept_states if state in rename}
+
+def optimize(transitions, start_state, accept_states, epsilon='~'):
+    # Run epsilon elimination, trimming and bisimulation merging; returns the result and a size report
+    transitions = list(transitions)
+    report = {
+        'states_before': count_states(transitions, start_state),
+        'edges_before': len(transitions),
+        'epsilon_edges_before': sum(symbol == epsilon for _, symbol, _ in transitions),
+    }
+    transitions, start_state, accept_states = eliminate_epsilon(transitions, start_state, set(accept_states), epsilon)
+    transitions, start_state, accept_states = trim(transitions, start_state, accept_states)
+    transitions, start_state, accept_states = merge_bisimilar(transitions, start_state, accept_states)
+    report['states_after'] = count_states(transitions, start_state)
+    report['edges_after'] = len(transitions)
+    return transitions, start_state, accept_states, report
+
+def format_report(report):
+    # One-line summary of an optimization report
+    return (f"NFA reduced from {report['states_before']} states and {report['edges_before']} edges "
+            f"({report['epsilon_edges_before']} epsilon) to {report['states_after']} states and {report['edges_after']} edges")
+
+def optimize_converter(converter):
+    # Optimize the NFA held by an NFAToDFAConverter after read_nfa_from_file, in place. The
+    # converter gets a compact automaton of the optimized NFA, so no stale copy of the original is left
+    name = converter.automaton.name if converter.automaton is not None else converter.filename
+    transitions, start_state, accept_states, report = optimize(converter.transition_triples(), converter.start_state, converter.accept_states, '~')
+    converter.use_automaton(Automaton.from_transitions(name, transitions, start_state, accept_states))
+    return report
+
+def optimize_nfa(nfa):
+    # Optimize an NFA built by regex2nfa_orozcoaniceto.NFA.build_nfa_from_regex, in place
+    transitions, start_state, accept_states, report = optimize(nfa.transitions, nfa.start_state, nfa.final_states, "∼")
+    nfa.transitions = transitions
+    nfa.start_state = start_state
+    nfa.final_states = accept_states
+    nfa.states = {start_state} | {state for state, _, _ in transitions} | {next_state for _, _, next_state in transitions}
+    nfa.alphabet = {symbol for _, symbol, _ in transitions}
+    return report
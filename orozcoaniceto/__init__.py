@@ -0,0 +1,33 @@
+"""One import point for regex2nfa, nfa2dfa and trace-nfa, plus the modules built around them.
+
+Every name is resolved on first use (PEP 562), so ``import orozcoaniceto`` loads nothing but
+this file and an embedding service pays only for the tools it calls. The tool modules sit
+next to this package and stay importable on their own; ``python -m orozcoaniceto`` runs the
+non-interactive command line in ``orozcoaniceto.cli``.
+"""
+
+import importlib
+
+_EXPORTS = {
+    'regex2nfa_orozcoaniceto': ('NFA', 'RegexSyntaxError', 'validate_regex'),
+    'nfa2dfa_orozcoaniceto': ('NFAToDFAConverter', 'BitsetNFAToDFAConverter', 'ParallelNFAToDFAConverter',
+                              'DFAMinimizer', 'HopcroftDFAMinimizer', 'CONVERTERS', 'MINIMIZERS', 'convert_and_minimize'),
+    'trace_nfa_orozcoaniceto': ('NFATracer',),
+    'automaton_orozcoaniceto': ('Automaton', 'AutomatonFormatError', 'load_automaton'),
+    'match_orozcoaniceto': ('CompiledDFA', 'LazyDFAMatcher', 'compile_nfa'),
+    'orozcoaniceto.api': ('regex_to_nfa', 'read_nfa', 'nfa_to_dfa', 'minimize_dfa', 'trace'),
+}
+_MODULES = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = sorted(_MODULES)
+
+def __getattr__(name: str):
+    module = _MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value  # Later lookups skip __getattr__
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
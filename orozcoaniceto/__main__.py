@@ -0,0 +1,3 @@
+from orozcoaniceto.cli import main
+
+main()
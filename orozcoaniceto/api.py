@@ -0,0 +1,41 @@
+"""In-memory entry points: no prompts, no output files, errors raised as exceptions."""
+
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from nfa2dfa_orozcoaniceto import CONVERTERS, MINIMIZERS
+from regex2nfa_orozcoaniceto import NFA
+
+def regex_to_nfa(regex: str, name: str = 'N1', optimize: bool = False) -> NFA:
+    """Builds the NFA of a regex in the project's dialect; raises RegexSyntaxError if it is invalid."""
+    nfa = NFA(name)
+    nfa.build_nfa_from_regex(regex)
+    if optimize:
+        from optimize_orozcoaniceto import optimize_nfa
+        optimize_nfa(nfa)
+    return nfa
+
+def read_nfa(source, engine: str = 'bitset'):
+    """Returns a converter holding an NFA, read from a CSV file name or taken from an NFA object."""
+    if isinstance(source, NFA):
+        converter = CONVERTERS[engine](source.name)
+        converter.use_automaton(source.to_automaton())
+        return converter
+    converter = CONVERTERS[engine](source)
+    converter.read_nfa_from_file()
+    return converter
+
+def nfa_to_dfa(source, engine: str = 'bitset'):
+    """Subset construction of an NFA file or NFA object; returns (dfa, start_state, accept_states)."""
+    return read_nfa(source, engine).nfa_to_dfa()
+
+def minimize_dfa(dfa, start_state: str, accept_states, minimization: str = 'hopcroft'):
+    """Minimizes a DFA returned by nfa_to_dfa; returns (dfa, start_state, accept_states)."""
+    minimized_dfa, minimized_start_state, minimized_accept_states, _ = MINIMIZERS[minimization](dfa, start_state, accept_states).minimize()
+    return minimized_dfa, minimized_start_state, minimized_accept_states
+
+def trace(filename: str, strings: Iterable[str], witness: bool = True) -> Iterator[Tuple[str, bool, Optional[List[str]]]]:
+    """Yields (string, accepted, witness path) for each string, simulating the NFA in a CSV file."""
+    from trace_nfa_orozcoaniceto import NFATracer
+    tracer = NFATracer(filename, 'accept', witness)
+    tracer.load(write_header=False)  # Read now, so that a bad file raises here rather than on first iteration
+    return ((string, *tracer.simulate(string, witness)) for string in strings)
@@ -0,0 +1,129 @@
+"""Non-interactive command line for regex2nfa, nfa2dfa and trace-nfa.
+
+Each subcommand handles any number of regexes or files in one process, so the tool modules
+are imported once per invocation instead of once per file. A failing regex or file is
+reported on stderr and the rest are still processed; the exit status is 1 if any failed.
+"""
+
+import argparse
+import sys
+from typing import Iterable, Iterator, List
+
+def report_error(name: str, error: Exception):
+    print(f"{name}: {error}", file=sys.stderr)
+
+def read_lines(filenames: Iterable[str]) -> Iterator[str]:
+    """Yields every line of the files without its line terminator."""
+    for filename in filenames:
+        with open(filename, encoding='utf-8') as file:
+            for line in file:
+                yield line.rstrip('\r\n')
+
+def run_regex2nfa(args) -> bool:
+    from regex2nfa_orozcoaniceto import RegexSyntaxError, validate_regex
+    from orozcoaniceto.api import regex_to_nfa
+
+    regexes = list(args.regexes)
+    for filename in args.file:
+        try:
+            regexes.extend(read_lines([filename]))
+        except OSError as error:
+            report_error(filename, error)
+            return False
+    failed = False
+    for number, regex in enumerate(regexes, 1):
+        try:
+            # Building the NFA validates the regex, so --check alone runs only the validator
+            if args.check:
+                validate_regex(regex)
+                continue
+            nfa = regex_to_nfa(regex, f"N{number}", args.optimize)
+        except RegexSyntaxError as error:
+            report_error(f"regex {number}", f"{error}\n{error.pointer()}")
+            failed = True
+            continue
+        try:
+            nfa.write_to_csv(filename_suffix=args.prefix)
+        except OSError as error:
+            report_error(f"regex {number}", error)
+            failed = True
+    if args.check and not failed:
+        print(f"{len(regexes)} regexes are valid")
+    return not failed
+
+def run_nfa2dfa(args) -> bool:
+    from instrument_orozcoaniceto import instrumented
+    from nfa2dfa_orozcoaniceto import convert_and_minimize
+
+    failed = False
+    with instrumented(args.stats, args.profile):
+        for filename in args.files:
+            try:
+                convert_and_minimize(filename, args.engine, args.minimization, args.cache_dir, args.optimize)
+            except (OSError, ValueError) as error:
+                report_error(filename, error)
+                failed = True
+    return not failed
+
+def run_trace(args) -> bool:
+    from trace_nfa_orozcoaniceto import NFATracer
+
+    try:
+        strings = list(args.string) + list(read_lines(args.input))
+    except OSError as error:
+        report_error('input', error)
+        return False
+    failed = False
+    for filename in args.files:
+        tracer = NFATracer(filename, args.mode, not args.no_witness, args.max_paths)
+        try:
+            tracer.load()
+        except (OSError, ValueError) as error:
+            report_error(filename, error)
+            failed = True
+            continue
+        for string in strings:
+            print(f"{filename}\t{'accept' if tracer.trace_string(string) else 'reject'}\t{string}")
+    return not failed
+
+def build_parser() -> argparse.ArgumentParser:
+    from nfa2dfa_orozcoaniceto import CONVERTERS, MINIMIZERS
+
+    parser = argparse.ArgumentParser(prog='python -m orozcoaniceto', description="Convert regexes to NFAs, NFAs to minimized DFAs, and trace strings through NFAs.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    regex2nfa = commands.add_parser('regex2nfa', help="write the NFA of each regex to <prefix>_N<i>.csv")
+    regex2nfa.add_argument('regexes', nargs='*', metavar='REGEX')
+    regex2nfa.add_argument('-f', '--file', action='append', default=[], help="file with one regex per line (repeatable)")
+    regex2nfa.add_argument('--prefix', default='REGEX_TO_NFA', help="output file name prefix")
+    regex2nfa.add_argument('--optimize', action='store_true', help="remove epsilon transitions and merge equivalent states first")
+    regex2nfa.add_argument('--check', action='store_true', help="only validate the regexes")
+    regex2nfa.set_defaults(run=run_regex2nfa)
+
+    nfa2dfa = commands.add_parser('nfa2dfa', help="write Original_<file> and Minimized_<file> for each NFA CSV file")
+    nfa2dfa.add_argument('files', nargs='+', metavar='FILE')
+    nfa2dfa.add_argument('--engine', choices=sorted(CONVERTERS), default='bitset')
+    nfa2dfa.add_argument('--minimization', choices=sorted(MINIMIZERS), default='hopcroft')
+    nfa2dfa.add_argument('--cache-dir', help="reuse compiled automata stored in this directory (off by default)")
+    nfa2dfa.add_argument('--optimize', action='store_true', help="shrink the NFA before the subset construction")
+    nfa2dfa.add_argument('--stats', metavar='FILE', help="write counters and phase timings as JSON ('-' for stderr; env NFA_STATS)")
+    nfa2dfa.add_argument('--profile', metavar='FILE', help="write a cProfile/pstats dump of the run (env NFA_PROFILE)")
+    nfa2dfa.set_defaults(run=run_nfa2dfa)
+
+    trace = commands.add_parser('trace', help="trace strings through each NFA CSV file, appending to <file>Output")
+    trace.add_argument('files', nargs='+', metavar='FILE')
+    trace.add_argument('-s', '--string', action='append', default=[], help="string to trace (repeatable; may be empty)")
+    trace.add_argument('-i', '--input', action='append', default=[], help="file with one string per line (repeatable)")
+    trace.add_argument('--mode', choices=('accept', 'paths'), default='accept', help="simulate state sets, or list every path")
+    trace.add_argument('--max-paths', type=int, default=1000, help="paths listed per string in paths mode")
+    trace.add_argument('--no-witness', action='store_true', help="do not write an accepting path in accept mode")
+    trace.set_defaults(run=run_trace)
+    return parser
+
+def main(argv: List[str] = None):
+    args = build_parser().parse_args(argv)
+    if not args.run(args):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,49 @@
-import csv
-import re
+from automaton_orozcoaniceto import EPSILON_SYMBOLS, Automaton
+
+# Regex dialect: any character other than '(', ')', '*' and 'U' is a literal symbol,
+# juxtaposition is concatenation, 'U' is union and '*' is Kleene star. Empty alternatives
+# and empty groups match the empty string. The epsilon markers '~' and '∼' are rejected,
+# since every automaton reader treats them as epsilon rather than as symbols.
+
+# Class for reporting a regex that is not valid in the dialect, with the offending position
+class RegexSyntaxError(ValueError):
+    def __init__(self, message, regex, position):
+        super().__init__(message)
+        self.regex = regex
+        self.position = position
+
+    def pointer(self):
+        # The regex with a caret under the offending position
+        return f"{self.regex}\n{' ' * self.position}^"
+
+def validate_regex(regex):
+    # Check a regex against the dialect in one pass without building any states
+    open_groups = []  # Positions of the '(' not closed yet
+    can_star = False  # Whether the previous token was a symbol, a group or a star
+    for index, char in enumerate(regex):
+        if char == '(':
+            open_groups.append(index)
+            can_star = False
+        elif char == ')':
+            if not open_groups:
+                raise RegexSyntaxError(f"Unmatched ')' at position {index}", regex, index)
+            open_groups.pop()
+            can_star = True
+        elif char == '*':
+            if not can_star:
+                raise RegexSyntaxError(f"'*' at position {index} does not follow a symbol or group", regex, index)
+        elif char == 'U':
+            can_star = False
+        elif char in EPSILON_SYMBOLS:
+            raise RegexSyntaxError(f"{char!r} at position {index} is the epsilon marker and cannot be used as a symbol", regex, index)
+        else:
+            can_star = True
+    if open_groups:
+        raise RegexSyntaxError(f"Unmatched '(' at position {open_groups[-1]}", regex, open_groups[-1])
+
+def safe_filename(name):
+    # Replace every character other than ASCII letters, digits, '_' and '-' with '_'
+    return ''.join(char if char.isascii() and (char.isalnum() or char in '_-') else '_' for char in name)
 
 # Class for representing a Non-deterministic Finite Automaton (NFA)
 class NFA:
@@ -25,12 +69,92 @@ class NFA:
         if input_symbol != "∼":  # Epsilon transitions are not part of the alphabet
             self.alphabet.add(input_symbol)
 
-    def build_nfa_from_regex(self, regex):
+    def build_nfa_from_regex(self, regex, legacy=False):
         # Build an NFA from a regular expression
-        start, end = self.parse_sub_regex(regex, 0, len(regex))
+        if legacy:
+            start, end = self.parse_sub_regex(regex, 0, len(regex))
+        else:
+            start, end = self.parse_regex(regex)
+            self.add_transition(self.start_state, "∼", start)
         self.final_states.add(end)
         return start, end
 
+    def build_nfa_from_regexes(self, regexes):
+        # Build one NFA for several regular expressions joined at a single union start state.
+        # Returns the accept state of each regex, so that pattern ids can be told apart.
+        ends = []
+        for regex in regexes:
+            start, end = self.parse_regex(regex)
+            self.add_transition(self.start_state, "∼", start)
+            self.final_states.add(end)
+            ends.append(end)
+        return ends
+
+    def parse_regex(self, regex):
+        # Thompson construction in one left-to-right pass with an explicit stack of open groups.
+        # Each group tracks its finished alternatives, the concatenation so far and the last
+        # atom, which is kept apart so that '*' applies to it alone.
+        validate_regex(regex)
+        stack = []
+        alternatives, concat, last = [], None, None
+
+        for index, char in enumerate(regex):
+            if char == '(':
+                stack.append((alternatives, concat, last, index))
+                alternatives, concat, last = [], None, None
+
+            elif char == ')':
+                group = self.union_fragments(alternatives + [self.concat_fragments(concat, last)])
+                alternatives, concat, last, _ = stack.pop()
+                concat, last = self.concat_fragments(concat, last), group
+
+            elif char == '*':
+                last = self.star_fragment(last)
+
+            elif char == 'U':
+                alternatives.append(self.concat_fragments(concat, last))
+                concat, last = None, None
+
+            else:
+                # Regular character, create a transition
+                start, end = self.new_state(), self.new_state()
+                self.add_transition(start, char, end)
+                concat, last = self.concat_fragments(concat, last), (start, end)
+
+        return self.union_fragments(alternatives + [self.concat_fragments(concat, last)])
+
+    def concat_fragments(self, first, second):
+        # Join two (start, end) fragments with one epsilon edge; None is the empty fragment
+        if first is None:
+            return second
+        if second is None:
+            return first
+        self.add_transition(first[1], "∼", second[0])
+        return first[0], second[1]
+
+    def union_fragments(self, fragments):
+        # Join any number of alternatives between one new start and one new end state
+        fragments = [fragment if fragment is not None else self.empty_fragment() for fragment in fragments]
+        if len(fragments) == 1:
+            return fragments[0]
+        union_start, union_end = self.new_state(), self.new_state()
+        for start, end in fragments:
+            self.add_transition(union_start, "∼", start)
+            self.add_transition(end, "∼", union_end)
+        return union_start, union_end
+
+    def empty_fragment(self):
+        # A single state that both starts and ends a fragment matching the empty string
+        state = self.new_state()
+        return state, state
+
+    def star_fragment(self, fragment):
+        # Kleene star with a single hub state that loops through the fragment
+        hub = self.new_state()
+        self.add_transition(hub, "∼", fragment[0])
+        self.add_transition(fragment[1], "∼", hub)
+        return hub, hub
+
     def parse_sub_regex(self, regex, start_index, end_index):
         # Parse a sub-regex and generate corresponding NFA states and transitions
         start_state = self.new_state()
@@ -87,8 +211,13 @@ class NFA:
 
         return start_state, current_state
 
+    def to_automaton(self):
+        # Convert to the compact Automaton representation shared with nfa2dfa and trace-nfa
+        return Automaton.from_transitions(self.name, self.transitions, self.start_state, self.final_states, "∼")
+
     def write_to_csv(self, filename_suffix='REGEX_TO_NFA'):
         # Write NFA to a CSV file
+        import csv  # Loaded on first write, which keeps the import of this module fast
         output_filename = f"{filename_suffix}_{self.name}.csv"
         with open(output_filename, 'w', newline='') as file:
             writer = csv.writer(file)
@@ -116,24 +245,34 @@ class NFA:
 
         print(f"{filename_suffix} {self.name} saved to {output_filename}")
 
-if __name__ == "__main__":
-    print("Please enter a regular expression using standard regex symbols:")
+def main(optimize=False):
+    print("Please enter a regular expression (symbols, U for union, * for star, parentheses for grouping):")
     regex = input("Regex: ")
-    
-    # Basic validation for regex input
+
+    # Validate against the project's own regex dialect
     try:
-        re.compile(regex)
-    except re.error:
-        print("Invalid regular expression.")
-    else:
-        nfa_converter = NFA()
-        nfa_converter.build_nfa_from_regex(regex)
-
-        print("\nPlease enter the name of the output file (without extension):")
-        filename = input("Filename: ")
-        # Ensuring filename is valid and appending a default extension if not provided
-        filename = re.sub(r'[^a-zA-Z0-9_\-]', '_', filename)  # Replacing invalid characters
-        if not filename.endswith('.csv'):
-            filename += '.csv'
-
-        nfa_converter.write_to_csv(filename_suffix=filename)
+        validate_regex(regex)
+    except RegexSyntaxError as error:
+        print(f"Invalid regular expression: {error}\n{error.pointer()}")
+        exit(1)
+
+    nfa_converter = NFA()
+    nfa_converter.build_nfa_from_regex(regex)
+
+    # Optionally remove epsilon transitions and merge equivalent states before writing the NFA,
+    # opt-in as with --optimize on the command line and in nfa2dfa
+    if optimize:
+        from optimize_orozcoaniceto import format_report, optimize_nfa
+        print(format_report(optimize_nfa(nfa_converter)))
+
+    print("\nPlease enter the name of the output file (without extension):")
+    filename = input("Filename: ")
+    # Ensuring filename is valid and appending a default extension if not provided
+    filename = safe_filename(filename)
+    if not filename.endswith('.csv'):
+        filename += '.csv'
+
+    nfa_converter.write_to_csv(filename_suffix=filename)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,444 @@
+import argparse
+import mmap
+import os
+import re
+import sys
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from instrument_orozcoaniceto import STATS, instrumented
+from match_orozcoaniceto import CompiledDFA
+from nfa2dfa_orozcoaniceto import MINIMIZERS, BitsetNFAToDFAConverter
+from regex2nfa_orozcoaniceto import NFA
+
+# Substring search over bytes with leftmost-longest semantics, like POSIX and grep -o:
+# the match with the smallest start wins, then the longest match from that start, and
+# the search resumes at its end (one byte further after an empty match).
+#
+# The pattern goes through the usual regex2nfa -> subset construction -> minimization
+# pipeline with every symbol spelled as its UTF-8 bytes. Three byte-indexed tables are then
+# derived from the minimized DFA by subset construction over sets of its states:
+#   anchored    the DFA itself, used to find the longest match from a known start
+#   unanchored  Sigma* pattern, whose first accept is the earliest end of any match
+#   prefixes    the reversed prefixes of the pattern, read backwards from that end to
+#               find every position that can start a match reaching it
+# Table entries are premultiplied by 256 so that a step is one list lookup per byte.
+#
+# Finding the longest match from a start may read far ahead (aUa*b over a run of a's reads
+# to the end of the run for every a). As in Reps' linear-time maximal munch, a FailureMemo
+# remembers the (state, position) pairs from which no accept is reachable any more, and a
+# run that reaches one stops, so each pair is read at most once per scan.
+
+BYTE_VALUES = 256
+PREFILTER_MAX_BYTES = 128  # Skip ahead with a byte-class search while no match is in progress
+
+def compile_pattern(regex: str, minimization: str = 'hopcroft') -> CompiledDFA:
+    """Compiles a regex into a minimized DFA whose symbols are single bytes, as latin-1 characters."""
+    nfa = NFA("Pattern")
+    nfa.build_nfa_from_regex(regex)
+    transitions = []
+    for start, symbol, end in nfa.transitions:
+        encoded = symbol.encode('utf-8') if symbol != "∼" else b''
+        if len(encoded) <= 1:
+            transitions.append((start, symbol if not encoded else chr(encoded[0]), end))
+            continue
+        # Spell a multi-byte character as a chain of byte transitions
+        for byte in encoded[:-1]:
+            middle = nfa.new_state()
+            transitions.append((start, chr(byte), middle))
+            start = middle
+        transitions.append((start, chr(encoded[-1]), end))
+    nfa.transitions = transitions
+
+    automaton = nfa.to_automaton()
+    converter = BitsetNFAToDFAConverter(nfa.name)
+    converter.use_automaton(automaton)
+    dfa, start_state, accept_states = converter.nfa_to_dfa()
+    dfa, start_state, accept_states, _ = MINIMIZERS[minimization](dfa, start_state, accept_states).minimize()
+    return CompiledDFA.from_dfa(dfa, start_state, accept_states)
+
+def _bits(mask: int) -> Iterator[int]:
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+class ByteTable:
+    """A DFA over bytes whose states are sets of states of a compiled DFA.
+
+    State 0 is always the empty set and accepting states are numbered last, so a scan
+    tests `state == 0` and `state >= first_accept` instead of looking anything up.
+    """
+
+    def __init__(self, initial: int, step: Callable[[int, int], int], accepting: Callable[[int], bool], columns: List[int], width: int):
+        masks = [0, initial] if initial else [0]
+        mask_ids = {mask: idx for idx, mask in enumerate(masks)}
+        moves = []  # moves[state][column] is the id of the next set
+        for mask in masks:  # masks grows while it is walked
+            row = []
+            for column in range(width):
+                next_mask = step(mask, column)
+                next_id = mask_ids.get(next_mask)
+                if next_id is None:
+                    next_id = mask_ids[next_mask] = len(masks)
+                    masks.append(next_mask)
+                row.append(next_id)
+            moves.append(row)
+
+        # Renumber: the empty set first, then rejecting sets, then accepting sets
+        order = [0] + sorted(range(1, len(masks)), key=lambda idx: bool(accepting(masks[idx])))
+        renumbered = [0] * len(masks)
+        for new_id, old_id in enumerate(order):
+            renumbered[old_id] = new_id * BYTE_VALUES
+        self.masks = [masks[old_id] for old_id in order]
+        self.table = []
+        for old_id in order:
+            row = moves[old_id]
+            self.table.extend(renumbered[row[column]] for column in columns)
+        self.start = renumbered[mask_ids[initial]]
+        self.first_accept = next((new_id for new_id, old_id in enumerate(order) if old_id and accepting(masks[old_id])), len(order)) * BYTE_VALUES
+
+    def mask(self, state: int) -> int:
+        """The set of compiled DFA states behind a premultiplied state."""
+        return self.masks[state // BYTE_VALUES]
+
+class FailureMemo:
+    """The (state, position) pairs of the anchored table known to lead to no further accept.
+
+    Failure propagates forward: if no accept is reachable from a state at some position, none
+    is reachable from its successor either. So the memo only keeps the failed set at a cursor,
+    which follows the search forward, and the heads of runs recorded ahead of it.
+    """
+
+    def __init__(self, table: List[int], position: int):
+        self.table = table
+        self.position = position
+        self.mask = 0  # Failed anchored states at the cursor, bit i for premultiplied state i * 256
+        self.heads: Dict[int, int] = {}  # Failed states recorded ahead of the cursor, by position
+        self.moves: Dict[int, int] = {}  # Cache of advance(), keyed by mask * 256 + byte
+
+    def advance(self, mask: int, byte: int) -> int:
+        """Moves a set of failed states over one byte."""
+        key = mask * BYTE_VALUES + byte
+        next_mask = self.moves.get(key)
+        if next_mask is None:
+            next_mask = 0
+            for idx in _bits(mask):
+                next_mask |= 1 << (self.table[idx * BYTE_VALUES + byte] // BYTE_VALUES)
+            next_mask = self.moves[key] = next_mask & ~1  # State 0 is the empty set; it needs no entry
+        return next_mask
+
+    def failed_at(self, data, position: int) -> int:
+        """Moves the cursor forward to `position` and returns the failed set there."""
+        mask, index, heads = self.mask, self.position, self.heads
+        while index < position:
+            if not mask:
+                ahead = [head for head in heads if head <= position]
+                if not ahead:
+                    index = position
+                    break
+                index = min(ahead)
+                mask = heads.pop(index)
+                continue
+            mask = self.advance(mask, data[index])
+            index += 1
+            mask |= heads.pop(index, 0)
+        self.mask, self.position = mask, index
+        return mask
+
+    def record(self, position: int, state: int):
+        """Marks a premultiplied anchored state at a position as failed."""
+        bit = 1 << (state // BYTE_VALUES)
+        if position == self.position:
+            self.mask |= bit
+        elif position > self.position:
+            self.heads[position] = self.heads.get(position, 0) | bit
+
+class Scanner:
+    """Finds leftmost-longest matches of a compiled DFA in bytes-like data such as an mmap."""
+
+    def __init__(self, compiled: CompiledDFA):
+        width, dead, table = compiled.width, compiled.dead, compiled.table
+        unknown = width - 1
+        self.columns = [compiled.columns.get(chr(byte), unknown) for byte in range(BYTE_VALUES)]
+        if any(len(symbol) != 1 or ord(symbol) >= BYTE_VALUES for symbol in compiled.symbols):
+            raise ValueError("Scanner needs a DFA over bytes; compile the pattern with compile_pattern")
+        self.width, self.dead = width, dead
+        self.forward = list(table[:dead * width])
+        self.start_bit = 1 << compiled.start
+        self.accept_mask = sum(1 << state for state in range(dead) if compiled.accepting[state])
+
+        predecessors = [[0] * dead for _ in range(width)]  # predecessors[column][state] as a set of states
+        for state in range(dead):
+            for column in range(width):
+                next_state = self.forward[state * width + column]
+                if next_state != dead:
+                    predecessors[column][next_state] |= 1 << state
+        live = self.accept_mask  # States from which an accept state can still be reached
+        frontier = live
+        while frontier:
+            reached = 0
+            for state in _bits(frontier):
+                for column in range(width):
+                    reached |= predecessors[column][state]
+            frontier = reached & ~live
+            live |= frontier
+
+        def backward(mask: int, column: int) -> int:
+            result = 0
+            for state in _bits(mask):
+                result |= predecessors[column][state]
+            return result & live
+
+        accept_mask, start_bit = self.accept_mask, self.start_bit
+        self.anchored = ByteTable(start_bit & live, lambda mask, column: self.step(mask, column) & live, lambda mask: bool(mask & accept_mask), self.columns, width)
+        self.unanchored = ByteTable(0, lambda mask, column: self.step(mask | start_bit, column) & live,
+                                    lambda mask: bool(mask & accept_mask), self.columns, width)
+        self.prefixes = ByteTable(live, backward, lambda mask: bool(mask & start_bit), self.columns, width)
+        self.nullable = bool(accept_mask & start_bit)
+
+        # Bytes that can start a match; while none is in progress, everything else is skipped
+        starters = [byte for byte in range(BYTE_VALUES) if self.unanchored.table[byte] != 0]
+        self.prefilter = re.compile(b'[' + b''.join(re.escape(bytes([byte])) for byte in starters) + b']') if 0 < len(starters) <= PREFILTER_MAX_BYTES else None
+
+    @classmethod
+    def from_regex(cls, regex: str, minimization: str = 'hopcroft') -> 'Scanner':
+        return cls(compile_pattern(regex, minimization))
+
+    def step(self, mask: int, column: int) -> int:
+        """Moves a set of compiled DFA states on one table column; the dead state is dropped."""
+        forward, width, dead = self.forward, self.width, self.dead
+        result = 0
+        for state in _bits(mask):
+            next_state = forward[state * width + column]
+            if next_state != dead:
+                result |= 1 << next_state
+        return result
+
+    def earliest_end(self, data, pos: int, limit: int) -> int:
+        """Returns the smallest end of a match that starts in [pos, limit), or -1 if there is none."""
+        if self.nullable:
+            return pos if pos < limit else -1
+        size = len(data)
+        stop = min(limit, size)
+        table, first_accept, prefilter = self.unanchored.table, self.unanchored.first_accept, self.prefilter
+        state, index = 0, pos
+        while index < stop:
+            if state == 0 and prefilter is not None:
+                found = prefilter.search(data, index, stop)
+                if found is None:
+                    break
+                index = found.start()
+            for byte in data[index:stop]:
+                index += 1
+                state = table[state + byte]
+                if state >= first_accept:
+                    return index
+                if state == 0 and prefilter is not None:
+                    break
+        if limit >= size or state == 0:
+            return -1
+
+        # Past the limit, only follow the matches that started before it
+        mask, accept_mask, columns = self.unanchored.mask(state), self.accept_mask, self.columns
+        for index in range(stop, size):
+            mask = self.step(mask, columns[data[index]])
+            if mask & accept_mask:
+                return index + 1
+            if not mask:
+                break
+        return -1
+
+    def candidate_starts(self, data, pos: int, end: int) -> List[int]:
+        """Positions in [pos, end] from which the pattern can still match past `end`, in ascending order."""
+        table, first_accept = self.prefixes.table, self.prefixes.first_accept
+        state = self.prefixes.start
+        starts = [end] if state >= first_accept else []
+        for index in range(end - 1, pos - 1, -1):
+            state = table[state + data[index]]
+            if state == 0:
+                break
+            if state >= first_accept:
+                starts.append(index)
+        starts.reverse()
+        return starts
+
+    def longest_end(self, data, start: int, memo: Optional[FailureMemo] = None) -> int:
+        """Returns the end of the longest match that starts at `start`, or -1 if none does.
+
+        Successive calls should share a memo and have non-decreasing starts; the run then stops
+        where an earlier run is known to fail, and records where it fails itself.
+        """
+        table, first_accept = self.anchored.table, self.anchored.first_accept
+        if memo is None:
+            memo = FailureMemo(table, start)
+        failed, heads = memo.failed_at(data, start), memo.heads
+        state = self.anchored.start
+        last, head = -1, -1  # head: first position after the last accept, where this run starts to fail
+        if state >= first_accept:
+            last = start
+        elif failed >> (state // BYTE_VALUES) & 1:
+            return -1
+        else:
+            head, head_state = start, state
+        index = start
+        for byte in data[start:]:
+            index += 1
+            state = table[state + byte]
+            if state == 0:
+                break
+            if failed:
+                failed = memo.advance(failed, byte)
+            if heads:
+                failed |= heads.get(index, 0)
+            if state >= first_accept:
+                last, head = index, -1
+            elif failed >> (state // BYTE_VALUES) & 1:
+                break
+            elif head < 0:
+                head, head_state = index, state
+        if head >= 0:
+            memo.record(head, head_state)
+        return last
+
+    def matches(self, data, pos: int = 0, limit: Optional[int] = None) -> Iterator[Tuple[int, int]]:
+        """Yields (start, end) of successive leftmost-longest matches starting in [pos, limit).
+
+        Matches may end past the limit. The default limit also allows an empty match at the end of the data.
+        """
+        data = memoryview(data)  # Slicing an mmap or bytes would copy; slicing a view does not
+        limit = len(data) + 1 if limit is None else limit
+        memo = FailureMemo(self.anchored.table, pos)
+        while pos < limit:
+            end = self.earliest_end(data, pos, limit)
+            if end < 0:
+                return
+            for start in self.candidate_starts(data, pos, end):
+                if start >= limit:
+                    return
+                match_end = self.longest_end(data, start, memo)
+                if match_end >= 0:
+                    yield start, match_end
+                    pos = match_end if match_end > start else match_end + 1
+                    break
+            else:
+                raise AssertionError("the match that ended first has no start")  # Unreachable
+
+    def first_match(self, data, pos: int = 0) -> Optional[Tuple[int, int]]:
+        """Returns the leftmost-longest match at or after pos, or None."""
+        return next(self.matches(data, pos), None)
+
+def chunk_bounds(size: int, chunk_size: int) -> List[Tuple[int, int]]:
+    """Splits [0, size] into chunks of match starts; the last one also covers an empty match at the end."""
+    bounds = [(start, min(start + chunk_size, size)) for start in range(0, size, max(1, chunk_size))]
+    if bounds:
+        bounds[-1] = (bounds[-1][0], size + 1)
+    return bounds or [(0, 1)]
+
+def merge_chunk_matches(scanner: Scanner, data, bounds: List[Tuple[int, int]], chunk_matches) -> Iterator[Tuple[int, int]]:
+    """Joins matches found independently per chunk into the sequence a single scan would find.
+
+    Each chunk was scanned as if the search started at its first byte. That is right unless a
+    match from the previous chunks runs into it; then the chunk is scanned again from the end
+    of that match until the rescan finds a match the chunk also found, after which the two agree.
+    """
+    resume = 0
+    for (chunk_start, limit), matches in zip(bounds, chunk_matches):
+        if resume > chunk_start:
+            known = {match: idx for idx, match in enumerate(matches)}
+            rescanned = []
+            for match in scanner.matches(data, resume, limit):
+                if match in known:
+                    matches = rescanned + matches[known[match]:]
+                    break
+                rescanned.append(match)
+            else:
+                matches = rescanned
+            STATS.count('scan_chunk_resyncs')
+        for start, end in matches:
+            yield start, end
+            resume = end if end > start else end + 1
+
+_worker_scanner = None
+_worker_data = None
+
+def _init_scan_worker(scanner: Scanner, filename: str):
+    # Each worker maps the file itself; only chunk bounds and matches cross processes
+    global _worker_scanner, _worker_data
+    _worker_scanner = scanner
+    _worker_data = map_file(filename)
+
+def _scan_chunk(bounds: Tuple[int, int]) -> List[Tuple[int, int]]:
+    return list(_worker_scanner.matches(_worker_data, *bounds))
+
+def map_file(filename: str):
+    """Memory-maps a file read-only; an empty file gives empty bytes, which mmap cannot map."""
+    with open(filename, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return b''
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+def scan_file(scanner: Scanner, filename: str, workers: int = 1, chunk_size: Optional[int] = None, data=None) -> Iterator[Tuple[int, int]]:
+    """Yields every leftmost-longest match in a file, scanning chunks in worker processes when workers > 1.
+
+    data is the file's contents when the caller has already mapped it; otherwise the file is mapped here.
+    """
+    if data is None:
+        data = map_file(filename)
+    if workers <= 1:
+        yield from scanner.matches(data)
+        return
+    from concurrent.futures import ProcessPoolExecutor  # Only needed for parallel scans
+
+    bounds = chunk_bounds(len(data), chunk_size or max(1 << 20, -(-len(data) // (workers * 4))))
+    with ProcessPoolExecutor(workers, initializer=_init_scan_worker, initargs=(scanner, filename)) as pool:
+        yield from merge_chunk_matches(scanner, data, bounds, pool.map(_scan_chunk, bounds))
+
+CONTROL_ESCAPES = {code: repr(chr(code))[1:-1] for code in range(32)}  # Keep one match per output line
+
+def format_match(data, start: int, end: int) -> str:
+    text = bytes(data[start:end]).decode('utf-8', 'backslashreplace').translate(CONTROL_ESCAPES)
+    return f"{start}\t{end}\t{text}"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find leftmost-longest matches of a regex in a file.")
+    parser.add_argument('regex', help="pattern in the regex2nfa syntax (concatenation, U, * and parentheses)")
+    parser.add_argument('file', help="file to search; it is memory-mapped and read as bytes")
+    parser.add_argument('-o', '--output', help="file for 'start<TAB>end<TAB>text' lines (default: stdout)")
+    parser.add_argument('--first', action='store_true', help="stop after the first match")
+    parser.add_argument('--count', action='store_true', help="print only the number of matches")
+    parser.add_argument('--workers', type=int, default=1, help="worker processes scanning chunks of the file")
+    parser.add_argument('--chunk-size', type=int, help="bytes per chunk with --workers (default: about four chunks per worker)")
+    parser.add_argument('--stats', metavar='FILE', help="write counters and phase timings as JSON ('-' for stderr; env NFA_STATS)")
+    parser.add_argument('--profile', metavar='FILE', help="write a cProfile/pstats dump of the run (env NFA_PROFILE)")
+    args = parser.parse_args(argv)
+
+    with instrumented(args.stats, args.profile):
+        try:
+            with STATS.phase('compile'):
+                scanner = Scanner.from_regex(args.regex)
+            data = map_file(args.file)
+        except (OSError, ValueError) as error:
+            sys.exit(f"Error: {error}")
+        output_file = open(args.output, 'w', buffering=1 << 20) if args.output else sys.stdout
+        found = 0
+        try:
+            with STATS.phase('scan'):
+                matches = scanner.matches(data) if args.first else scan_file(scanner, args.file, args.workers, args.chunk_size, data)
+                for start, end in matches:
+                    found += 1
+                    if not args.count:
+                        output_file.write(format_match(data, start, end) + '\n')
+                    if args.first:
+                        break
+            if args.count:
+                output_file.write(f"{found}\n")
+        finally:
+            if args.output:
+                output_file.close()
+        STATS.count('scan_matches', found)
+        STATS.count('scan_bytes', len(data))
+    if not found:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import time
+from collections import defaultdict, deque
+from typing import Dict, List, Optional, Tuple
+
+from match_orozcoaniceto import CompiledDFA, compile_nfa
+
+# Line protocol, one UTF-8 request per line, answered in order on each connection:
+#   MATCH <automaton> <string>  ->  accept | reject | error <message>
+#   LIST                        ->  ok <automaton> ...
+#   STATS                       ->  ok <json>
+# The string is everything after the second space, so it may be empty or contain spaces.
+
+def log(message: str):
+    print(f"[{time.strftime('%H:%M:%S')}] {message}", file=sys.stderr)
+
+class Automata:
+    """Compiled automata served by name, recompiled when their CSV files change on disk."""
+
+    def __init__(self, paths: Dict[str, str], engine: str = 'bitset', minimization: str = 'hopcroft'):
+        self.paths = paths  # Automaton name -> NFA CSV file
+        self.engine = engine
+        self.minimization = minimization
+        self.compiled: Dict[str, CompiledDFA] = {}
+        self.versions: Dict[str, Tuple[int, int]] = {}  # (mtime, size) of the file each automaton was compiled from
+        self.reloads = 0
+        self.reload_errors = 0
+
+    def signature(self, name: str) -> Tuple[int, int]:
+        stat = os.stat(self.paths[name])
+        return stat.st_mtime_ns, stat.st_size
+
+    def compile(self, name: str) -> CompiledDFA:
+        """Determinizes and minimizes one automaton through NFAToDFAConverter and DFAMinimizer."""
+        return compile_nfa(self.paths[name], self.engine, self.minimization)
+
+    def load_all(self):
+        """Compiles every automaton; errors propagate so that a bad file stops the server at startup."""
+        for name in self.paths:
+            signature = self.signature(name)
+            self.compiled[name] = self.compile(name)
+            self.versions[name] = signature
+            log(f"loaded {name} from {self.paths[name]}: {len(self.compiled[name].states)} states")
+
+    async def watch(self, interval: float):
+        """Polls the CSV files and swaps in a recompiled automaton when one changes.
+
+        Compilation runs in a worker thread so matching continues meanwhile; if the new file
+        does not compile, the previous automaton keeps serving until the file changes again.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(interval)
+            for name in self.paths:
+                try:
+                    signature = self.signature(name)
+                except OSError:
+                    continue  # The file is being replaced; try again on the next poll
+                if signature == self.versions.get(name):
+                    continue
+                self.versions[name] = signature
+                try:
+                    compiled = await loop.run_in_executor(None, self.compile, name)
+                except (OSError, ValueError) as error:
+                    self.reload_errors += 1
+                    log(f"reload of {name} failed, still serving the previous version: {error}")
+                    continue
+                self.compiled[name] = compiled
+                self.reloads += 1
+                log(f"reloaded {name}: {len(compiled.states)} states")
+
+class MatchBatcher:
+    """Collects match requests from all connections and answers them in batches."""
+
+    def __init__(self, automata: Automata, max_batch: int = 4096):
+        self.automata = automata
+        self.max_batch = max_batch
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.requests = 0  # Counted on submission, so STATS includes requests still waiting for their batch
+        self.answered = 0
+        self.batches = 0
+
+    def submit(self, name: str, string: str) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((name, string, future))
+        self.requests += 1
+        return future
+
+    async def run(self):
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.max_batch and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+
+            by_name = defaultdict(list)
+            for request in batch:
+                by_name[request[0]].append(request)
+            for name, requests in by_name.items():
+                compiled = self.automata.compiled.get(name)
+                if compiled is None:
+                    results = [f"error unknown automaton {name!r}"] * len(requests)
+                else:
+                    results = ['accept' if accepted else 'reject' for accepted in compiled.match_many(string for _, string, _ in requests)]
+                for (_, _, future), result in zip(requests, results):
+                    if not future.done():
+                        future.set_result(result)
+            self.answered += len(batch)
+            self.batches += 1
+            await asyncio.sleep(0)  # A full queue never suspends get(), so let connections run
+
+class MatchServer:
+    """Serves the line protocol over TCP or a Unix socket."""
+
+    def __init__(self, automata: Automata, max_batch: int = 4096, max_pending: int = 1024):
+        self.automata = automata
+        self.batcher = MatchBatcher(automata, max_batch)
+        self.max_pending = max_pending  # Unanswered requests per connection before reading pauses
+        self.connections = 0
+
+    def dispatch(self, line: str):
+        # Returns a future for match requests and a finished response for everything else
+        command, _, rest = line.partition(' ')
+        if command == 'MATCH':
+            name, _, string = rest.partition(' ')
+            return self.batcher.submit(name, string)
+        if command == 'LIST':
+            return 'ok ' + ' '.join(sorted(self.automata.compiled))
+        if command == 'STATS':
+            return 'ok ' + json.dumps(self.stats())
+        return f"error unknown command {command!r}"
+
+    def stats(self) -> dict:
+        batcher = self.batcher
+        return {
+            'automata': {name: len(compiled.states) for name, compiled in self.automata.compiled.items()},
+            'connections': self.connections,
+            'requests': batcher.requests,
+            'answered': batcher.answered,
+            'batches': batcher.batches,
+            'mean_batch': batcher.answered / batcher.batches if batcher.batches else 0.0,
+            'reloads': self.automata.reloads,
+            'reload_errors': self.automata.reload_errors,
+        }
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        # Requests are read until max_pending are unanswered; responses are written in request order
+        self.connections += 1
+        pending: asyncio.Queue = asyncio.Queue(maxsize=self.max_pending)
+        responder = asyncio.create_task(self.respond(pending, writer))
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError):
+                    break  # Line longer than the stream limit, or the client went away
+                if not line:
+                    break
+                await pending.put(self.dispatch(line.decode('utf-8', 'replace').rstrip('\r\n')))
+        finally:
+            await pending.put(None)
+            await responder
+            writer.close()
+            self.connections -= 1
+
+    async def respond(self, pending: asyncio.Queue, writer: asyncio.StreamWriter):
+        connected = True
+        while True:
+            response = await pending.get()
+            if response is None:
+                break
+            if not isinstance(response, str):
+                response = await response
+            if not connected:
+                continue  # Keep draining the queue so that the reader never waits on a full one
+            writer.write(response.encode('utf-8') + b'\n')
+            if pending.empty():
+                try:
+                    await writer.drain()
+                except ConnectionError:
+                    connected = False
+
+    async def serve(self, host: str = '127.0.0.1', port: int = 8765, unix_path: Optional[str] = None, reload_interval: float = 1.0):
+        tasks = [asyncio.create_task(self.batcher.run())]
+        if reload_interval > 0:
+            tasks.append(asyncio.create_task(self.automata.watch(reload_interval)))
+        if unix_path:
+            server = await asyncio.start_unix_server(self.handle, unix_path)
+            log(f"serving {len(self.automata.compiled)} automata on {unix_path}")
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+            log(f"serving {len(self.automata.compiled)} automata on {host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))]
+
+async def load_test(connect, automaton: str, alphabet: str = '01', requests: int = 100000, connections: int = 8,
+                    depth: int = 64, max_length: int = 32, seed: int = 0) -> dict:
+    """Sends random match requests over several pipelined connections and measures latency.
+
+    connect is a coroutine function returning (reader, writer); each connection keeps up to
+    depth requests in flight. Latency is measured from sending a request to reading its answer.
+    """
+    latencies: List[float] = []
+    answers: Dict[str, int] = defaultdict(int)
+
+    async def worker(count: int, rng: random.Random):
+        reader, writer = await connect()
+        sent = deque()
+        in_flight = asyncio.Semaphore(depth)
+
+        async def send():
+            for _ in range(count):
+                await in_flight.acquire()
+                string = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, max_length)))
+                sent.append(time.perf_counter())
+                writer.write(f"MATCH {automaton} {string}\n".encode('utf-8'))
+                await writer.drain()
+
+        sender = asyncio.create_task(send())
+        for _ in range(count):
+            line = await reader.readline()
+            latencies.append(time.perf_counter() - sent.popleft())
+            answers[line.split(b' ', 1)[0].strip().decode()] += 1
+            in_flight.release()
+        await sender
+        writer.close()
+
+    shares = [requests // connections + (idx < requests % connections) for idx in range(connections)]
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(share, random.Random(seed + idx)) for idx, share in enumerate(shares) if share))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'seconds': elapsed,
+        'throughput': len(latencies) / elapsed if elapsed else 0.0,
+        'latency_ms': {name: percentile(latencies, fraction) * 1000
+                       for name, fraction in (('p50', 0.5), ('p90', 0.9), ('p99', 0.99), ('p99.9', 0.999), ('max', 1.0))},
+        'answers': dict(answers),
+    }
+
+def parse_automata(specs: List[str]) -> Dict[str, str]:
+    """Maps 'name=path' or 'path' arguments to names; a bare path is named after its file."""
+    paths = {}
+    for spec in specs:
+        name, separator, path = spec.partition('=')
+        if not separator:
+            path, name = spec, os.path.splitext(os.path.basename(spec))[0]
+        paths[name] = path
+    return paths
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve compiled automata over a line protocol, or load-test a running server.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    for command in ('serve', 'load'):
+        sub = commands.add_parser(command)
+        sub.add_argument('--host', default='127.0.0.1')
+        sub.add_argument('--port', type=int, default=8765)
+        sub.add_argument('--unix', metavar='PATH', help="use a Unix socket instead of TCP")
+    serve = commands.choices['serve']
+    serve.add_argument('automata', nargs='+', metavar='[NAME=]CSV', help="NFA CSV files to serve")
+    serve.add_argument('--reload-interval', type=float, default=1.0, help="seconds between checks for changed CSV files (0 disables)")
+    serve.add_argument('--max-batch', type=int, default=4096, help="match requests answered per batch")
+    serve.add_argument('--max-pending', type=int, default=1024, help="unanswered requests per connection before reading pauses")
+    load = commands.choices['load']
+    load.add_argument('automaton', help="name of the served automaton to query")
+    load.add_argument('--alphabet', default='01', help="characters of the random test strings")
+    load.add_argument('--requests', type=int, default=100000)
+    load.add_argument('--connections', type=int, default=8)
+    load.add_argument('--depth', type=int, default=64, help="requests in flight per connection")
+    load.add_argument('--max-length', type=int, default=32)
+    load.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        automata = Automata(parse_automata(args.automata))
+        automata.load_all()
+        try:
+            asyncio.run(MatchServer(automata, args.max_batch, args.max_pending).serve(args.host, args.port, args.unix, args.reload_interval))
+        except KeyboardInterrupt:
+            pass
+    else:
+        if args.unix:
+            connect = lambda: asyncio.open_unix_connection(args.unix)
+        else:
+            connect = lambda: asyncio.open_connection(args.host, args.port)
+        report = asyncio.run(load_test(connect, args.automaton, args.alphabet, args.requests, args.connections,
+                                       args.depth, args.max_length, args.seed))
+        print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Seeded automaton generators and reference rebuilds shared by the tests and the benchmarks."""
+
+import random
+
+from nfa2dfa_orozcoaniceto import BitsetNFAToDFAConverter, HopcroftDFAMinimizer
+
+SAMPLE_NFAS = ('N1.csv', 'N3.csv', 'N4.csv', 'N5.csv', 'regex2nfaConversion.csv_N1.csv')
+
+def generate_nfa(num_states, alphabet='01', nondeterminism=1.0, epsilon_density=0.1, accept_ratio=0.1, seed=0):
+    # Seeded random NFA as (transitions, start, accept states). Every state gets on average
+    # `nondeterminism` edges per symbol, each on a random symbol to a random state, and an
+    # epsilon edge with probability `epsilon_density`.
+    rng = random.Random(seed)
+    states = [f"q{idx}" for idx in range(num_states)]
+    whole, fraction = divmod(nondeterminism * len(alphabet), 1)
+    transitions = []
+    for state in states:
+        for _ in range(int(whole) + (fraction > 0 and rng.random() < fraction)):
+            transitions.append((state, rng.choice(alphabet), rng.choice(states)))
+        if rng.random() < epsilon_density:
+            transitions.append((state, '~', rng.choice(states)))
+    accept_states = set(rng.sample(states, max(1, int(num_states * accept_ratio))))
+    return transitions, states[0], accept_states
+
+def generate_regex(num_atoms, alphabet_size=2, union_rate=0.3, star_rate=0.2, seed=0):
+    # Seeded random regex in the project's dialect, built bottom-up without recursion
+    rng = random.Random(seed)
+    alphabet = [chr(ord('a') + idx) for idx in range(alphabet_size)]
+    pieces = [rng.choice(alphabet) for _ in range(num_atoms)]
+    while len(pieces) > 1:
+        idx = rng.randrange(len(pieces) - 1)
+        left, right = pieces[idx], pieces.pop(idx + 1)
+        joined = f"{left}U{right}" if rng.random() < union_rate else f"{left}{right}"
+        pieces[idx] = f"({joined})*" if rng.random() < star_rate else f"({joined})"
+    return pieces[0] if pieces else ''
+
+def fill_converter(converter, transitions, start_state, accept_states):
+    # Load generated transitions into an NFAToDFAConverter instead of reading them from a CSV file
+    for state, symbol, next_state in transitions:
+        converter.nfa_transitions[(state, symbol)].append(next_state)
+    converter.start_state = start_state
+    converter.accept_states = set(accept_states)
+    return converter
+
+def minimize_with(minimizer_class, dfa, start, accept):
+    # Minimize a copy of a DFA so both minimizers see the same input
+    return minimizer_class(dict(dfa), start, set(accept)).minimize()
+
+def rebuild(incremental):
+    # Full determinization and minimization of the NFA currently held by an IncrementalDFA
+    converter = BitsetNFAToDFAConverter('random.csv')
+    converter.nfa_transitions = incremental.transition_map()
+    converter.start_state = incremental.state_names[incremental.start]
+    converter.accept_states = incremental.accept_state_names()
+    dfa, start, accept = converter.nfa_to_dfa()
+    return (dict(dfa), start, accept), minimize_with(HopcroftDFAMinimizer, dfa, start, accept)
+
+def random_edit(incremental, rng, alphabet='01'):
+    # Pick one random edit: add or remove a transition, or flip an accept state; returns (method, arguments)
+    states = incremental.state_names
+    edges = [(state, symbol, next_state) for (state, symbol), next_states in incremental.transition_map().items() for next_state in next_states]
+    choice = rng.random()
+    if choice < 0.45 or not edges:
+        return incremental.add_transition, (rng.choice(states), rng.choice(alphabet + '~'), rng.choice(states))
+    if choice < 0.9:
+        return incremental.remove_transition, rng.choice(edges)
+    state = rng.choice(states)
+    return incremental.set_accepting, (state, state not in incremental.accept_state_names())
@@ -0,0 +1,59 @@
+"""Products, complement and the equivalence and inclusion checks must agree with enumerating every short string."""
+
+import itertools
+import random
+
+import pytest
+
+import algebra_orozcoaniceto as algebra
+from helpers import generate_regex
+
+PAIRS = 200
+STRINGS = [''.join(letters) for length in range(7) for letters in itertools.product('ab', repeat=length)]
+OPERATIONS = {algebra.intersection: lambda x, y: x and y, algebra.union: lambda x, y: x or y, algebra.difference: lambda x, y: x and not y}
+
+def regex_pair(pair):
+    # Every third pair compares a regex with itself, so equivalent pairs are covered too
+    rng = random.Random(pair)
+    first_regex = generate_regex(rng.randint(1, 6), seed=pair)
+    second_regex = first_regex if pair % 3 == 0 else generate_regex(rng.randint(1, 6), seed=pair + PAIRS)
+    return algebra.compile_regex(first_regex), algebra.compile_regex(second_regex)
+
+def language(compiled):
+    return [compiled.matches(string) for string in STRINGS]
+
+@pytest.mark.parametrize('pair', range(PAIRS))
+def test_equivalence_counterexample(pair):
+    first, second = regex_pair(pair)
+    counterexample = algebra.equivalence_counterexample(first, second)
+    if counterexample is None:
+        assert language(first) == language(second)
+    else:
+        assert first.matches(counterexample) != second.matches(counterexample)
+
+@pytest.mark.parametrize('pair', range(PAIRS))
+def test_inclusion_counterexample(pair):
+    # The counterexample must exist exactly when one does and be as short as the shortest
+    first, second = regex_pair(pair)
+    counterexample = algebra.inclusion_counterexample(first, second)
+    expected = next((string for string in STRINGS if first.matches(string) and not second.matches(string)), None)
+    if expected is None:
+        assert counterexample is None
+    else:
+        assert counterexample is not None and len(counterexample) == len(expected)
+        assert first.matches(counterexample) and not second.matches(counterexample)
+
+@pytest.mark.parametrize('operation', OPERATIONS, ids=lambda operation: operation.__name__)
+@pytest.mark.parametrize('pair', range(PAIRS))
+def test_products(pair, operation):
+    first, second = regex_pair(pair)
+    result = operation(first, second)
+    assert language(result) == list(map(OPERATIONS[operation], language(first), language(second)))
+    assert algebra.equivalent(algebra.minimize(result), result)
+
+@pytest.mark.parametrize('pair', range(PAIRS))
+def test_complement(pair):
+    first, _ = regex_pair(pair)
+    complement = algebra.complement(first, 'ab')
+    assert language(complement) == [not accepted for accepted in language(first)]
+    assert algebra.equivalent(algebra.minimize(algebra.complement(complement)), first)
@@ -0,0 +1,41 @@
+"""load_automaton must read every row into the CSR arrays and report malformed rows by line number."""
+
+import pytest
+
+import automaton_orozcoaniceto
+from automaton_orozcoaniceto import AutomatonFormatError, load_automaton
+
+HEADER = "N1,,,\nq1,q2,,\n0,1,,\nq1,,,\n*q2,,,\n"
+
+def write(tmp_path, text):
+    path = tmp_path / 'nfa.csv'
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+def test_rows_and_undeclared_names(tmp_path):
+    automaton = load_automaton(write(tmp_path, HEADER + "q1,0,q1,\nq1,1,*q2,\nq2,~,q3,\n*q3,2,q1,\n"))
+    assert automaton.state_names == ['q1', 'q2', 'q3']
+    assert automaton.symbols == ['0', '1', '2']
+    assert automaton.accept_state_names() == {'q2', 'q3'}
+    assert sorted(automaton.edges()) == [(0, 1, 0), (0, 2, 1), (1, 0, 2), (2, 3, 0)]
+
+def test_error_line_numbers(tmp_path):
+    rows = ["q1,0,q1,", "q1,0", "", ",1,q2,", "q2,1,q1,", "q2,0,,"]
+    with pytest.raises(AutomatonFormatError) as raised:
+        load_automaton(write(tmp_path, HEADER + '\n'.join(rows) + '\n'))
+    assert raised.value.errors == [(7, "expected 'state,symbol,next_state', got 'q1,0'"),
+                                   (9, "transition is missing its source state"),
+                                   (11, "transition is missing its target state")]
+    assert str(raised.value).splitlines()[0].endswith("nfa.csv:7: expected 'state,symbol,next_state', got 'q1,0'")
+
+def test_error_line_numbers_across_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(automaton_orozcoaniceto, 'CSV_CHUNK_ROWS', 4)
+    rows = ["q1,0,q1,"] * 9 + [",1,q2,"] + ["q2,1,q1,"] * 3 + ["q2,1"]
+    with pytest.raises(AutomatonFormatError) as raised:
+        load_automaton(write(tmp_path, HEADER + '\n'.join(rows) + '\n'))
+    assert [line_number for line_number, _ in raised.value.errors] == [15, 19]
+
+def test_missing_start_state(tmp_path):
+    with pytest.raises(AutomatonFormatError) as raised:
+        load_automaton(write(tmp_path, "N1,,,\nq1,,,\n0,,,\n,,,\nq1,,,\nq1,0,q1,\n"))
+    assert raised.value.errors == [(4, "missing start state")]
@@ -0,0 +1,34 @@
+"""A truncated or corrupt cache entry must be treated as a miss, never crash the lookup."""
+
+import pytest
+
+from cache_orozcoaniceto import CompiledDFACache
+from match_orozcoaniceto import CompiledDFA
+
+DFA = {('A', '0'): ['B'], ('A', '1'): ['A'], ('B', '0'): ['B'], ('B', '1'): ['A']}
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = CompiledDFACache(str(tmp_path))
+    cache.put('key', 'original', CompiledDFA.from_dfa(DFA, 'A', {'*B'}))
+    return cache
+
+def test_round_trip(cache):
+    dfa, start, accept = cache.get('key', 'original').to_dfa()
+    assert (dict(dfa), start, accept) == (DFA, 'A', {'B'})
+    assert cache.stats()['hits'] == 1
+
+def test_truncated_entry_is_a_miss(cache):
+    path = cache.path('key', 'original')
+    with open(path, 'rb') as file:
+        data = file.read()
+    for size in range(len(data)):
+        with open(path, 'wb') as file:
+            file.write(data[:size])
+        assert cache.get('key', 'original') is None
+    assert cache.stats()['misses'] == len(data)
+
+@pytest.mark.parametrize('data', [b'', b'CDFA', b'XXXX' + bytes(40)])
+def test_from_buffer_rejects_corrupt_data(data):
+    with pytest.raises(ValueError):
+        CompiledDFA.from_buffer(data)
@@ -0,0 +1,87 @@
+"""IncrementalDFA must match a full determinization and minimization after every edit."""
+
+import random
+
+import pytest
+
+from helpers import fill_converter, generate_nfa, random_edit, rebuild
+from incremental_orozcoaniceto import IncrementalDFA
+from nfa2dfa_orozcoaniceto import BitsetNFAToDFAConverter
+
+def make_incremental(size, seed, epsilon_density=0.3):
+    return IncrementalDFA(fill_converter(BitsetNFAToDFAConverter('random.csv'), *generate_nfa(size, epsilon_density=epsilon_density, seed=seed)))
+
+def snapshot(incremental):
+    # (dfa, start, accept) and (minimized dfa, start, accept, state map) with plain dicts
+    dfa, start, accept = incremental.to_dfa()
+    minimized, *rest = incremental.to_minimized()
+    return (dict(dfa), start, accept), (dict(minimized), *rest)
+
+def assert_matches_rebuild(incremental):
+    dfa, (minimized, *rest) = rebuild(incremental)
+    assert snapshot(incremental) == (dfa, (dict(minimized), *rest))
+
+@pytest.mark.parametrize('size', [3, 5, 8])
+@pytest.mark.parametrize('seed', range(4))
+def test_random_edits(size, seed):
+    rng = random.Random(seed)
+    incremental = make_incremental(size, seed)
+    for _ in range(20):
+        method, arguments = random_edit(incremental, rng)
+        method(*arguments)
+        assert_matches_rebuild(incremental)
+
+@pytest.mark.parametrize('symbol', ['0', '1', '~', 'x'])
+def test_remove_missing_edge(symbol):
+    incremental = make_incremental(5, seed=1)
+    state, next_state = incremental.state_names[0], incremental.state_names[-1]
+    if next_state in incremental.transition_map().get((state, symbol), []):
+        incremental.remove_transition(state, symbol, next_state)
+    before = snapshot(incremental)
+    incremental.remove_transition(state, symbol, next_state)
+    assert snapshot(incremental) == before
+    assert_matches_rebuild(incremental)
+
+def test_add_new_symbol():
+    incremental = make_incremental(5, seed=2)
+    start = incremental.state_names[incremental.start]
+    incremental.add_transition(start, 'x', incremental.state_names[-1])
+    assert 'x' in incremental.symbols
+    assert any(symbol == 'x' for _, symbol in incremental.to_dfa()[0])
+    assert_matches_rebuild(incremental)
+    incremental.remove_transition(start, 'x', incremental.state_names[-1])
+    assert_matches_rebuild(incremental)
+
+@pytest.mark.parametrize('seed', range(3))
+def test_toggle_accept_state(seed):
+    incremental = make_incremental(6, seed)
+    original = snapshot(incremental)
+    for state in incremental.state_names:
+        accepting = state in incremental.accept_state_names()
+        incremental.set_accepting(state, not accepting)
+        assert_matches_rebuild(incremental)
+        incremental.set_accepting(state, accepting)
+        assert_matches_rebuild(incremental)
+    assert snapshot(incremental) == original
+
+@pytest.mark.parametrize('seed', range(4))
+def test_edits_to_an_acyclic_dfa(seed):
+    # Word lists determinize to acyclic DFAs, whose edits are placed by block signature
+    rng = random.Random(seed)
+    transitions, accept = [], set()
+    for word_id in range(8):
+        previous = 'start'
+        for position in range(rng.randrange(1, 6)):
+            state = f"w{word_id}_{position}"
+            transitions.append((previous, rng.choice('ab'), state))
+            previous = state
+        accept.add(previous)
+    incremental = IncrementalDFA(fill_converter(BitsetNFAToDFAConverter('words.csv'), transitions, 'start', accept))
+    assert_matches_rebuild(incremental)
+    for _ in range(20):
+        state, symbol, next_state = rng.choice(transitions)
+        if rng.random() < 0.5:
+            incremental.remove_transition(state, symbol, next_state)
+        else:
+            incremental.add_transition(state, 'ab'[rng.random() < 0.5], next_state)
+        assert_matches_rebuild(incremental)
@@ -0,0 +1,42 @@
+"""Shortest strings, counts by length and shortlex enumeration must agree with enumerating every short string."""
+
+import itertools
+import random
+
+import pytest
+
+import algebra_orozcoaniceto as algebra
+from helpers import generate_regex
+from language_orozcoaniceto import count_accepted, first_accepted, shortest_accepted
+
+MAX_LENGTH = 7
+
+def compile_with_language(seed):
+    # A minimal DFA from a random regex and, in shortlex order, every string it accepts up to MAX_LENGTH
+    rng = random.Random(seed)
+    compiled = algebra.compile_regex(generate_regex(rng.randint(1, 7), rng.choice((1, 2, 3)), seed=seed), 'hopcroft')
+    accepted = [''.join(letters) for length in range(MAX_LENGTH + 1)
+                for letters in itertools.product(compiled.symbols, repeat=length) if compiled.matches(''.join(letters))]
+    return compiled, accepted
+
+@pytest.mark.parametrize('seed', range(200))
+def test_shortest_accepted(seed):
+    compiled, accepted = compile_with_language(seed)
+    if accepted:
+        assert shortest_accepted(compiled) == accepted[0]
+
+@pytest.mark.parametrize('seed', range(200))
+def test_count_accepted(seed):
+    compiled, accepted = compile_with_language(seed)
+    for length in (0, 1, MAX_LENGTH, 100, 257):
+        exact = count_accepted(compiled, length)
+        if length <= MAX_LENGTH:
+            assert exact == sum(len(string) == length for string in accepted)
+        assert count_accepted(compiled, length, 1000003) == exact % 1000003
+
+@pytest.mark.parametrize('seed', range(200))
+def test_first_accepted(seed):
+    compiled, accepted = compile_with_language(seed)
+    first = [string for string in first_accepted(compiled, 30) if len(string) <= MAX_LENGTH]
+    assert first == accepted[:len(first)]
+    assert len(first) >= min(30, len(accepted))
@@ -0,0 +1,35 @@
+"""LazyDFAMatcher must accept exactly the strings the compiled minimal DFA accepts."""
+
+import random
+
+import pytest
+
+from helpers import fill_converter, generate_nfa
+from match_orozcoaniceto import CompiledDFA, LazyDFAMatcher
+from nfa2dfa_orozcoaniceto import BitsetNFAToDFAConverter, HopcroftDFAMinimizer
+
+def random_strings(seed, count=500, max_length=32, alphabet='01'):
+    rng = random.Random(seed)
+    return [''.join(rng.choice(alphabet) for _ in range(rng.randint(0, max_length))) for _ in range(count)]
+
+def compile_and_lazy(size, seed, **options):
+    nfa = generate_nfa(size, seed=seed)
+    dfa, start, accept = fill_converter(BitsetNFAToDFAConverter('random.csv'), *nfa).nfa_to_dfa()
+    compiled = CompiledDFA.from_dfa(*HopcroftDFAMinimizer(dfa, start, accept).minimize()[:3])
+    return compiled, LazyDFAMatcher(fill_converter(BitsetNFAToDFAConverter('random.csv'), *nfa), **options)
+
+@pytest.mark.parametrize('size', [5, 20, 40])
+@pytest.mark.parametrize('seed', range(3))
+def test_lazy_matches_compiled(size, seed):
+    compiled, lazy = compile_and_lazy(size, seed)
+    strings = random_strings(seed, alphabet='012')
+    assert list(lazy.match_many(strings)) == list(compiled.match_many(strings))
+
+@pytest.mark.parametrize('seed', range(3))
+def test_cache_flushes_and_fallback(seed):
+    # A two-state cache flushes on almost every step and falls back to set simulation
+    compiled, lazy = compile_and_lazy(40, seed, max_states=2, max_flushes=1)
+    strings = random_strings(seed)
+    assert list(lazy.match_many(strings)) == list(compiled.match_many(strings))
+    stats = lazy.stats()
+    assert stats['states'] <= 2 and stats['fallbacks'] > 0
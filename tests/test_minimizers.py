@@ -0,0 +1,38 @@
+"""Hopcroft's minimizer must produce exactly the DFA of the original (Moore) minimizer."""
+
+import os
+
+import pytest
+
+from helpers import SAMPLE_NFAS, fill_converter, generate_nfa, minimize_with
+from nfa2dfa_orozcoaniceto import BitsetNFAToDFAConverter, DFAMinimizer, HopcroftDFAMinimizer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def minimize_both(dfa, start, accept):
+    # (dfa, start, accept states, state map) from the original and the Hopcroft minimizer
+    results = [minimize_with(minimizer, dfa, start, accept) for minimizer in (DFAMinimizer, HopcroftDFAMinimizer)]
+    return [(dict(minimized), *rest) for minimized, *rest in results]
+
+def assert_minimizers_agree(converter):
+    moore, hopcroft = minimize_both(*converter.nfa_to_dfa())
+    assert hopcroft == moore
+
+@pytest.mark.parametrize('filename', SAMPLE_NFAS)
+def test_sample_nfas(filename):
+    converter = BitsetNFAToDFAConverter(os.path.join(ROOT, filename))
+    converter.read_nfa_from_file()
+    assert_minimizers_agree(converter)
+
+@pytest.mark.parametrize('size', [3, 10, 20, 40])
+@pytest.mark.parametrize('seed', range(3))
+def test_random_nfas(size, seed):
+    assert_minimizers_agree(fill_converter(BitsetNFAToDFAConverter('random.csv'), *generate_nfa(size, seed=seed)))
+
+@pytest.mark.parametrize('accepting', [True, False])
+def test_single_block(accepting):
+    # Every state accepts (or none does), so one of the two initial blocks is empty
+    dfa = {('A', 'b'): ['B'], ('B', 'b'): ['C']}
+    accept = {'*A', '*B', '*C'} if accepting else set()
+    moore, hopcroft = minimize_both(dfa, 'A', accept)
+    assert hopcroft == moore
@@ -0,0 +1,48 @@
+"""The scanner, alone or merged from chunks, must find the leftmost-longest matches of brute-force substring matching."""
+
+import random
+
+import pytest
+
+import algebra_orozcoaniceto as algebra
+from helpers import generate_regex
+from scan_orozcoaniceto import Scanner, chunk_bounds, merge_chunk_matches, scan_file
+
+def brute_force_matches(compiled, text):
+    # Leftmost-longest matches found by testing every substring
+    matches, pos = [], 0
+    while pos <= len(text):
+        match = next(((start, max(ends)) for start in range(pos, len(text) + 1)
+                      for ends in [[end for end in range(start, len(text) + 1) if compiled.matches(text[start:end])]] if ends), None)
+        if match is None:
+            break
+        matches.append(match)
+        pos = match[1] if match[1] > match[0] else match[1] + 1
+    return matches
+
+def random_case(seed, max_length=24):
+    # (regex, text) with symbols outside the regex alphabet in the text
+    rng = random.Random(seed)
+    regex = generate_regex(rng.randint(1, 6), seed=seed)
+    return regex, ''.join(rng.choice('abc') for _ in range(rng.randint(0, max_length)))
+
+@pytest.mark.parametrize('seed', range(200))
+def test_matches_brute_force(seed):
+    regex, text = random_case(seed)
+    scanner, data = Scanner.from_regex(regex), text.encode()
+    expected = brute_force_matches(algebra.compile_regex(regex), text)
+    assert list(scanner.matches(data)) == expected
+    for chunk_size in (1, 2, 5):
+        bounds = chunk_bounds(len(data), chunk_size)
+        merged = merge_chunk_matches(scanner, data, bounds, [list(scanner.matches(data, *chunk)) for chunk in bounds])
+        assert list(merged) == expected
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_scan_file(tmp_path, workers):
+    regex, text = random_case(7, max_length=2000)
+    path = tmp_path / 'scan.txt'
+    path.write_text(text)
+    scanner = Scanner.from_regex(regex)
+    expected = list(scanner.matches(text.encode()))
+    assert list(scan_file(scanner, str(path), workers, chunk_size=100)) == expected
+    assert list(scan_file(scanner, str(path), workers, chunk_size=100, data=text.encode())) == expected
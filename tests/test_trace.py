@@ -0,0 +1,30 @@
+"""NFATracer in 'paths' mode must list at most max_paths paths and note the limit only when more paths exist."""
+
+import pytest
+
+from trace_nfa_orozcoaniceto import NFATracer
+
+# Three paths for 'a': q1 -> q2, q1 -> q3 and the trap path through q4
+NFA = "Paths,,,\nq1,*q2,*q3,q4\na,b,,\nq1,,,\n*q2,*q3,,\nq1,a,*q2,\nq1,a,*q3,\nq1,a,q4,\nq4,b,q1,\n"
+
+def trace(tmp_path, max_paths):
+    path = tmp_path / 'paths.csv'
+    path.write_text(NFA)
+    tracer = NFATracer(str(path), mode='paths', max_paths=max_paths)
+    tracer.load(write_header=False)
+    accepted = tracer.trace_string('a')
+    with open(tracer.output_file_path) as file:
+        return accepted, file.read()
+
+@pytest.mark.parametrize('max_paths', [3, 4, None])
+def test_every_path_listed(tmp_path, max_paths):
+    accepted, output = trace(tmp_path, max_paths)
+    assert accepted
+    assert "Total Paths: 3\n" in output
+    assert "stopped at the limit" not in output
+
+def test_listing_stops_at_the_limit(tmp_path):
+    accepted, output = trace(tmp_path, 2)
+    assert accepted
+    assert "Total Paths: 2\n" in output
+    assert "(Path listing stopped at the limit of 2 paths)" in output
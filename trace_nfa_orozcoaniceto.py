@@ -0,0 +1,224 @@
+from automaton_orozcoaniceto import AutomatonFormatError, load_automaton
+
+TRAP = '(trap state)'  # Last entry of a path that found no transition
+
+class _PathLimitReached(Exception):
+    """Raised internally to stop path enumeration once more paths than the cap are found."""
+
+class NFATracer:
+    """A class to trace strings through a Non-deterministic Finite Automaton (NFA) read from a CSV file."""
+
+    def __init__(self, filename: str, mode: str = 'accept', witness: bool = True, max_paths: int = 1000):
+        # Initialize with the CSV file name containing NFA configuration
+        self.filename = filename
+        self.mode = mode  # 'accept' simulates active state sets, 'paths' lists every path
+        self.witness = witness  # Rebuild one accepting path in 'accept' mode
+        self.max_paths = max_paths  # Cap on the number of paths listed in 'paths' mode
+        self.automaton = None  # The NFA, traced through its integer ids and CSR arrays
+        self.slots = {}  # Symbol slot of every input character with transitions
+        # Generating output file path, suffixing 'Output' to the filename without its extension
+        self.output_file_path = f"{filename.rsplit('.', 1)[0]}Output"
+
+    def read_file(self):
+        """Reads the NFA configuration from a CSV file, exiting with a message if it cannot be read."""
+        try:
+            self.load()
+        except FileNotFoundError:
+            # Handle file not found error
+            print(f"Error: The file '{self.filename}' was not found.")
+            exit(1)
+        except AutomatonFormatError as error:
+            # Report every malformed row with its line number
+            print(f"Error: {error}")
+            exit(1)
+
+    def load(self, write_header: bool = True):
+        """Reads the NFA configuration through the shared automaton loader; errors propagate to the caller."""
+        self.automaton = automaton = load_automaton(self.filename)
+
+        # Write the automaton name to the output file
+        if write_header:
+            self._write_to_file(f"File: {automaton.name}\n")
+        self.slots = {symbol: slot for slot, symbol in enumerate(automaton.symbols, 1)}
+
+    def successors(self, state: int, symbol: str):
+        """Targets of a state on an input character, in file order."""
+        slot = self.slots.get(symbol)
+        return self.automaton.successors(state, slot) if slot is not None else ()
+
+    def trace_string(self, string: str) -> bool:
+        """Traces a string through the NFA, writes results to the output file and returns whether it was accepted."""
+        if self.mode == 'accept':
+            accepted, path = self.simulate(string, self.witness)
+            self._write_result_to_file(string, accepted, path)
+            return accepted
+
+        all_paths = []  # Store all paths taken by the string in the NFA
+        truncated = False  # Set when more than max_paths paths exist
+        # Start tracing the NFA
+        try:
+            self._trace_nfa(self.automaton.start, string, [], all_paths, set())
+        except _PathLimitReached:
+            truncated = True
+            del all_paths[self.max_paths:]
+        # Write all traced paths into the output file, with the '*' marker on accept states
+        all_paths = [[self.automaton.marked_name(state) if state is not None else TRAP for state in path] for path in all_paths]
+        self._write_paths_to_file(string, all_paths, truncated)
+        return any(path[-1].startswith('*') for path in all_paths)
+
+    def simulate(self, string: str, witness: bool = False) -> tuple[bool, list[str] | None]:
+        """Decides acceptance by advancing the epsilon-closed set of active states one symbol at a time."""
+        automaton = self.automaton
+        # back_pointers[i] maps each state active after i symbols to (previous state, consumed a symbol)
+        back_pointers: list[dict[int, tuple[int, bool]]] = []
+        step_pointers = {} if witness else None
+        active = self._epsilon_closure({automaton.start}, step_pointers)
+
+        for symbol in string:
+            slot = self.slots.get(symbol)
+            if slot is None:
+                return False, None
+            if witness:
+                back_pointers.append(step_pointers)
+                step_pointers = {}
+            next_states = set()
+            for state in active:
+                for next_state in automaton.successors(state, slot):
+                    if next_state not in next_states:
+                        next_states.add(next_state)
+                        if witness:
+                            step_pointers[next_state] = (state, True)
+            active = self._epsilon_closure(next_states, step_pointers)
+            if not active:
+                return False, None
+
+        accepting = [state for state in active if automaton.accepting[state]]
+        if not accepting:
+            return False, None
+        if not witness:
+            return True, None
+
+        # Walk the back-pointers from an accepting state to the start state
+        back_pointers.append(step_pointers)
+        state = min(accepting, key=automaton.marked_name)
+        path, step = [state], len(back_pointers) - 1
+        while state in back_pointers[step]:
+            state, consumed = back_pointers[step][state]
+            path.append(state)
+            step -= consumed
+        return True, [automaton.marked_name(state) for state in reversed(path)]
+
+    def _epsilon_closure(self, states, back_pointers=None):
+        """Returns the states reachable through epsilon transitions, recording back-pointers if requested."""
+        successors = self.automaton.successors
+        stack = list(states)
+        closure = set(states)
+        while stack:
+            state = stack.pop()
+            for next_state in successors(state, 0):
+                if next_state not in closure:
+                    closure.add(next_state)
+                    stack.append(next_state)
+                    if back_pointers is not None:
+                        back_pointers[next_state] = (state, False)
+        return closure
+
+    def _trace_nfa(self, state, the_string, current_path, all_paths, epsilon_visited):
+        """Recursively traces a string through the NFA."""
+        # Record the current state in the path
+        current_path = current_path + [state]
+
+        # If the string is fully processed, add the path to all_paths
+        if not the_string:
+            self._add_path(current_path, all_paths)
+            return
+
+        # Process the next character from the string
+        self._process_transitions(state, the_string, current_path, all_paths, epsilon_visited)
+
+    def _process_transitions(self, prev_state, the_string, current_path, all_paths, epsilon_visited):
+        """Handles transitions for the current state and character."""
+        next_states = self.successors(prev_state, the_string[0])
+        epsilon_states = self.automaton.successors(prev_state, 0)
+
+        # Process direct transitions
+        for next_state in next_states:
+            self._trace_nfa(next_state, the_string[1:], current_path, all_paths, set())
+
+        # Process epsilon transitions, skipping states already visited since the last symbol
+        if epsilon_states:
+            epsilon_visited = epsilon_visited | {prev_state}
+            for next_state in epsilon_states:
+                if next_state not in epsilon_visited:
+                    self._trace_nfa(next_state, the_string, current_path, all_paths, epsilon_visited)
+
+        # Handle the case when there's no valid transition (trap state)
+        if not next_states:
+            self._add_path(current_path + [None], all_paths)
+
+    def _add_path(self, path, all_paths):
+        """Records a finished path, stopping the trace at the first path beyond max_paths."""
+        all_paths.append(path)
+        if self.max_paths is not None and len(all_paths) > self.max_paths:
+            raise _PathLimitReached()
+
+    def _write_paths_to_file(self, string, all_paths, truncated=False):
+        """Formats and writes the traced paths for a given string to the output file."""
+        # Segregate paths into accepted, trap, and rejected
+        accepted_paths = [path for path in all_paths if path[-1].startswith('*')]
+        trap_paths = [path for path in all_paths if TRAP in path]
+        rejected_paths = [path for path in all_paths if path not in accepted_paths and path not in trap_paths]
+
+        with open(self.output_file_path, 'a') as file:
+            # Writing details of each path type
+            file.write(f"\nTesting String: '{string}'\n")
+            file.write("\nPaths:\n")
+            file.write("  Rejected Paths:\n")
+            for path in rejected_paths:
+                file.write(f"    {' -> '.join(path)}\n")
+            file.write("  Trap Paths:\n")
+            for path in trap_paths:
+                file.write(f"    {' -> '.join(path[:-1])} (Trap State)\n")
+            file.write("  Accepting Paths:\n")
+            for path in accepted_paths:
+                file.write(f"    {' -> '.join(path)}\n")
+
+            # Writing a summary of the paths
+            file.write(f"\nSummary for '{string}':\n")
+            file.write(f"  Total Paths: {len(all_paths)}\n")
+            if truncated:
+                file.write(f"  (Path listing stopped at the limit of {self.max_paths} paths)\n")
+            file.write(f"  Accepting Paths: {len(accepted_paths)}\n")
+            if accepted_paths:
+                file.write("          Paths:\n")
+                for path in accepted_paths:
+                    file.write(f"                       - {' -> '.join(path)}\n")
+
+    def _write_result_to_file(self, string, accepted, path):
+        """Writes the accept/reject decision and an optional witness path to the output file."""
+        with open(self.output_file_path, 'a') as file:
+            file.write(f"\nTesting String: '{string}'\n")
+            file.write(f"  Result: {'Accepted' if accepted else 'Rejected'}\n")
+            if path:
+                file.write(f"  Witness Path: {' -> '.join(path)}\n")
+
+    def _write_to_file(self, content: str):
+        """Writes arbitrary content to the output file."""
+        with open(self.output_file_path, 'a') as file:
+            file.write(content)
+
+def main(mode='accept'):
+    # Prompt for the input file name
+    filename = input("Enter the filename: ")
+    tracer = NFATracer(filename, mode)
+    tracer.read_file()
+
+    # Continuously trace strings until the user decides to exit
+    while True:
+        test_string = input("Enter a test string (or 'exit' to quit): ")
+        if test_string.lower() == 'exit':
+            break
+        tracer.trace_string(test_string)
+
+if __name__ == "__main__":
+    main()